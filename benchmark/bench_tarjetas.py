@@ -0,0 +1,79 @@
+# benchmark/bench_tarjetas.py
+"""
+Corrección y microbenchmark del parser de tarjetas de miembro (tarjetas_miembro.py).
+
+    python benchmark/bench_tarjetas.py              # verifica el corpus y mide
+    python benchmark/bench_tarjetas.py --repeticiones 1000
+
+Sale con código 1 si alguna tarjeta del corpus no se parsea como se espera.
+Al cambiar el layout de Skool, añadir la tarjeta nueva a tarjetas_corpus.json con su resultado.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+from tarjetas_miembro import CLAVES, parsear_tarjeta  # noqa: E402
+from sitio_falso import generar_miembros, lineas_tarjeta  # noqa: E402
+
+
+def cargar_corpus(ruta):
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verificar(corpus):
+    """Compara cada tarjeta con su resultado esperado (las claves omitidas deben quedar en 'N/A')."""
+    errores = 0
+    for caso in corpus:
+        obtenido = parsear_tarjeta(caso['partes'])
+        esperado = {clave: caso['esperado'].get(clave, 'N/A') for clave in CLAVES}
+        diferencias = {k: (esperado[k], obtenido.get(k)) for k in CLAVES if esperado[k] != obtenido.get(k)}
+        if diferencias:
+            errores += 1
+            print(f"❌ {caso['descripcion']}")
+            for clave, (esp, obt) in diferencias.items():
+                print(f"      {clave:<11} esperado={esp!r} obtenido={obt!r}")
+        else:
+            print(f"✅ {caso['descripcion']}")
+    return errores
+
+
+def medir(tarjetas, repeticiones):
+    """Devuelve microsegundos por tarjeta parseando `repeticiones` veces el conjunto."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for partes in tarjetas:
+            parsear_tarjeta(partes)
+    segundos = time.perf_counter() - inicio
+    return segundos * 1_000_000 / (repeticiones * len(tarjetas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica y mide el parser de tarjetas de miembro.")
+    parser.add_argument('--corpus', default=os.path.join(DIRECTORIO, 'tarjetas_corpus.json'))
+    parser.add_argument('--repeticiones', type=int, default=200, help="Pasadas sobre el conjunto de tarjetas")
+    args = parser.parse_args()
+
+    corpus = cargar_corpus(args.corpus)
+    errores_corpus = verificar(corpus)
+
+    # Las tarjetas del sitio falso deben dar el mismo @handle que usa el benchmark de punta a punta
+    generadas = generar_miembros(300)
+    handles_mal = sum(1 for m in generadas if parsear_tarjeta(lineas_tarjeta(m))['EmailSkool'] != m['slug'])
+    if handles_mal:
+        print(f"❌ {handles_mal}/{len(generadas)} tarjetas del sitio falso con @handle incorrecto")
+
+    tarjetas = [caso['partes'] for caso in corpus] + [lineas_tarjeta(m) for m in generadas]
+    microsegundos = medir(tarjetas, max(1, args.repeticiones))
+    print(f"\n⏱️ {microsegundos:.2f} µs por tarjeta ({len(tarjetas)} tarjetas distintas)")
+    print(f"{'✅' if not errores_corpus else '❌'} {len(corpus) - errores_corpus}/{len(corpus)} tarjetas del corpus correctas")
+    return 1 if errores_corpus or handles_mal else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
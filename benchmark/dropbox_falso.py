@@ -0,0 +1,81 @@
+# benchmark/dropbox_falso.py
+import os
+import uuid
+import dropbox
+from dropbox.exceptions import ApiError, InternalServerError
+from requests.exceptions import ConnectionError as ErrorConexion
+
+
+class _Resultado:
+    def __init__(self, **campos):
+        self.__dict__.update(campos)
+
+
+class DropboxFalso:
+    """
+    Sustituto local de dropbox.Dropbox para las llamadas de subida (files_upload y
+    upload sessions). Guarda los archivos en `directorio` y puede inyectar fallos:
+
+    - fallos_red: lista de números de llamada (1, 2, ...) que fallan con un error de red
+      sin que Dropbox reciba los datos.
+    - fallos_tras_recibir: llamadas en las que Dropbox sí guarda la parte pero la respuesta
+      se pierde; el reintento recibe entonces un incorrect_offset, como en la API real.
+    """
+
+    def __init__(self, directorio, fallos_red=(), fallos_tras_recibir=()):
+        self.directorio = directorio
+        self.fallos_red = set(fallos_red)
+        self.fallos_tras_recibir = set(fallos_tras_recibir)
+        self.sesiones = {}
+        self.llamadas = 0
+        self.bytes_recibidos = 0
+        self.max_bytes_por_llamada = 0
+
+    def _registrar_llamada(self, datos):
+        self.llamadas += 1
+        if self.llamadas in self.fallos_red:
+            raise ErrorConexion(f"fallo de red simulado en la llamada {self.llamadas}")
+        self.bytes_recibidos += len(datos)
+        self.max_bytes_por_llamada = max(self.max_bytes_por_llamada, len(datos))
+
+    def _perder_respuesta(self):
+        if self.llamadas in self.fallos_tras_recibir:
+            raise InternalServerError(f"falso-{self.llamadas}", 503, "respuesta perdida (simulado)")
+
+    def _guardar(self, ruta_dropbox, datos):
+        destino = os.path.join(self.directorio, ruta_dropbox.lstrip('/'))
+        with open(destino, 'wb') as f:
+            f.write(datos)
+
+    def _validar_offset(self, cursor, en_finish=False):
+        recibido = len(self.sesiones[cursor.session_id])
+        if cursor.offset != recibido:
+            error = dropbox.files.UploadSessionLookupError(
+                'incorrect_offset', dropbox.files.UploadSessionOffsetError(correct_offset=recibido))
+            if en_finish:
+                error = dropbox.files.UploadSessionFinishError('lookup_failed', error)
+            raise ApiError(f"falso-{self.llamadas}", error, None, None)
+
+    def files_upload(self, f, path, mode=None):
+        self._registrar_llamada(f)
+        self._guardar(path, f)
+        return _Resultado(path_display=path, size=len(f))
+
+    def files_upload_session_start(self, f, close=False):
+        self._registrar_llamada(f)
+        session_id = uuid.uuid4().hex
+        self.sesiones[session_id] = bytearray(f)
+        return _Resultado(session_id=session_id)
+
+    def files_upload_session_append_v2(self, f, cursor, close=False):
+        self._registrar_llamada(f)
+        self._validar_offset(cursor)
+        self.sesiones[cursor.session_id].extend(f)
+        self._perder_respuesta()
+
+    def files_upload_session_finish(self, f, cursor, commit):
+        self._registrar_llamada(f)
+        self._validar_offset(cursor, en_finish=True)
+        datos = self.sesiones.pop(cursor.session_id) + f
+        self._guardar(commit.path, bytes(datos))
+        return _Resultado(path_display=commit.path, size=len(datos))
@@ -0,0 +1,227 @@
+# benchmark/ejecutar_benchmark.py
+"""
+Benchmark de punta a punta del scraper contra el sitio falso local (sin red).
+
+    python benchmark/ejecutar_benchmark.py --paginas 3 --por-pagina 30 --salida base.json
+    python benchmark/ejecutar_benchmark.py --paginas 3 --por-pagina 30 --comparar base.json
+    python benchmark/ejecutar_benchmark.py --pestanas 3 --latencia-perfil-ms 800   # precarga con TTFB lento
+
+Cada fila del CSV se compara con el miembro del sitio falso (contribuciones y email): si una
+pestaña reutilizada entregó los datos del perfil anterior, el benchmark sale con código 1.
+
+Por defecto usa un sumidero nulo en lugar de PostgreSQL y nunca sube a Dropbox.
+Con --bd escribe en la base de BENCH_DATABASE_URL (nunca se usa DATABASE_URL del .env,
+para no tocar la base de producción por accidente).
+"""
+import argparse
+import csv
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+RAIZ_REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ_REPO)
+
+from sitio_falso import SitioFalso  # noqa: E402
+from skool_http import grabar_payload  # noqa: E402
+from cronjob import SkoolScraper  # noqa: E402
+
+
+class ScraperSinDropbox(SkoolScraper):
+    """Scraper real con PostgreSQL (BENCH_DATABASE_URL) pero sin subida a Dropbox."""
+
+    def subir_a_dropbox(self, nombre_archivo):
+        self.logger.info(f"🧪 Benchmark: se omite la subida de '{nombre_archivo}'.")
+
+
+class ScraperSumideroNulo(ScraperSinDropbox):
+    """Scraper sin PostgreSQL: los registros que irían a la BD solo se cuentan."""
+
+    def _setup_database_connection(self):
+        self.connection_string = None
+        self.db_pool_max = 1
+        self.db_pool = None
+        self._db_ultimo_uso = {}
+        self.filas_bd = 0
+
+    def _cargar_indice_fecha_unido(self):
+        self.indice_fecha_unido = {}
+
+    def save_page_to_database(self, page_data_dicts):
+        self.filas_bd += len(page_data_dicts)
+        return True
+
+    def _guardar_metricas_pagina(self, page_number, miembros):
+        pass
+
+    def _save_execution_data(self, end_time, execution_time):
+        pass
+
+    def _cerrar_pool_bd(self):
+        pass
+
+
+def preparar_entorno(args, directorio):
+    """Variables de entorno del scraper para una corrida aislada y repetible."""
+    os.environ.update({
+        'SKOOL_EMAIL': 'bench@example.com',
+        'SKOOL_PASSWORD': 'bench',
+        'NUM_MEMBERS': str(args.miembros),
+        'MIN_DELAY_SECONDS': str(args.pausa),
+        'PROFILE_TABS': str(args.pestanas),
+        'PROFILE_ENGINE': args.motor,
+        'RESUME_MODE': 'off',
+        'CHECKPOINT_FILE': os.path.join(directorio, 'checkpoint.json'),
+        'SESSION_COOKIES_FILE': '',
+        'DELTA_MODE': '0',
+        'EMAIL_CACHE_TTL_DAYS': '0',
+        'METRICS_DIR': directorio,
+        'WEBDRIVER_PROFILE': '1',
+        'DROPBOX_INCREMENTAL': '0',
+        'OUTPUT_FORMATS': args.formatos,
+    })
+    if args.bd:
+        os.environ['DATABASE_URL'] = os.environ['BENCH_DATABASE_URL']
+
+
+def ejecutar(args):
+    sitio = SitioFalso(args.paginas, args.por_pagina, args.latencia_ms, args.semilla,
+                       latencia_perfil_ms=args.latencia_perfil_ms).iniciar()
+    directorio_original = os.getcwd()
+    try:
+        with tempfile.TemporaryDirectory(prefix='skool_bench_') as directorio:
+            os.chdir(directorio)
+            preparar_entorno(args, directorio)
+            if args.motor == 'http':
+                grabar_payloads_sitio(sitio, directorio)
+            SkoolScraper.URLS = sitio.urls()
+            scraper = (ScraperSinDropbox if args.bd else ScraperSumideroNulo)()
+            if args.silencioso:
+                scraper.logger.setLevel('WARNING')
+
+            inicio = time.perf_counter()
+            scraper.run()
+            segundos = time.perf_counter() - inicio
+
+            registros_incorrectos = verificar_csv(scraper.full_path, sitio)
+            comandos = scraper.contador_comandos.resumen(top=10)
+            miembros = scraper.global_count
+            return {
+                'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'parametros': {k: v for k, v in vars(args).items() if k not in ('salida', 'comparar')},
+                'miembros': miembros,
+                'segundos': round(segundos, 2),
+                'miembros_por_minuto': round(miembros * 60 / segundos, 2) if segundos > 0 else 0.0,
+                'comandos_por_miembro': round(comandos['comandos_total'] / miembros, 1) if miembros else 0.0,
+                'comandos_total': comandos['comandos_total'],
+                'top_comandos': comandos['top_comandos'],
+                'pico_memoria_chrome_mb': round(scraper.pico_memoria_chrome, 1),
+                'pico_memoria_python_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                'reinicios_navegador': scraper.reinicios_navegador,
+                'timeouts_perfil': scraper.timeouts_perfil,
+                'registros_incorrectos': registros_incorrectos,
+                'peticiones_sitio': dict(sitio.peticiones),
+                'etapas': scraper.metricas.resumen(),
+            }
+    finally:
+        os.chdir(directorio_original)
+        sitio.detener()
+
+
+def grabar_payloads_sitio(sitio, directorio):
+    """
+    El motor HTTP solo arranca validado contra payloads grabados: aquí se graban los del sitio
+    falso (para producción se graban perfiles reales con PROFILE_PAYLOAD_RECORD_DIR).
+    """
+    destino = os.path.join(directorio, 'payloads_perfil')
+    for miembro in sitio.miembros[:3]:
+        esperado = {'email': miembro['email'], 'contribucion': str(miembro['contribuciones']),
+                    'cursos': [{'title': t, 'progress': f"{p}%"} for t, p in miembro['cursos']]}
+        grabar_payload(sitio._perfil(miembro), f"/{miembro['slug']}", esperado, destino)
+    os.environ['PROFILE_PAYLOADS_DIR'] = destino
+
+
+def verificar_csv(ruta, sitio):
+    """Cuenta las filas cuyas contribuciones o email no son los del miembro de esa fila."""
+    incorrectos = 0
+    with open(ruta, 'r', newline='', encoding='utf-8-sig') as f:
+        for fila in csv.DictReader(f):
+            miembro = sitio.por_slug.get(fila['Usuario_SK'])
+            if miembro is None:
+                continue
+            # Los 'NA_*' son timeouts (ya contados en timeouts_perfil), no datos cruzados
+            contribucion_mal = fila['Contribucion'] not in (str(miembro['contribuciones']), 'NA_Contrib')
+            email_mal = fila['Email_Gmail'] not in (miembro['email'], 'NA_Email')
+            if contribucion_mal or email_mal:
+                incorrectos += 1
+                print(f"❌ {fila['Usuario_SK']}: contribuciones={fila['Contribucion']!r} email={fila['Email_Gmail']!r} "
+                      f"(esperado {miembro['contribuciones']} / {miembro['email']})")
+    return incorrectos
+
+
+def imprimir(resultado, base=None):
+    campos = [
+        ('miembros_por_minuto', 'Miembros/min', True),
+        ('comandos_por_miembro', 'Comandos WebDriver/miembro', False),
+        ('pico_memoria_chrome_mb', 'Pico RSS Chrome (MB)', False),
+        ('pico_memoria_python_mb', 'Pico RSS Python (MB)', False),
+        ('segundos', 'Duración (s)', False),
+    ]
+    print(f"\n📊 Benchmark: {resultado['miembros']} miembros en {resultado['segundos']}s")
+    for clave, etiqueta, mas_es_mejor in campos:
+        linea = f"   {etiqueta:<28} {resultado[clave]:>10}"
+        if base and base.get(clave):
+            cambio = (resultado[clave] - base[clave]) * 100 / base[clave]
+            mejora = cambio > 0 if mas_es_mejor else cambio < 0
+            linea += f"   base {base[clave]:>10}  ({cambio:+.1f}% {'✅' if mejora or cambio == 0 else '⚠️'})"
+        print(linea)
+    print(f"   Reinicios de navegador: {resultado['reinicios_navegador']} | Timeouts de perfil: {resultado['timeouts_perfil']}")
+    print(f"   {'✅' if not resultado['registros_incorrectos'] else '❌'} Registros con datos de otro miembro: {resultado['registros_incorrectos']}")
+    print(f"   Peticiones al sitio: {resultado['peticiones_sitio']}")
+    print("   Comandos más costosos:")
+    for c in resultado['top_comandos'][:5]:
+        print(f"      {c['comando']:<28} n={c['n']:<6} total={c['total']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del scraper contra un Skool falso local.")
+    parser.add_argument('--paginas', type=int, default=3)
+    parser.add_argument('--por-pagina', type=int, default=30)
+    parser.add_argument('--miembros', type=int, default=0, help="Tope de miembros (0 = todas las páginas)")
+    parser.add_argument('--latencia-ms', type=int, default=0, help="Latencia simulada por petición")
+    parser.add_argument('--latencia-perfil-ms', type=int, default=0,
+                        help="Latencia extra solo en perfiles (> 300 ms reproduce la precarga con TTFB lento)")
+    parser.add_argument('--semilla', type=int, default=7)
+    parser.add_argument('--pestanas', type=int, default=2, help="PROFILE_TABS")
+    parser.add_argument('--motor', choices=('selenium', 'http'), default='selenium', help="PROFILE_ENGINE")
+    parser.add_argument('--pausa', type=float, default=0.0, help="MIN_DELAY_SECONDS")
+    parser.add_argument('--formatos', default='csv', help="OUTPUT_FORMATS (p. ej. csv,csv.zst,parquet)")
+    parser.add_argument('--bd', action='store_true', help="Escribir en BENCH_DATABASE_URL (base desechable)")
+    parser.add_argument('--silencioso', action='store_true', help="Solo advertencias del scraper")
+    parser.add_argument('--salida', help="Guardar el resultado como JSON (línea base)")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior contra el que comparar")
+    args = parser.parse_args()
+
+    if args.bd and not os.getenv('BENCH_DATABASE_URL'):
+        print("❌ --bd requiere BENCH_DATABASE_URL apuntando a una base desechable")
+        return 1
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+
+    resultado = ejecutar(args)
+    imprimir(resultado, base)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultado guardado en '{args.salida}'")
+    return 1 if resultado['registros_incorrectos'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+# benchmark/probar_buffer_bd.py
+"""
+Verifica que el buffer de PostgreSQL (_vaciar_buffer_bd) no pierda filas, con una base falsa:
+
+    python benchmark/probar_buffer_bd.py
+
+Cubre una interrupción (SystemExit, como el SIGTERM del cron) mientras se arman las filas,
+antes del COPY y con el indicador del lote anterior todavía en True, la misma interrupción
+durante el reintento fila a fila,
+una fila que PostgreSQL rechaza y la pérdida de conexión. Sale con código 1 si algo no coincide.
+"""
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+import psycopg2  # noqa: E402
+from cronjob import SkoolScraper  # noqa: E402
+from metricas import MedidorEtapas  # noqa: E402
+
+logger = logging.getLogger("PruebaBufferBD")
+logging.basicConfig(level=logging.CRITICAL, format="[%(levelname)s] %(message)s")
+
+
+class BaseFalsa:
+    """
+    Sustituye a _conexion_bd: confirma las filas al salir del bloque sin errores.
+    Las filas cuyo email empieza por 'mala' hacen fallar el COPY como un error de datos.
+    """
+
+    def __init__(self, sin_conexion=False):
+        self.sin_conexion = sin_conexion
+        self.guardadas = []
+
+    @contextmanager
+    def conexion(self):
+        if self.sin_conexion:
+            raise psycopg2.OperationalError("conexión rechazada")
+        cursor = CursorFalso()
+        yield ConexionFalsa(cursor)
+        self.guardadas.extend(cursor.emails)
+
+
+class RegistroInterrumpido(dict):
+    """Registro que lanza SystemExit la n-ésima vez que save_page_to_database arma su fila."""
+
+    def __init__(self, email, interrumpir_en):
+        super().__init__(email_skool=email)
+        self.interrumpir_en = interrumpir_en
+        self.armados = 0
+
+    def get(self, clave, *defecto):
+        if clave == 'email_skool':
+            self.armados += 1
+            if self.armados == self.interrumpir_en:
+                raise SystemExit(143)
+        return super().get(clave, *defecto)
+
+
+class ConexionFalsa:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+class CursorFalso:
+    def __init__(self):
+        self.emails = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, query, datos):
+        for linea in datos.read().splitlines():
+            email = linea.split(',', 1)[0]
+            if email.startswith('mala'):
+                raise psycopg2.DataError(f"valor inválido en {email}")
+            self.emails.append(email)
+
+
+def nuevo_scraper(base):
+    scraper = SkoolScraper.__new__(SkoolScraper)
+    scraper.logger = logger
+    scraper.metricas = MedidorEtapas()
+    scraper.script_name = 'prueba'
+    scraper.full_path = 'prueba.csv'
+    scraper.db_courses_mode = 'wide'
+    scraper.delta_mode = False
+    scraper.email_cache_ttl_days = 0
+    scraper.cursos_ids = {}
+    scraper.indice_fecha_unido = None
+    scraper.reintentos_bd = 0
+    scraper.buffer_bd = []
+    scraper.buffer_bd_desde = 0.0
+    scraper.bd_reintentar_desde = 0.0
+    scraper.db_flush_seconds = 30
+    scraper.ultimo_fallo_bd = None
+    # El lote anterior se confirmó: el indicador queda en True al empezar el siguiente vaciado
+    scraper.lote_bd_confirmado = True
+    scraper._conexion_bd = base.conexion
+    return scraper
+
+
+def registros(*emails):
+    return [{'email_skool': email} for email in emails]
+
+
+def emails(lista):
+    return [r.get('email_skool') for r in lista]
+
+
+def vaciar(scraper):
+    try:
+        scraper._vaciar_buffer_bd()
+    except SystemExit:
+        return True
+    return False
+
+
+def comprobar(nombre, condiciones, detalle):
+    ok = all(condiciones)
+    print(f"{'✅' if ok else '❌'} {nombre}: {detalle}")
+    return ok
+
+
+def main():
+    resultados = []
+
+    # 1) SIGTERM armando las filas (antes del COPY) con el True del lote anterior:
+    #    el lote entero sigue en el buffer
+    base = BaseFalsa()
+    scraper = nuevo_scraper(base)
+    scraper.buffer_bd = registros('a') + [RegistroInterrumpido('b', 1)] + registros('c')
+    interrumpido = vaciar(scraper)
+    resultados.append(comprobar("interrupción antes del COPY", [
+        interrumpido, emails(scraper.buffer_bd) == ['a', 'b', 'c'], base.guardadas == []],
+        f"buffer={emails(scraper.buffer_bd)}, guardadas={base.guardadas}"))
+
+    # 2) Lote rechazado por una fila mala; SIGTERM armando la segunda fila del reintento fila a
+    #    fila, justo después de confirmar la primera: la fila sin guardar no se descarta
+    base = BaseFalsa()
+    scraper = nuevo_scraper(base)
+    scraper.buffer_bd = registros('a') + [RegistroInterrumpido('mala', 2)] + registros('c')
+    interrumpido = vaciar(scraper)
+    resultados.append(comprobar("interrupción fila a fila", [
+        interrumpido, base.guardadas == ['a'], emails(scraper.buffer_bd) == ['mala', 'c']],
+        f"buffer={emails(scraper.buffer_bd)}, guardadas={base.guardadas}"))
+
+    # 3) Sin interrupción: solo se descarta la fila que PostgreSQL rechaza
+    base = BaseFalsa()
+    scraper = nuevo_scraper(base)
+    scraper.buffer_bd = registros('a', 'mala', 'c')
+    guardado = scraper._vaciar_buffer_bd()
+    resultados.append(comprobar("fila mala aislada", [
+        guardado is False, base.guardadas == ['a', 'c'], scraper.buffer_bd == []],
+        f"buffer={emails(scraper.buffer_bd)}, guardadas={base.guardadas}"))
+
+    # 4) Sin conexión: el lote vuelve al buffer y se pospone el siguiente intento
+    base = BaseFalsa(sin_conexion=True)
+    scraper = nuevo_scraper(base)
+    scraper.buffer_bd = registros('a', 'b')
+    espera_original = time.sleep
+    time.sleep = lambda segundos: None  # sin las pausas de 5 s entre reintentos
+    try:
+        guardado = scraper._vaciar_buffer_bd()
+    finally:
+        time.sleep = espera_original
+    resultados.append(comprobar("sin conexión", [
+        guardado is False, emails(scraper.buffer_bd) == ['a', 'b'], scraper.bd_reintentar_desde > 0],
+        f"buffer={emails(scraper.buffer_bd)}, guardadas={base.guardadas}"))
+
+    return 0 if all(resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
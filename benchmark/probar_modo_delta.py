@@ -0,0 +1,72 @@
+# benchmark/probar_modo_delta.py
+"""
+Verifica la huella de tarjeta del modo delta (sin navegador ni base de datos):
+
+    python benchmark/probar_modo_delta.py
+
+Entre dos ejecuciones cambian los textos relativos de la tarjeta ('Active 3h ago' -> 'Online now',
+'Renews in 12 days' -> 'Renews in 11 days'): la segunda debe reutilizar el snapshot. Si cambia el
+nivel o el valor de la membresía, debe volver a visitar el perfil. Sale con código 1 si algo no coincide.
+"""
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+from cronjob import SkoolScraper  # noqa: E402
+
+logger = logging.getLogger("PruebaDelta")
+logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(message)s")
+
+TARJETA = {
+    'EmailSkool': '@ana-perez', 'Nivel': '4', 'Activo': '3h', 'Unido': 'Mar 3, 2024',
+    'Valor': '$97/month', 'Renueva': 'Renews in 12 days',
+}
+
+
+def nuevo_scraper():
+    scraper = SkoolScraper.__new__(SkoolScraper)
+    scraper.logger = logger
+    scraper.delta_mode = True
+    scraper.delta_max_staleness_hours = 168
+    scraper.perfiles_reutilizados = 0
+    scraper.snapshots = {}
+    return scraper
+
+
+def primera_ejecucion(scraper, tarjeta):
+    """Lo que deja _guardar_snapshots tras visitar el perfil en la primera ejecución."""
+    scraper.snapshots[tarjeta['EmailSkool']] = {
+        'huella': scraper._huella_tarjeta(tarjeta), 'email_gmail': 'ana@example.com', 'contribucion': '12',
+        'cursos': [{'Curso': 'Inicio', 'Vr. Progreso': 40}], 'refrescado': datetime.now() - timedelta(hours=20),
+    }
+
+
+def comprobar(nombre, reutilizado, esperado):
+    ok = reutilizado == esperado
+    print(f"{'✅' if ok else '❌'} {nombre}: {'reutiliza el snapshot' if reutilizado else 'visita el perfil'}")
+    return ok
+
+
+def main():
+    resultados = []
+    casos = [
+        ("solo cambia 'Activo'", {'Activo': 'Online now'}, True),
+        ("cambian 'Activo' y 'Renueva'", {'Activo': '5m', 'Renueva': 'Renews in 11 days'}, True),
+        ("cambia el nivel", {'Nivel': '5'}, False),
+        ("cambia el valor", {'Valor': '$997/year'}, False),
+    ]
+    for nombre, cambios, esperado in casos:
+        scraper = nuevo_scraper()
+        primera_ejecucion(scraper, TARJETA)
+        segunda = dict(TARJETA, **cambios)
+        perfil = scraper._perfil_desde_snapshot(segunda, scraper._huella_tarjeta(segunda))
+        resultados.append(comprobar(nombre, perfil is not None, esperado))
+    return 0 if all(resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
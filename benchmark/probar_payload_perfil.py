@@ -0,0 +1,65 @@
+# benchmark/probar_payload_perfil.py
+"""
+Verifica el parser del motor HTTP (skool_http.py) sin red:
+
+    python benchmark/probar_payload_perfil.py
+    python benchmark/probar_payload_perfil.py --grabaciones /ruta/a/payloads
+
+1) Con el perfil del sitio falso, que también trae la cuenta que navega y el grupo con sus
+   propios cursos/email, solo deben salir los datos del miembro de la URL.
+2) Cada payload real grabado (PROFILE_PAYLOAD_RECORD_DIR, anonimizado) debe dar lo mismo
+   que extrajo Selenium. Sin grabaciones el motor HTTP queda desactivado en producción.
+
+Sale con 1 si algo no coincide y con 2 si no hay payloads reales grabados.
+"""
+import argparse
+import logging
+import os
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+from skool_http import SkoolHttpEngine  # noqa: E402
+from sitio_falso import SitioFalso, generar_miembros  # noqa: E402
+
+logger = logging.getLogger("PruebaPayload")
+logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(message)s")
+
+
+def probar_sitio_falso(motor):
+    sitio = SitioFalso(paginas=1, por_pagina=20)
+    errores = 0
+    for miembro in generar_miembros(20):
+        html = sitio._perfil(miembro)
+        esperado = (miembro['email'], str(miembro['contribuciones']),
+                    [{'title': t, 'progress': f"{p}%"} for t, p in miembro['cursos']])
+        if motor._parsear_payload(html, f"http://127.0.0.1/{miembro['slug']}?g=x") != esperado:
+            errores += 1
+        # Con la URL de otro perfil no hay nodo de miembro: debe caer a Selenium
+        if motor._parsear_payload(html, "http://127.0.0.1/@otro-miembro") is not None:
+            errores += 1
+    print(f"{'✅' if not errores else '❌'} Sitio falso (cuenta y grupo como señuelo): {errores} errores")
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica el parser de __NEXT_DATA__ del motor HTTP.")
+    parser.add_argument('--grabaciones', default=os.getenv('PROFILE_PAYLOADS_DIR', os.path.join(DIRECTORIO, 'payloads_perfil')))
+    args = parser.parse_args()
+
+    motor = SkoolHttpEngine(logger)
+    errores = probar_sitio_falso(motor)
+    validos, total = motor.validar_grabaciones(args.grabaciones)
+    motor.cerrar()
+    if not total:
+        print(f"⚠️ Sin payloads reales grabados en '{args.grabaciones}': PROFILE_ENGINE=http seguirá usando Selenium.")
+    else:
+        print(f"{'✅' if validos == total else '❌'} Payloads reales: {validos}/{total} coinciden con Selenium")
+    if errores or validos != total:
+        return 1
+    return 0 if total else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+# benchmark/probar_subida_dropbox.py
+"""
+Verifica SubidaDropbox contra el sustituto local de Dropbox (sin red):
+
+    python benchmark/probar_subida_dropbox.py
+
+Cubre archivo de una parte, subida por partes con fallos de red y respuestas perdidas,
+y subida incremental mientras el archivo crece. Sale con código 1 si algo no coincide.
+"""
+import logging
+import os
+import sys
+import tempfile
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DIRECTORIO))
+
+from subida_dropbox import SubidaDropbox  # noqa: E402
+from dropbox_falso import DropboxFalso  # noqa: E402
+
+PARTE = 64 * 1024
+logger = logging.getLogger("PruebaSubida")
+logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(message)s")
+
+
+def escribir(ruta, n_bytes, modo='wb'):
+    with open(ruta, modo) as f:
+        f.write(os.urandom(n_bytes))
+
+
+def comparar(nombre, local, remoto, falso, condiciones=()):
+    with open(local, 'rb') as a, open(remoto, 'rb') as b:
+        iguales = a.read() == b.read()
+    ok = iguales and all(condiciones)
+    print(f"{'✅' if ok else '❌'} {nombre}: {falso.llamadas} llamadas, "
+          f"máx. {falso.max_bytes_por_llamada} bytes por llamada, contenido {'idéntico' if iguales else 'DISTINTO'}")
+    return ok
+
+
+def main():
+    resultados = []
+    with tempfile.TemporaryDirectory() as local, tempfile.TemporaryDirectory() as remoto:
+        # 1) Archivo menor que una parte: una sola llamada files_upload
+        ruta = os.path.join(local, 'pequeno.csv')
+        escribir(ruta, PARTE // 2)
+        falso = DropboxFalso(remoto)
+        SubidaDropbox(lambda: falso, ruta, '/pequeno.csv', logger, tamano_parte=PARTE, espera_base=0).finalizar()
+        resultados.append(comparar("una parte", ruta, os.path.join(remoto, 'pequeno.csv'), falso,
+                                   [falso.llamadas == 1]))
+
+        # 2) Varias partes con un fallo de red y una respuesta perdida (incorrect_offset al reintentar)
+        ruta = os.path.join(local, 'grande.csv')
+        escribir(ruta, PARTE * 5 + 123)
+        falso = DropboxFalso(remoto, fallos_red=[2], fallos_tras_recibir=[4])
+        SubidaDropbox(lambda: falso, ruta, '/grande.csv', logger, tamano_parte=PARTE, espera_base=0).finalizar()
+        resultados.append(comparar("por partes con fallos", ruta, os.path.join(remoto, 'grande.csv'), falso,
+                                   [falso.max_bytes_por_llamada <= PARTE]))
+
+        # 3) Incremental: el archivo crece por páginas y al final solo queda la cola
+        ruta = os.path.join(local, 'incremental.csv')
+        escribir(ruta, 0)
+        falso = DropboxFalso(remoto)
+        subida = SubidaDropbox(lambda: falso, ruta, '/incremental.csv', logger, tamano_parte=PARTE, espera_base=0)
+        for _ in range(7):
+            escribir(ruta, PARTE // 2 + 777, modo='ab')
+            subida.anexar()
+        antes_del_final = falso.bytes_recibidos
+        subida.finalizar()
+        resultados.append(comparar("incremental", ruta, os.path.join(remoto, 'incremental.csv'), falso,
+                                   [falso.bytes_recibidos - antes_del_final < PARTE]))
+
+    return 0 if all(resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
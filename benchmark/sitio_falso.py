@@ -0,0 +1,267 @@
+# benchmark/sitio_falso.py
+import html
+import json
+import os
+import random
+import threading
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DIRECTORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+COMUNIDAD = 'mentoriavipantoecom'
+COOKIE_SESION = 'skool_bench_sesion'
+
+CURSOS = [f"Módulo {n:02d} - {tema}" for n, tema in enumerate([
+    'Bienvenida', 'Mentalidad', 'Nicho', 'Proveedores', 'Tienda', 'Producto ganador', 'Fotografía',
+    'Copywriting', 'Precios', 'Logística', 'Pasarelas de pago', 'Meta Ads', 'TikTok Ads', 'Google Ads',
+    'Email marketing', 'Atención al cliente', 'Métricas', 'Escalado', 'Marca propia', 'Importación',
+    'Finanzas', 'Legal', 'Equipo', 'Automatización', 'Cierre'], start=1)]
+NOMBRES = ['Ana', 'Luis', 'Camila', 'Jorge', 'Valentina', 'Andrés', 'Sofía', 'Mateo', 'Laura', 'Diego']
+APELLIDOS = ['Gómez', 'Rodríguez', 'López', 'Martínez', 'Pérez', 'Sánchez', 'Ramírez', 'Torres', 'Díaz', 'Vargas']
+CIUDADES = ['Bogotá, Colombia', 'Medellín, Colombia', 'Lima, Perú', 'Quito, Ecuador', 'CDMX, México']
+MESES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def _cargar_fixture(nombre):
+    with open(os.path.join(DIRECTORIO_FIXTURES, nombre), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def generar_miembros(total, semilla=7):
+    """
+    Genera miembros deterministas con las variantes de tarjeta que se ven en Skool:
+    normal, sin frase de bio, administrador ('(Admin)') y destacado ('🔥').
+    """
+    rnd = random.Random(semilla)
+    miembros = []
+    for i in range(total):
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)}"
+        ascii_nombre = unicodedata.normalize('NFKD', nombre).encode('ascii', 'ignore').decode()
+        handle = f"@{ascii_nombre.lower().replace(' ', '-')}-{i:05d}"
+        variante = rnd.choices(['normal', 'sin_frase', 'admin', 'destacado'], weights=[80, 12, 3, 5])[0]
+        cursos = rnd.sample(CURSOS, rnd.randint(3, 12))
+        miembros.append({
+            'slug': handle,
+            'nombre': nombre,
+            'nivel': str(rnd.randint(1, 9)),
+            'variante': variante,
+            'frase': f"Emprendiendo en {rnd.choice(['moda', 'hogar', 'mascotas', 'tecnología', 'belleza'])}",
+            'activo': f"Active {rnd.randint(1, 59)}m ago",
+            'unido': f"Joined {rnd.choice(MESES)} {rnd.randint(1, 28)}, {rnd.randint(2023, 2025)}",
+            'valor': rnd.choice(['$49/month', '$97/month', 'Free']),
+            'renueva': f"Renews in {rnd.randint(1, 30)} days",
+            'localiza': rnd.choice(CIUDADES),
+            'invito': f"Invited by {rnd.choice(NOMBRES)}",
+            'email': f"{handle[1:].replace('-', '.')}@gmail.com",
+            'contribuciones': rnd.randint(0, 400),
+            'cursos': [(titulo, rnd.choice([0, 5, 20, 45, 60, 80, 100])) for titulo in cursos],
+        })
+    return miembros
+
+
+def lineas_tarjeta(miembro):
+    """Líneas de texto de la tarjeta (lo que el scraper obtiene con innerText.split('\\n'))."""
+    cabecera = [miembro['nivel'], miembro['nombre']]
+    if miembro['variante'] == 'admin':
+        cabecera.append('(Admin)')
+    elif miembro['variante'] == 'destacado':
+        cabecera.append('🔥 Top 1%')
+    cuerpo = [miembro['slug'], 'Chat', 'Membership']
+    if miembro['variante'] != 'sin_frase':
+        cuerpo.append(miembro['frase'])
+    return cabecera + cuerpo + [miembro['activo'], miembro['unido'], miembro['valor'],
+                                miembro['renueva'], miembro['localiza'], miembro['invito']]
+
+
+def datos_next_perfil(miembro):
+    """pageProps del perfil: usuario que navega, grupo y, más adentro, el miembro."""
+    return {
+        'currentUser': {
+            'name': 'bench-admin', 'membershipEmail': 'admin@bench.local', 'totalContributions': 999,
+            'courses': [{'title': 'Curso de la cuenta', 'progress': 100}],
+        },
+        'group': {'name': COMUNIDAD, 'courses': [{'title': 'Curso del grupo', 'progress': 0}]},
+        'user': {
+            'name': miembro['slug'][1:],
+            'firstName': miembro['nombre'].split()[0],
+            'member': {
+                'totalContributions': miembro['contribuciones'],
+                'membershipEmail': miembro['email'],
+                'courses': [{'title': titulo, 'progress': progreso} for titulo, progreso in miembro['cursos']],
+            },
+        },
+    }
+
+
+class SitioFalso:
+    """
+    Servidor HTTP local que imita las páginas de Skool que recorre el scraper:
+    login, miembros (?p=N), perfil, modal de membresía y pestaña de cursos.
+    latencia_ms simula el tiempo de red de cada petición; latencia_perfil_ms se suma solo a
+    los perfiles (TTFB lento), el caso en que una pestaña reutilizada sigue mostrando el
+    perfil anterior mientras la navegación nueva aún no se confirma.
+    """
+
+    def __init__(self, paginas=3, por_pagina=30, latencia_ms=0, semilla=7, latencia_perfil_ms=0):
+        self.por_pagina = por_pagina
+        self.paginas = paginas
+        self.latencia = latencia_ms / 1000
+        self.latencia_perfil = latencia_perfil_ms / 1000
+        self.miembros = generar_miembros(paginas * por_pagina, semilla)
+        self.por_slug = {m['slug']: m for m in self.miembros}
+        self.peticiones = {}
+        self._bloqueo = threading.Lock()
+        self.fixtures = {nombre: _cargar_fixture(f"{nombre}.html")
+                         for nombre in ('login', 'members', 'profile', 'modal', 'course')}
+        self.servidor = None
+        self._hilo = None
+
+    @property
+    def base_url(self):
+        host, puerto = self.servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def urls(self):
+        """Reemplazo de SkoolScraper.URLS apuntando a este servidor."""
+        return {
+            'login': f"{self.base_url}/login",
+            'members': f"{self.base_url}/{COMUNIDAD}/-/members",
+            'profile': f"{self.base_url}/{{slug}}?g={COMUNIDAD}",
+        }
+
+    def iniciar(self, host='127.0.0.1', puerto=0):
+        sitio = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, formato, *args):
+                pass
+
+            def do_GET(self):
+                sitio._atender(self, 'GET')
+
+            def do_POST(self):
+                sitio._atender(self, 'POST')
+
+        self.servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        self.servidor.daemon_threads = True
+        self._hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        if self.servidor is not None:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+
+    # --- Enrutado ---
+
+    def _atender(self, peticion, metodo):
+        if self.latencia:
+            time.sleep(self.latencia)
+        url = urlparse(peticion.path)
+        ruta = url.path
+        autenticado = f"{COOKIE_SESION}=" in (peticion.headers.get('Cookie') or '')
+
+        if metodo == 'POST' and ruta == '/api/login':
+            longitud = int(peticion.headers.get('Content-Length') or 0)
+            peticion.rfile.read(longitud)
+            return self._responder(peticion, 'login', '{}', 'application/json',
+                                   cabeceras={'Set-Cookie': f"{COOKIE_SESION}=ok; Path=/"})
+        if ruta == '/robots.txt':
+            return self._responder(peticion, 'robots', 'User-agent: *\n', 'text/plain')
+        if ruta == '/login':
+            return self._responder(peticion, 'login', self.fixtures['login'])
+        if not autenticado:
+            return self._redirigir(peticion, '/login')
+
+        if ruta == f"/{COMUNIDAD}/-/members":
+            pagina = parse_qs(url.query).get('p', ['1'])[0]
+            return self._responder(peticion, 'members', self._pagina_miembros(int(pagina) if pagina.isdigit() else 1))
+        if ruta.startswith('/@') and ruta[1:] in self.por_slug:
+            if self.latencia_perfil:
+                time.sleep(self.latencia_perfil)
+            return self._responder(peticion, 'profile', self._perfil(self.por_slug[ruta[1:]]))
+        if ruta.startswith('/api/modal/@') and ruta[len('/api/modal/'):] in self.por_slug:
+            miembro = self.por_slug[ruta[len('/api/modal/'):]]
+            return self._responder(peticion, 'modal', self.fixtures['modal'].replace('__EMAIL__', miembro['email']))
+        if ruta.startswith('/api/courses/@') and ruta[len('/api/courses/'):] in self.por_slug:
+            miembro = self.por_slug[ruta[len('/api/courses/'):]]
+            return self._responder(peticion, 'courses', self._grid_cursos(miembro))
+        return self._responder(peticion, 'no_encontrado', 'Not found', 'text/plain', estado=404)
+
+    def _responder(self, peticion, tipo, cuerpo, content_type='text/html; charset=utf-8', estado=200, cabeceras=None):
+        with self._bloqueo:
+            self.peticiones[tipo] = self.peticiones.get(tipo, 0) + 1
+        datos = cuerpo.encode('utf-8')
+        peticion.send_response(estado)
+        peticion.send_header('Content-Type', content_type)
+        peticion.send_header('Content-Length', str(len(datos)))
+        for nombre, valor in (cabeceras or {}).items():
+            peticion.send_header(nombre, valor)
+        peticion.end_headers()
+        peticion.wfile.write(datos)
+
+    def _redirigir(self, peticion, destino):
+        with self._bloqueo:
+            self.peticiones['redireccion_login'] = self.peticiones.get('redireccion_login', 0) + 1
+        peticion.send_response(302)
+        peticion.send_header('Location', destino)
+        peticion.send_header('Content-Length', '0')
+        peticion.end_headers()
+
+    # --- Páginas ---
+
+    def _pagina_miembros(self, pagina):
+        inicio = (pagina - 1) * self.por_pagina
+        tarjetas = []
+        for miembro in self.miembros[inicio:inicio + self.por_pagina]:
+            lineas = [f"<div>{html.escape(linea)}</div>" for linea in lineas_tarjeta(miembro)]
+            # El nombre es el enlace al perfil, igual que en Skool
+            lineas[1] = f'<div><a href="/{miembro["slug"]}">{html.escape(miembro["nombre"])}</a></div>'
+            tarjetas.append(f'<div class="styled__MemberItemWrapper-bench">{"".join(lineas)}</div>')
+        if pagina < self.paginas:
+            atributos = f"onclick=\"window.location.href='?p={pagina + 1}'\""
+        else:
+            atributos = 'disabled'
+        return (self.fixtures['members']
+                .replace('__TARJETAS__', '\n'.join(tarjetas))
+                .replace('__NEXT_ATTRS__', atributos))
+
+    def _perfil(self, miembro):
+        # Mismo contenido en __NEXT_DATA__ para poder medir también PROFILE_ENGINE=http. Como en
+        # Skool, la cuenta que navega y el grupo van antes (y menos anidados) que el miembro:
+        # el motor HTTP debe ubicar el nodo del miembro por su slug y no tomar los de ellos.
+        next_data = json.dumps({'props': {'pageProps': datos_next_perfil(miembro)}},
+                               ensure_ascii=False).replace('</', '<\\/')
+        return (self.fixtures['profile']
+                .replace('__NOMBRE__', html.escape(miembro['nombre']))
+                .replace('__CONTRIBUCIONES__', str(miembro['contribuciones']))
+                .replace('__SLUG__', miembro['slug'])
+                .replace('__DATOS_NEXT__', next_data))
+
+    def _grid_cursos(self, miembro):
+        return '\n'.join(
+            self.fixtures['course'].replace('__TITULO__', html.escape(titulo)).replace('__PROGRESO__', str(progreso))
+            for titulo, progreso in miembro['cursos']
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Sirve el sitio falso de Skool para pruebas manuales.")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--paginas', type=int, default=3)
+    parser.add_argument('--por-pagina', type=int, default=30)
+    parser.add_argument('--latencia-ms', type=int, default=0)
+    parser.add_argument('--latencia-perfil-ms', type=int, default=0)
+    args = parser.parse_args()
+    sitio = SitioFalso(args.paginas, args.por_pagina, args.latencia_ms,
+                       latencia_perfil_ms=args.latencia_perfil_ms).iniciar(puerto=args.puerto)
+    print(f"🌐 Sitio falso en {sitio.urls()['members']} (Ctrl+C para detener)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sitio.detener()
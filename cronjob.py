@@ -5,15 +5,30 @@ import os
 import sys
 import time
 import json
+import hashlib
+import io
+import signal
+import cProfile
+import pstats
 import dropbox
 import logging
 import requests
 import psycopg2
+import psycopg2.pool
+import psycopg2.extras
 import psutil
 import shutil
 import tempfile
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from datetime import datetime
+from skool_http import SkoolHttpEngine, grabar_payload
+from metricas import MedidorEtapas, ContadorComandos
+from tarjetas_miembro import CLAVES as CLAVES_TARJETA, parsear_tarjeta
+from sumideros import SumideroCSV, SumideroCSVGzip, SumideroCSVZstd, SumideroParquet
+from subida_dropbox import SubidaDropbox
+from dropbox_auth import obtener_proveedor_token
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs, urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -24,20 +39,81 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 
 load_dotenv()
 
+class ReciclajeNavegador(Exception):
+    """La memoria de Chrome superó el techo duro a mitad de página."""
+
+
 class SkoolScraper:
     URLS = {
         'login': 'https://www.skool.com/login',
-        'members': 'https://www.skool.com/mentoriavipantoecom/-/members'
+        'members': 'https://www.skool.com/mentoriavipantoecom/-/members',
+        'profile': 'https://www.skool.com/{slug}?g=mentoriavipantoecom'
     }
     SELECTORS = {
     'member_item': '[class*="styled__MemberItemWrapper-"], div[class*="sc-db9ce526-0"]',
     'email_input': '#email',
-    'password_input': '#password'
+    'password_input': '#password',
+    'membership_email': '[class*="sc-5014102b-1"] span',
+    'course_title': '[class*="sc-b7620b6e-4"]',
+    'course_progress': '[class*="sc-b7620b6e-5"]'
 }
     XPATHS = {
         'submit_button': '//button[@type="submit"]',
         'next_button': '//button[.//span[contains(text(), "Next")]]'
     }
+    # Patrones para Network.setBlockedURLs (reemplazables con BLOCKED_URL_PATTERNS, separados por coma)
+    BLOCKED_URLS = [
+        '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+        '*.mp4', '*.webm', '*.mp3', '*.m3u8', '*.ogg',
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+        '*facebook.net*', '*facebook.com/tr*',
+        '*hotjar.com*', '*clarity.ms*', '*segment.io*', '*segment.com*',
+        '*mixpanel.com*', '*amplitude.com*', '*intercom.io*', '*intercomcdn.com*',
+        '*fullstory.com*', '*tiktok.com*', '*youtube.com*', '*vimeo.com*', '*wistia*', '*loom.com*'
+    ]
+    # Formatos admitidos en OUTPUT_FORMATS y la extensión de su archivo
+    FORMATOS_SALIDA = {'csv': '.csv', 'csv.gz': '.csv.gz', 'csv.zst': '.csv.zst', 'parquet': '.parquet'}
+    SCRIPTS = {
+        # arguments[0]: selector de tarjetas, arguments[1]: XPath del botón Next
+        'leer_miembros': """
+            const cards = Array.from(document.querySelectorAll(arguments[0])).map(el => {
+                const link = el.querySelector('a[href^="/@"]');
+                return {
+                    parts: el.innerText.split('\\n').map(p => p.trim()).filter(p => p),
+                    slug: link ? link.getAttribute('href').split('?')[0].replace(/^\\//, '') : null
+                };
+            });
+            const next = document.evaluate(arguments[1], document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            return {
+                cards: cards,
+                next: {
+                    exists: !!next,
+                    disabled: !!(next && (next.disabled || next.getAttribute('aria-disabled') === 'true'))
+                }
+            };
+        """,
+        # arguments[0]: selector de tarjetas. Slug de la primera tarjeta, para saber si la lista ya cambió.
+        'primer_slug': """
+            const card = document.querySelector(arguments[0]);
+            const link = card ? card.querySelector('a[href^="/@"]') : null;
+            return link ? link.getAttribute('href').split('?')[0].replace(/^\\//, '') : null;
+        """,
+        # arguments[0]: selector de títulos, arguments[1]: selector de progresos.
+        # Devuelve null mientras el grid no esté listo, para usarlo como condición de espera.
+        'leer_cursos': """
+            const titles = document.querySelectorAll(arguments[0]);
+            const progresses = document.querySelectorAll(arguments[1]);
+            if (!titles.length || !progresses.length) return null;
+            const n = Math.min(titles.length, progresses.length);
+            const cursos = [];
+            for (let i = 0; i < n; i++) {
+                cursos.push({title: titles[i].innerText, progress: progresses[i].innerText});
+            }
+            return cursos;
+        """
+    }
 
     def _check_driver_alive(self):
         try:
@@ -47,14 +123,104 @@ class SkoolScraper:
             return False
 
     def __init__(self):
-        self.max_pages_per_session = 10  # Reiniciar cada 5 páginas
+        # Reinicio fijo cada N páginas; 0 = solo reciclar por memoria (CHROME_MEM_*)
+        self.max_pages_per_session = max(0, self._cargar_entero_env('MAX_PAGES_PER_SESSION', 0))
         self.current_session_pages = 0
+        self.chrome_mem_limit_mb = self._cargar_decimal_env('CHROME_MEM_LIMIT_MB', 350)
+        self.chrome_mem_growth_mb = self._cargar_decimal_env('CHROME_MEM_GROWTH_MB_PER_PAGE', 60)
+        self.chrome_mem_hard_factor = 1.15  # Sobre este múltiplo del techo se recicla a mitad de página
+        self.memoria_base_sesion = None
+        self.pico_memoria_chrome = 0.0
+        self.reinicios_navegador = 0
+        self.reciclajes_pestanas = 0
+        # Instrumentación por etapa; se exporta al final en METRICS_DIR (JSON + textfile de Prometheus)
+        self.metricas = MedidorEtapas()
+        self.metrics_dir = os.getenv('METRICS_DIR', '.')
+        self.timeouts_perfil = 0
+        self.reintentos_bd = 0
+        # Perfilado opcional: conteo de comandos WebDriver por miembro/tipo y cProfile del lado Python
+        self.contador_comandos = ContadorComandos() if os.getenv('WEBDRIVER_PROFILE', '0') == '1' else None
+        self.perfilador = cProfile.Profile() if os.getenv('PYTHON_PROFILE', '0') == '1' else None
+        # Historial de rendimiento por página (tabla scraper_miembros_elite_paginas)
+        self.pico_memoria_pagina = 0.0
+        self.ultima_pagina = 0
+        self._inicio_pagina = None
+        self.tabla_paginas_lista = False
+        self.profile_tabs = max(1, self._cargar_entero_env('PROFILE_TABS', 2))  # Pestañas de perfil en paralelo
         self.script_name = os.path.basename(sys.argv[0])
         self.logger = self._iniciar_logger()
         self.credentials = self._cargar_credenciales()
         self.driver = None # Se inicializará en run()
         self.global_count = 0
         self.num_members = self._cargar_num_members()
+        self.indice_fecha_unido = None  # email_skool -> fecha_unido más antigua (se carga en run())
+        self.buffer_bd = []  # Registros pendientes de escribir en PostgreSQL
+        self.buffer_bd_desde = time.time()
+        self.db_flush_rows = max(1, self._cargar_entero_env('DB_FLUSH_ROWS', 25))
+        self.db_flush_seconds = max(0, self._cargar_entero_env('DB_FLUSH_SECONDS', 60))
+        # Resultado del último save_page_to_database: si confirmó el commit y, si falló, por qué
+        self.lote_bd_confirmado = False
+        self.ultimo_fallo_bd = None  # 'conexion' | 'datos'
+        self.bd_reintentar_desde = 0.0  # Tras perder la conexión, el buffer espera antes de reintentar
+        # Almacenamiento de cursos: 'wide' (curso_N_* en la tabla principal), 'normalized' o 'both'
+        self.db_courses_mode = os.getenv('DB_COURSES_MODE', 'wide').strip().lower()
+        if self.db_courses_mode not in ('wide', 'normalized', 'both'):
+            self.db_courses_mode = 'wide'
+        self.cursos_ids = {}  # nombre de curso -> course_id en cursos_elite
+        self.tablas_normalizadas_listas = False
+        self.members_batch_js = os.getenv('MEMBERS_BATCH_JS', '1') != '0'  # Leer la página en un solo script
+        self.estado_boton_siguiente = None
+        self.min_delay_seconds = max(0.0, self._cargar_decimal_env('MIN_DELAY_SECONDS', 0.3))  # Cortesía entre navegaciones
+        self._ultima_navegacion = 0.0
+        # Motor de perfiles: 'selenium' (por defecto) o 'http' (cookies de Selenium + JSON de la página)
+        self.profile_engine = os.getenv('PROFILE_ENGINE', 'selenium').strip().lower()
+        # Payloads reales grabados (anonimizados) contra los que se valida el motor HTTP al arrancar;
+        # PROFILE_PAYLOAD_RECORD_DIR graba nuevos desde el camino Selenium
+        self.profile_payloads_dir = os.getenv('PROFILE_PAYLOADS_DIR', os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'benchmark', 'payloads_perfil'))
+        self.payload_record_dir = os.getenv('PROFILE_PAYLOAD_RECORD_DIR', '')
+        self.payloads_por_grabar = max(0, self._cargar_entero_env('PROFILE_PAYLOAD_RECORD_MAX', 5))
+        self.motor_http = self._crear_motor_http() if self.profile_engine == 'http' else None
+        self.perfiles_http_ok = 0
+        self.perfiles_http_fallidos = 0
+        # Modo delta: reutiliza el perfil guardado de miembros sin cambios en su tarjeta
+        self.delta_mode = os.getenv('DELTA_MODE', '0') == '1'
+        self.delta_max_staleness_hours = self._cargar_decimal_env('DELTA_MAX_STALENESS_HOURS', 168)
+        self.snapshots = {}  # email_skool -> último snapshot de perfil
+        self.perfiles_reutilizados = 0
+        # Caché persistente (en PostgreSQL) de emails de membresía; 0 días lo desactiva
+        self.email_cache_ttl_days = self._cargar_decimal_env('EMAIL_CACHE_TTL_DAYS', 14)
+        self.cache_emails = {}  # email_skool -> {'email_gmail', 'verificado'}
+        self.emails_desde_cache = 0
+        # Bloqueo de recursos por CDP y estrategia de carga
+        self.page_load_strategy = os.getenv('PAGE_LOAD_STRATEGY', 'eager').strip().lower()
+        self.block_resources = os.getenv('BLOCK_RESOURCES', '1') != '0'
+        patrones = os.getenv('BLOCKED_URL_PATTERNS', '')
+        self.blocked_url_patterns = [p.strip() for p in patrones.split(',') if p.strip()] or list(self.BLOCKED_URLS)
+        self.reporte_bloqueo = {}  # tipo de página -> (permitidas, bloqueadas) por página
+        # El log 'performance' solo se muestrea en una ventana fija del arranque; al cerrarla no se
+        # vuelve a activar en navegadores nuevos y, en el que lo tenía, se vacía una vez por página para
+        # que chromedriver no lo acumule. BLOCK_REPORT_RECYCLE=1 prefiere reiniciar ese navegador una vez.
+        self.block_report_recycle = os.getenv('BLOCK_REPORT_RECYCLE', '0') == '1'
+        self.perf_log_activo = False
+        self.perf_log_navegador = False
+        self.muestreo_bloqueo_cerrado = False
+        self.lecturas_bloqueo_restantes = 8
+        # Cookies de la sesión autenticada, reutilizadas al reiniciar el navegador.
+        # SESSION_COOKIES_FILE (opcional) las persiste entre procesos; contiene credenciales de sesión.
+        self.session_cookies_file = os.getenv('SESSION_COOKIES_FILE', '')
+        self.cookies_sesion = self._cargar_cookies_archivo()
+        self.sesiones_restauradas = 0
+        # Checkpoint para reanudar ejecuciones interrumpidas (RESUME_MODE=auto|off)
+        self.checkpoint_file = os.getenv('CHECKPOINT_FILE', 'scraper_checkpoint.json')
+        self.resume_mode = os.getenv('RESUME_MODE', 'auto').strip().lower()
+        self.resume_max_age_hours = self._cargar_decimal_env('RESUME_MAX_AGE_HOURS', 12)
+        self.checkpoint = None
+        self.global_count_inicio_pagina = 0
+        self.emails_guardados = set()  # email_skool ya guardados en esta ejecución (o en la reanudada)
+        self.emails_en_csv = set()
+        self.omitidos_pagina = 0
+        self.paginacion_terminada = False
         self._setup_database_connection()
 
         self.header_csv = [
@@ -70,14 +236,52 @@ class SkoolScraper:
         # mover Frase a la última columna
         self.header_csv.append("Frase")
 
+        # Clave interna de cada columna del CSV, resuelta una sola vez para el sumidero
+        mapa_csv = {
+            'Pag': 'pagina', 'Cons_Pag': 'np', 'Cons_Mbro': 'numero', 'Miembro_SK': 'nombre_miembro',
+            'Nivel_SK': 'nivel', 'Email_Gmail': 'email_gmail', 'Ult_Ingreso': 'estado_activo',
+            'Fec_Unido': 'fecha_unido', 'Contribucion': 'contribucion', 'Usuario_SK': 'email_skool',
+            'Localizado': 'localizacion', 'Invito': 'invito', 'Dias': 'permanencia_dias',
+            'Meses': 'permanencia_meses', 'Total_Cursos': 'total_cursos', 'Progreso_Total': 'progreso_total',
+            'Porcentaje_Promedio': 'porcentaje_promedio', 'Estado_Avance': 'estado_avance', 'Frase': 'frase_personal'
+        }
+        for i in range(1, 30):
+            mapa_csv[f"Curso_{i}_Nombre"] = f"curso_{i}_nombre"
+            mapa_csv[f"Curso_{i}_Avance"] = f"curso_{i}_avance"
+        self.claves_csv = [mapa_csv[columna] for columna in self.header_csv]
+        self.sink_csv = None
+        # Subida a Dropbox por partes (upload sessions); opcionalmente incremental página a página
+        self.dropbox_chunk_mb = max(1, self._cargar_entero_env('DROPBOX_CHUNK_MB', 8))
+        self.dropbox_chunk_retries = max(0, self._cargar_entero_env('DROPBOX_CHUNK_RETRIES', 3))
+        self.dropbox_incremental = os.getenv('DROPBOX_INCREMENTAL', '0') == '1'
+        self.subidas_incrementales = {}  # ruta local -> SubidaDropbox abierta
+        # Formatos que se generan y suben: csv, csv.gz, csv.zst, parquet (separados por comas).
+        # El CSV sin comprimir se escribe siempre en local porque el checkpoint y la reanudación lo leen.
+        self.formatos_salida = self._cargar_formatos_salida()
+        self.sinks_extra = []
+
     def _reiniciar_navegador(self):
         """Reinicia el navegador para evitar problemas de memoria"""
+        procesos_chrome = []
+        try:
+            raiz = psutil.Process(self.driver.service.process.pid)
+            procesos_chrome = [raiz] + raiz.children(recursive=True)
+        except Exception:
+            pass
         try:
             if self.driver:
                 self.driver.quit()
                 self.logger.info("🔄 Cerrando navegador para reinicio...")
         except:
             pass
+
+        # Esperar a que los procesos de Chrome terminen (liberan el user-data-dir) en vez de una pausa fija
+        _, vivos = psutil.wait_procs(procesos_chrome, timeout=5)
+        for proceso in vivos:
+            try:
+                proceso.kill()
+            except psutil.NoSuchProcess:
+                pass
         
         # Limpiar directorio temporal
         if hasattr(self, 'user_data_dir') and os.path.exists(self.user_data_dir):
@@ -86,8 +290,6 @@ class SkoolScraper:
             except:
                 pass
         
-        # Esperar antes de reiniciar
-        time.sleep(2)
         return self._iniciar_driver()
 
     def _iniciar_logger(self):
@@ -108,11 +310,104 @@ class SkoolScraper:
         return creds
     
     def _log_memoria(self, etapa: str):
-        """Registra el consumo actual de memoria RAM del proceso de Python."""
+        """Registra el consumo actual de memoria RAM del proceso de Python y del árbol de Chrome."""
         proceso = psutil.Process(os.getpid())
         # Convertimos los bytes de RSS (Resident Set Size) a Megabytes
         mem_ram_mb = proceso.memory_info().rss / (1024 * 1024)
-        self.logger.info(f"📊 [MEMORIA] En '{etapa}': {mem_ram_mb:.2f} MB usados.")
+        mem_chrome_mb = self._memoria_chrome_mb() if self.driver else None
+        detalle_chrome = f" | Chrome: {mem_chrome_mb:.2f} MB" if mem_chrome_mb is not None else ""
+        self.logger.info(f"📊 [MEMORIA] En '{etapa}': {mem_ram_mb:.2f} MB usados.{detalle_chrome}")
+
+    def _memoria_chrome_mb(self):
+        """
+        Suma el RSS de chromedriver y de todos sus descendientes (browser, renderers, GPU...).
+        Las páginas compartidas se cuentan varias veces, así que es una cota superior.
+        """
+        try:
+            raiz = psutil.Process(self.driver.service.process.pid)
+            procesos = [raiz] + raiz.children(recursive=True)
+        except Exception:
+            return None
+        total = 0
+        for proceso in procesos:
+            try:
+                total += proceso.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        total_mb = total / (1024 * 1024)
+        self.pico_memoria_chrome = max(self.pico_memoria_chrome, total_mb)
+        self.pico_memoria_pagina = max(self.pico_memoria_pagina, total_mb)
+        return total_mb
+
+    def _motivo_reciclaje(self):
+        """
+        Devuelve (motivo, tipo) si hay que reciclar el navegador ahora, o (None, None).
+        tipo es 'paginas' (límite fijo), 'memoria' (techo o ritmo de crecimiento) o
+        'muestreo' (fin del log de red del arranque, solo con BLOCK_REPORT_RECYCLE=1).
+        """
+        if self.max_pages_per_session > 0 and self.current_session_pages >= self.max_pages_per_session:
+            return f"límite fijo de {self.max_pages_per_session} páginas por sesión", 'paginas'
+        if self.block_report_recycle and self.perf_log_navegador and self.muestreo_bloqueo_cerrado:
+            return "fin del muestreo de red del arranque (BLOCK_REPORT_RECYCLE=1)", 'muestreo'
+        memoria = self._memoria_chrome_mb()
+        if memoria is None:
+            return None, None
+        if memoria >= self.chrome_mem_limit_mb:
+            return f"memoria de Chrome {memoria:.0f} MB ≥ techo de {self.chrome_mem_limit_mb:.0f} MB", 'memoria'
+        if self.current_session_pages >= 2 and self.memoria_base_sesion is not None:
+            crecimiento = (memoria - self.memoria_base_sesion) / self.current_session_pages
+            if crecimiento >= self.chrome_mem_growth_mb:
+                return (f"crecimiento de {crecimiento:.0f} MB/página ≥ {self.chrome_mem_growth_mb:.0f} MB/página "
+                        f"({memoria:.0f} MB tras {self.current_session_pages} páginas)"), 'memoria'
+        return None, None
+
+    def _reciclaje_ligero(self, profile_tab_handles, motivo):
+        """
+        Nivel barato antes del reinicio completo: recrea las pestañas de perfil (sus renderers
+        concentran el crecimiento) y pide GC y limpieza de caché por CDP. Actualiza la lista de
+        handles en sitio. Devuelve True si la memoria quedó bajo el techo.
+        """
+        antes = self._memoria_chrome_mb()
+        self.logger.info(f"🧽 Reciclaje ligero de pestañas ({motivo})...")
+        try:
+            ventana_miembros = self.driver.current_window_handle
+            for handle in profile_tab_handles:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.get('about:blank')
+                    self.driver.close()
+                except Exception:
+                    pass
+            self.driver.switch_to.window(ventana_miembros)
+            for comando, parametros in (('HeapProfiler.collectGarbage', {}),
+                                        ('Network.clearBrowserCache', {}),
+                                        ('Memory.simulatePressureNotification', {'level': 'critical'})):
+                try:
+                    self.driver.execute_cdp_cmd(comando, parametros)
+                except Exception as e:
+                    self.logger.info(f"CDP {comando} no disponible: {e}")
+            _, nuevos_handles = self._crear_pestanas_perfil()
+            profile_tab_handles[:] = nuevos_handles
+        except InvalidSessionIdException:
+            raise
+        except Exception as e:
+            self.logger.warning(f"⚠️ Falló el reciclaje ligero, se hará reinicio completo: {e}")
+            return False
+
+        # Los renderers cerrados tardan un momento en salir: esperar a que la memoria baje, con límite
+        try:
+            WebDriverWait(self.driver, 3, poll_frequency=0.25).until(
+                lambda d: (self._memoria_chrome_mb() or 0) < self.chrome_mem_limit_mb)
+        except TimeoutException:
+            pass
+        despues = self._memoria_chrome_mb()
+        self.logger.info(f"🧽 Memoria de Chrome: {antes or 0:.0f} MB → {despues or 0:.0f} MB")
+        if despues is None or despues >= self.chrome_mem_limit_mb:
+            return False
+        self.reciclajes_pestanas += 1
+        self.memoria_base_sesion = despues
+        self.current_session_pages = 0
+        return True
 
     def _iniciar_driver(self):
         self.logger.info("🚗 Iniciando el navegador Selenium (Modo Ultra-Bajo Consumo)...")
@@ -163,6 +458,15 @@ class SkoolScraper:
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option("useAutomationExtension", False)
 
+        # --- 2b. CARGA 'EAGER': las esperas explícitas ya definen cuándo la página está lista ---
+        options.page_load_strategy = self.page_load_strategy
+        # Log de red solo en el primer navegador, para el reporte de bloqueo del arranque
+        self.perf_log_activo = self.block_resources and not self.muestreo_bloqueo_cerrado
+        self.perf_log_navegador = self.perf_log_activo
+        if self.perf_log_activo:
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
         # --- 3. AISLAMIENTO DE SESIÓN (Evita archivos bloqueados en Docker) ---
         self.user_data_dir = tempfile.mkdtemp(prefix=f"chrome_{int(time.time())}_")
         options.add_argument(f"--user-data-dir={self.user_data_dir}")
@@ -174,9 +478,12 @@ class SkoolScraper:
                 self._log_memoria("antes de iniciar driver") if hasattr(self, "_log_memoria") else None
                 
                 self.driver = webdriver.Chrome(options=options)
+                if self.contador_comandos is not None:
+                    self.contador_comandos.instrumentar(self.driver)
                 
                 # Script inyectado para enmascarar automatización
                 self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+                self._aplicar_bloqueo_red()
                 
                 self._log_memoria("driver iniciado con éxito") if hasattr(self, "_log_memoria") else None
                 self.logger.info("✅ Navegador en marcha y optimizado.")
@@ -199,6 +506,77 @@ class SkoolScraper:
                 self.logger.error(f"❌ Error crítico inesperado al abrir Chrome: {e}")
                 return False
 
+    def _aplicar_bloqueo_red(self):
+        """
+        Bloquea vía DevTools (Network.setBlockedURLs) fuentes, media, analítica y trackers.
+        Los comandos CDP aplican a la pestaña actual, así que se llama también por cada pestaña nueva.
+        """
+        if not self.block_resources:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns})
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo aplicar el bloqueo de recursos por CDP: {e}")
+
+    def _reporte_bloqueo_completo(self):
+        return all(tipo in self.reporte_bloqueo for tipo in ('login', 'members', 'profile'))
+
+    def _muestrear_bloqueo(self, tipo_pagina, paginas=1):
+        """
+        Cuenta solicitudes permitidas y bloqueadas desde la última lectura del log de red.
+        Solo se registra la primera muestra de cada tipo de página, y el log se lee como mucho
+        `lecturas_bloqueo_restantes` veces: con el reporte completo (o la ventana agotada, p. ej.
+        si la sesión se restauró sin pasar por el login) solo se vacía el log en cada página de
+        miembros, un get_log por página en vez de reiniciar Chrome para apagarlo.
+        """
+        if not self.perf_log_activo:
+            if self.perf_log_navegador and tipo_pagina == 'members':
+                self._vaciar_log_red()
+            return
+        self.lecturas_bloqueo_restantes -= 1
+        try:
+            eventos = self.driver.get_log('performance')
+        except Exception:
+            self._cerrar_muestreo_bloqueo()
+            return
+        if tipo_pagina not in self.reporte_bloqueo and paginas > 0:
+            self._registrar_muestra_bloqueo(tipo_pagina, eventos, paginas)
+        if self._reporte_bloqueo_completo() or self.lecturas_bloqueo_restantes <= 0:
+            self._cerrar_muestreo_bloqueo()
+
+    def _vaciar_log_red(self):
+        """Descarta lo acumulado en el log 'performance' (get_log lo vacía en chromedriver)."""
+        try:
+            self.driver.get_log('performance')
+        except Exception:
+            pass
+
+    def _cerrar_muestreo_bloqueo(self):
+        self.perf_log_activo = False
+        self.muestreo_bloqueo_cerrado = True
+        if self.reporte_bloqueo:
+            resumen = ", ".join(f"{tipo}={p:.0f}/{b:.0f}" for tipo, (p, b) in self.reporte_bloqueo.items())
+            self.logger.info(f"🚫 [BLOQUEO] Reporte de arranque (permitidas/bloqueadas): {resumen}")
+
+    def _registrar_muestra_bloqueo(self, tipo_pagina, eventos, paginas):
+        enviadas = bloqueadas = 0
+        for entrada in eventos:
+            try:
+                mensaje = json.loads(entrada['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            if mensaje.get('method') == 'Network.requestWillBeSent':
+                enviadas += 1
+            elif (mensaje.get('method') == 'Network.loadingFailed'
+                  and mensaje.get('params', {}).get('blockedReason') == 'inspector'):
+                bloqueadas += 1
+        permitidas = (enviadas - bloqueadas) / paginas
+        bloqueadas = bloqueadas / paginas
+        self.reporte_bloqueo[tipo_pagina] = (permitidas, bloqueadas)
+        self.logger.info(f"🚫 [BLOQUEO] '{tipo_pagina}': {permitidas:.0f} solicitudes permitidas, "
+                         f"{bloqueadas:.0f} bloqueadas por página.")
+
     def extract_time(text):
         return text.split()[1] 
     
@@ -222,6 +600,10 @@ class SkoolScraper:
             wait.until(lambda d: "/login" not in d.current_url)
             
             self.logger.info(f"✅ Login exitoso. URL actual: {self.driver.current_url}")
+            self._muestrear_bloqueo('login')
+            self._guardar_cookies_sesion()
+            if self.motor_http is not None:
+                self.motor_http.cargar_cookies(self.driver, self.credentials['email'])
             return True
         except TimeoutException:
             self.logger.error("❌ Timeout durante el login. La página no cargó a tiempo o las credenciales son incorrectas.")
@@ -232,48 +614,286 @@ class SkoolScraper:
             self.logger.error(f"❌ Error inesperado durante el login: {e}", exc_info=True)
             return False
         
+    def _guardar_cookies_sesion(self):
+        """Guarda las cookies de la sesión autenticada (en memoria y, si se configuró, en archivo)."""
+        try:
+            self.cookies_sesion = self.driver.get_cookies()
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudieron leer las cookies de sesión: {e}")
+            return
+        if not self.session_cookies_file:
+            return
+        try:
+            # mkstemp crea siempre un archivo nuevo (nunca un .tmp previo o ajeno con otros permisos)
+            fd, tmp_path = tempfile.mkstemp(prefix='.cookies_sesion_',
+                                            dir=os.path.dirname(os.path.abspath(self.session_cookies_file)))
+            try:
+                os.fchmod(fd, 0o600)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.cookies_sesion, f)
+                os.replace(tmp_path, self.session_cookies_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudieron persistir las cookies de sesión: {e}")
+
+    def _cargar_cookies_archivo(self):
+        if not self.session_cookies_file or not os.path.exists(self.session_cookies_file):
+            return None
+        try:
+            estado = os.stat(self.session_cookies_file)
+            # Cookies legibles por otros usuarios (o de otro dueño) no se usan: login completo y se reescriben 0600
+            if hasattr(os, 'getuid') and (estado.st_mode & 0o077 or estado.st_uid != os.getuid()):
+                self.logger.warning(f"⚠️ Archivo de cookies de sesión con permisos inseguros, se ignora: "
+                                    f"{self.session_cookies_file}")
+                return None
+            with open(self.session_cookies_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Archivo de cookies de sesión ilegible: {e}")
+            return None
+
+    def _restaurar_sesion(self):
+        """
+        En un navegador nuevo, inyecta las cookies de la última sesión y comprueba que Skool
+        las acepte. Solo si las rechaza (o no hay cookies) se hace un login completo.
+        """
+        with self.metricas.medir('login'):
+            return self._restaurar_sesion_o_login()
+
+    def _restaurar_sesion_o_login(self):
+        if self.cookies_sesion:
+            try:
+                url_login = urlparse(self.URLS['login'])
+                # Hay que estar en el dominio para poder añadir sus cookies
+                self.driver.get(f"{url_login.scheme}://{url_login.netloc}/robots.txt")
+                campos = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry', 'sameSite')
+                for cookie in self.cookies_sesion:
+                    try:
+                        self.driver.add_cookie({k: v for k, v in cookie.items() if k in campos})
+                    except Exception:
+                        pass
+                if self._sesion_valida():
+                    self.logger.info("🍪 Sesión restaurada desde cookies, sin re-login.")
+                    self.sesiones_restauradas += 1
+                    self._guardar_cookies_sesion()  # Skool puede haber rotado alguna cookie
+                    if self.motor_http is not None:
+                        self.motor_http.cargar_cookies(self.driver, self.credentials['email'])
+                    return True
+                self.logger.info("🍪 Las cookies guardadas fueron rechazadas. Haciendo login completo...")
+            except Exception as e:
+                self.logger.warning(f"⚠️ No se pudo restaurar la sesión por cookies: {e}")
+        return self.login()
+
+    def _sesion_valida(self):
+        """Sonda de validez: la página de miembros carga sin redirigir a /login."""
+        self.driver.get(self.URLS['members'])
+        try:
+            WebDriverWait(self.driver, 15).until(
+                lambda d: "/login" in d.current_url
+                or d.find_elements(By.CSS_SELECTOR, self.SELECTORS['member_item'])
+            )
+        except TimeoutException:
+            return False
+        return "/login" not in self.driver.current_url
+
+    def _ir_a_pagina_miembros(self, page_number):
+        """
+        Navega a la página de miembros pedida, salvo que la pestaña ya esté en ella: la sonda de
+        _sesion_valida deja cargada la página 1 y no hace falta pedirla otra vez.
+        """
+        actual = urlparse(self.driver.current_url)
+        pagina_actual = parse_qs(actual.query).get('p', ['1'])[0]
+        if self._ruta_url(self.driver.current_url) == self._ruta_url(self.URLS['members']) \
+                and pagina_actual == str(page_number):
+            self.logger.info(f"♻️ Página {page_number} de miembros ya cargada, se reutiliza.")
+            return
+        self._pausa_cortesia()
+        # La primera página no usa el parámetro 'p', las siguientes sí.
+        self.driver.get(f"{self.URLS['members']}?p={page_number}" if page_number > 1 else self.URLS['members'])
+
+    def _primer_slug_pagina(self):
+        """Slug de la primera tarjeta de la lista de miembros (None si aún no hay tarjetas)."""
+        try:
+            return self.driver.execute_script(self.SCRIPTS['primer_slug'], self.SELECTORS['member_item'])
+        except Exception:
+            return None
+
+    def _pagina_cargada(self, page_number, slug_anterior):
+        """
+        La página pedida ya se muestra: la primera tarjeta es otra que antes del clic. Si no se
+        conocía la primera tarjeta, vale que la URL ya tenga p=page_number.
+        """
+        if slug_anterior:
+            slug_actual = self._primer_slug_pagina()
+            return bool(slug_actual) and slug_actual != slug_anterior
+        pagina_actual = parse_qs(urlparse(self.driver.current_url).query).get('p', ['1'])[0]
+        return pagina_actual == str(page_number)
+
     def _cargar_num_members(self):
         # ... (sin cambios)
         try: return int(os.getenv('NUM_MEMBERS', 0))
         except ValueError: return 0
+
+    def _cargar_entero_env(self, nombre, defecto):
+        """Lee una variable de entorno entera, devolviendo el valor por defecto si falta o es inválida."""
+        try: return int(os.getenv(nombre, defecto))
+        except ValueError: return defecto
+
+    def _cargar_formatos_salida(self):
+        """Lee OUTPUT_FORMATS ignorando los formatos desconocidos; por defecto solo 'csv'."""
+        formatos = []
+        for formato in os.getenv('OUTPUT_FORMATS', 'csv').lower().split(','):
+            formato = formato.strip()
+            if formato in self.FORMATOS_SALIDA and formato not in formatos:
+                formatos.append(formato)
+            elif formato:
+                self.logger.warning(f"⚠️ Formato de salida desconocido en OUTPUT_FORMATS: '{formato}'")
+        return formatos or ['csv']
+
+    def _cargar_decimal_env(self, nombre, defecto):
+        """Igual que _cargar_entero_env pero para valores con decimales (segundos, MB, etc.)."""
+        try: return float(os.getenv(nombre, defecto))
+        except ValueError: return defecto
         
     def _setup_database_connection(self):
-        # ... (sin cambios)
+        """Configura el pool de conexiones compartido por todas las rutas de base de datos."""
         self.connection_string = os.getenv('DATABASE_URL')
+        self.db_pool_max = max(1, self._cargar_entero_env('DB_POOL_MAX', 4))
+        self.db_pool = None
+        self._db_ultimo_uso = {}
         try:
-            conn = psycopg2.connect(self.connection_string)
-            conn.close()
+            self._obtener_pool_bd()
             self.logger.info("Conexión a PostgreSQL configurada correctamente")
         except Exception as e:
             self.logger.error(f"Error al conectar a PostgreSQL: {e}")
 
+    def _obtener_pool_bd(self):
+        """Crea el pool de forma perezosa (la BD puede no estar disponible al arrancar)."""
+        if self.db_pool is None or self.db_pool.closed:
+            self.db_pool = psycopg2.pool.ThreadedConnectionPool(
+                1, self.db_pool_max, self.connection_string,
+                keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3
+            )
+        return self.db_pool
+
+    def _conexion_saludable(self, conn):
+        """Comprueba que una conexión del pool siga viva antes de entregarla."""
+        if conn.closed:
+            return False
+        # Solo se hace ping si la conexión lleva un rato ociosa, para no sumar un round trip por uso
+        if time.time() - self._db_ultimo_uso.get(id(conn), 0) < 30:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    @contextmanager
+    def _conexion_bd(self):
+        """
+        Entrega una conexión sana del pool, reconectando de forma transparente si la
+        anterior se cayó. Hace commit al salir sin errores y rollback en caso contrario.
+        """
+        pool = self._obtener_pool_bd()
+        conn = pool.getconn()
+        if not self._conexion_saludable(conn):
+            self.logger.warning("♻️ Conexión a PostgreSQL caída, reconectando...")
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+        descartar = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            descartar = True
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                descartar = True
+            raise
+        finally:
+            self._db_ultimo_uso[id(conn)] = time.time()
+            if descartar or conn.closed:
+                self._db_ultimo_uso.pop(id(conn), None)
+            pool.putconn(conn, close=descartar or bool(conn.closed))
+
+    def _cerrar_pool_bd(self):
+        if self.db_pool is not None and not self.db_pool.closed:
+            try:
+                self.db_pool.closeall()
+                self.logger.info("🔌 Pool de conexiones a PostgreSQL cerrado.")
+            except Exception as e:
+                self.logger.warning(f"⚠️ No se pudo cerrar el pool de PostgreSQL: {e}")
+
     
     def _generar_token_dropbox(self):
-        self.logger.info("🔄 Generando nuevo token de acceso de Dropbox...")
-        data = {"grant_type": "refresh_token", "refresh_token": os.getenv('DROPBOX_REFRESH_TOKEN')}
+        """Token vigente del proveedor compartido (caché en memoria/archivo, renovación anticipada)."""
         try:
-            response = requests.post("https://api.dropboxapi.com/oauth2/token", data=data, auth=(os.getenv('DROPBOX_APP_KEY'), os.getenv('DROPBOX_APP_SECRET')))
-            response.raise_for_status()
-            self.logger.info("🔑 Nuevo token de acceso generado correctamente.")
-            return response.json().get("access_token")
+            return obtener_proveedor_token(self.logger).obtener()
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"❌ Error de red al renovar el token: {e.response.text if e.response else e}")
-            return None
+            detalle = e.response.text if e.response is not None else e
+            self.logger.error(f"❌ Error de red al renovar el token: {detalle}")
+        except Exception as e:
+            self.logger.error(f"❌ No se pudo obtener el token de Dropbox: {e}")
+        return None
 
-    def subir_a_dropbox(self, nombre_archivo):
+    def _cliente_dropbox(self):
         access_token = self._generar_token_dropbox()
-        if not access_token: return
+        if not access_token:
+            raise RuntimeError("No se pudo obtener un token de acceso de Dropbox")
+        return dropbox.Dropbox(access_token)
+
+    def _nueva_subida_dropbox(self, nombre_archivo):
+        return SubidaDropbox(
+            self._cliente_dropbox, nombre_archivo, f"/{os.path.basename(nombre_archivo)}", self.logger,
+            tamano_parte=self.dropbox_chunk_mb * 1024 * 1024, reintentos=self.dropbox_chunk_retries,
+            invalidar_token=obtener_proveedor_token(self.logger).invalidar)
+
+    def _anexar_subida_incremental(self):
+        """Con DROPBOX_INCREMENTAL=1, sube a sus sesiones abiertas las partes completas que ya tienen los archivos de salida."""
+        if not self.dropbox_incremental:
+            return
+        try:
+            # Parquet solo es legible al cerrarse (footer): se sube completo al final
+            no_incrementales = {sink.ruta for sink in self.sinks_extra if not sink.incremental}
+            with self.metricas.medir('subida_incremental'):
+                for ruta in self._rutas_salida():
+                    if ruta in no_incrementales:
+                        continue
+                    if ruta not in self.subidas_incrementales:
+                        self.subidas_incrementales[ruta] = self._nueva_subida_dropbox(ruta)
+                    self.subidas_incrementales[ruta].anexar()
+        except Exception as e:
+            # La subida final por partes sigue funcionando: solo se pierde el adelanto
+            self.logger.warning(f"⚠️ Subida incremental a Dropbox desactivada: {e}")
+            self.dropbox_incremental = False
+            self.subidas_incrementales = {}
+
+    def subir_a_dropbox(self, nombre_archivo):
         if not os.path.exists(nombre_archivo):
             self.logger.error(f"🚫 Archivo local no encontrado: {nombre_archivo}")
             return
         
         self.logger.info(f"☁️ Iniciando subida de '{nombre_archivo}' a Dropbox...")
-        dbx = dropbox.Dropbox(access_token)
-        dropbox_path = f"/{os.path.basename(nombre_archivo)}"
+        subida = self.subidas_incrementales.get(nombre_archivo)
+        if subida is not None:
+            try:
+                total = subida.finalizar()
+                self.logger.info(f"✅ Subida a Dropbox completada ({total} bytes, {subida.partes_subidas} partes, sesión incremental).")
+                return
+            except Exception as e:
+                self.logger.warning(f"⚠️ Falló el cierre de la sesión incremental, se sube el archivo completo: {e}")
         try:
-            with open(nombre_archivo, "rb") as f:
-                dbx.files_upload(f.read(), dropbox_path, mode=dropbox.files.WriteMode.overwrite)
-            self.logger.info("✅ Subida a Dropbox completada exitosamente.")
+            subida = self._nueva_subida_dropbox(nombre_archivo)
+            total = subida.finalizar()
+            self.logger.info(f"✅ Subida a Dropbox completada exitosamente ({total} bytes, {subida.partes_subidas} partes).")
         except Exception as e:
             self.logger.error(f"❌ Error crítico al subir a Dropbox: {e}", exc_info=True)
 
@@ -312,12 +932,57 @@ class SkoolScraper:
         except Exception as e:
             self.logger.error(f"Error registrando estructura miembro: {str(e)}")
 
+    def _cargar_indice_fecha_unido(self):
+        """
+        Construye en una sola consulta el índice email_skool -> fecha_unido más antigua
+        para toda la ejecución, evitando una consulta por miembro.
+        """
+        try:
+            with self._conexion_bd() as conn:
+                with conn.cursor() as cursor:
+                    query = """
+                    SELECT email_skool, MIN(fecha_unido)
+                    FROM public.miembros_activos_elite_cursos
+                    WHERE fecha_unido IS NOT NULL
+                    GROUP BY email_skool
+                    """
+                    cursor.execute(query)
+                    indice = {}
+                    for email_skool, fecha in cursor.fetchall():
+                        if isinstance(fecha, str):
+                            fecha = self._parse_fecha_unido(fecha)
+                        elif isinstance(fecha, date) and not isinstance(fecha, datetime):
+                            fecha = datetime.combine(fecha, datetime.min.time())
+                        if fecha:
+                            indice[email_skool] = fecha
+            self.indice_fecha_unido = indice
+            self.logger.info(f"📇 Índice de fechas de ingreso cargado: {len(indice)} miembros históricos.")
+        except Exception as e:
+            self.indice_fecha_unido = None
+            self.logger.error(f"❌ Error al cargar índice de fechas de ingreso, se consultará por miembro: {e}")
+
+    def _actualizar_indice_fecha_unido(self, registros):
+        """Incorpora al índice las fechas de los miembros recién insertados."""
+        if self.indice_fecha_unido is None:
+            return
+        for registro in registros:
+            email_skool = registro.get('email_skool')
+            fecha = self._parse_fecha_unido(registro.get('fecha_unido'))
+            if not email_skool or not fecha:
+                continue
+            existente = self.indice_fecha_unido.get(email_skool)
+            if existente is None or fecha < existente:
+                self.indice_fecha_unido[email_skool] = fecha
+
     def _obtener_fecha_unido_existente(self, email_skool):
         """
         Obtiene la fecha_unido más antigua de un miembro si ya existe en la base de datos
         """
+        if self.indice_fecha_unido is not None:
+            return self.indice_fecha_unido.get(email_skool)
+
         try:
-            with psycopg2.connect(self.connection_string) as conn:
+            with self._conexion_bd() as conn:
                 with conn.cursor() as cursor:
                     query = """
                     SELECT MIN(fecha_unido) 
@@ -340,88 +1005,127 @@ class SkoolScraper:
             return None
    
     def _extraer_info_miembro(self, miembro_element):
-        data = {'Nivel': 'N/A', 'Miembro': 'N/A', 'EmailSkool': 'N/A', 'Chat': 'N/A', 'Membership': 'N/A', 'Frase': 'N/A', 'Activo': 'N/A', 'Unido': 'N/A', 'Valor': 'N/A', 'Renueva': 'N/A', 'Localiza': 'N/A', 'Invito': 'N/A', 'Invitado': 'N/A', 'Otro': 'N/A'}
         try:
-            #miembros_monitoreo = [                "Ramiro Oliviere"            ]
             parts = [p.strip() for p in miembro_element.text.split('\n') if p.strip()]
-            keys = list(data.keys())
-            for i, part in enumerate(parts):
-                if i < len(keys): data[keys[i]] = part
-
-            #if data['Miembro'] in miembros_monitoreo:
-                #self._log_member_structure(data['Miembro'], parts, miembro_element.text)
-
-            #if data['Miembro'] == 'Danna Sofia Romero - Soporte AntoEcom' or data['Miembro'] == 'Daniel Mancipe - Soporte AntoEcom' or data['Miembro'] == 'Arley Lozano':
-                #print("Debug aquí")
-
-            if data['EmailSkool'].startswith('(Admin)'):
-                data['Otro'] = data['EmailSkool']
-                data['EmailSkool'] = data['Chat']
-                data['Chat'] = data['Membership']
-                data['Membership'] = data['Frase']
-                data['Frase'] = data['Activo']
-                data['Activo'] = data['Unido']
-                data['Unido'] = data['Valor']
-                data['Valor'] = data['Renueva']
-                data['Renueva'] = data['Localiza']
-                data['Localiza'] = data['Invito']
-                data['Invito'] = data['Otro']
-
-            if data['EmailSkool'].startswith('🔥'):
-                data['Unido'] = data['Otro']
-                data['Otro'] = data['EmailSkool']
-                data['EmailSkool'] = data['Chat']
-                data['Chat'] = data['Membership']
-                data['Membership'] = data['Frase']
-                data['Frase'] = data['Activo']
-                data['Activo'] = data['Unido']
-                data['Valor'] = data['Valor']
-                data['Renueva'] = data['Renueva']
-                data['Localiza'] = data['Localiza']
-                data['Invito'] = data['Invito']
-                data['Invitado'] = data['Invitado']
-
-            if data['Frase'].startswith('Active ') or data['Frase'] == '':
-                data['Otro'], data['Renueva'], data['Valor'], data['Unido'], data['Activo'], data['Frase'] = data['Renueva'], data['Valor'], data['Unido'], data['Activo'], data['Frase'], 'N/A'
-            
-            if not (data['Valor'].startswith('$') or data['Valor'].startswith('Free')):
-                data['Otro'] = data['Valor']
-                data['Valor'] = data['Renueva']
-                data['Renueva'] = data['Localiza']
-                data['Localiza'] = data['Otro']
-            
-            if data['Activo'].startswith('Active '):
-                data['Activo'] = data['Activo'].split()[1]
-            if data['Unido'].startswith('Joined '):
-                data['Unido'] = data['Unido'][7:]
-            if data['Valor'].startswith('$'):
-                data['Valor'] = data['Valor'].replace('$', '').replace('/month', '').strip()
-
-
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo leer el texto de un miembro: {e}")
+            parts = []
+        return self._parsear_partes_miembro(parts)
 
+    def _leer_pagina_miembros(self):
+        """
+        Lee en un solo execute_script todas las tarjetas de la página (texto ya partido
+        en líneas y slug del perfil) y el estado del botón Next.
+        Devuelve None si el script falla, para caer al modo elemento por elemento.
+        """
+        try:
+            resultado = self.driver.execute_script(
+                self.SCRIPTS['leer_miembros'], self.SELECTORS['member_item'], self.XPATHS['next_button'])
+            if not resultado or not isinstance(resultado.get('cards'), list):
+                return None
+            return resultado
+        except Exception as e:
+            self.logger.warning(f"⚠️ Lectura por lotes de la página falló, se usa modo por elemento: {e}")
+            return None
 
+    def _parsear_partes_miembro(self, parts):
+        """Clasifica cada línea de la tarjeta por su contenido (ver tarjetas_miembro.REGLAS)."""
+        try:
+            return parsear_tarjeta(parts)
         except Exception as e:
             self.logger.warning(f"⚠️ No se pudo procesar un miembro: {e}")
-        return data
+            return dict.fromkeys(CLAVES_TARJETA, 'N/A')
 
     def _safe_extract(self, by, selector, default):
         try: return self.driver.find_element(by, selector).text.strip()
         except: return default
 
+    def _esperar_texto(self, by, selector, timeout, default):
+        """Espera a que el elemento exista y tenga texto no vacío; si no aparece, devuelve el default."""
+        try:
+            return WebDriverWait(self.driver, timeout).until(
+                lambda d: d.find_element(by, selector).text.strip() or False
+            )
+        except Exception:
+            return default
+
+    def _pausa_cortesia(self):
+        """
+        Garantiza un mínimo de MIN_DELAY_SECONDS entre navegaciones hacia Skool.
+        Es independiente de las esperas de carga: solo duerme lo que falte desde la última.
+        """
+        restante = self.min_delay_seconds - (time.time() - self._ultima_navegacion)
+        if restante > 0:
+            time.sleep(restante)
+        self._ultima_navegacion = time.time()
+
     def _safe_extract_from_element(self, parent, by, selector, default):
         try: return parent.find_element(by, selector).text.strip()
         except: return default
     
-    def _extract_courses_info(self, profile_url, profile_tab_handle):
+    def _crear_pestanas_perfil(self):
+        """Abre el pool de pestañas de perfil y vuelve a la pestaña de miembros."""
         original_window = self.driver.current_window_handle
-        gmail_user, contribution_member = 'NA_Email', 'NA_Contrib'
+        handles = []
+        for _ in range(self.profile_tabs):
+            self.driver.switch_to.new_window('tab')
+            self._aplicar_bloqueo_red()
+            handles.append(self.driver.current_window_handle)
+        self.driver.switch_to.window(original_window)
+        self.logger.info(f"🗂️ Pool de {len(handles)} pestañas de perfil creado.")
+        return original_window, handles
+
+    def _precargar_perfil(self, profile_url, profile_tab_handle):
+        """
+        Lanza la navegación del perfil en su pestaña sin esperar a que cargue,
+        para que varias pestañas descarguen en paralelo mientras se procesa otra.
+        """
+        original_window = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.window(profile_tab_handle)
+            self._pausa_cortesia()
+            self.driver.execute_script("window.location.href = arguments[0];", profile_url)
+            return True
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo precargar {profile_url}: {e}")
+            return False
+        finally:
+            try:
+                self.driver.switch_to.window(original_window)
+            except:
+                pass
+
+    def _ruta_url(self, url):
+        """Ruta de una URL normalizada para comparar pestañas con el perfil pedido."""
+        return urlparse(url or '').path.rstrip('/').lower()
+
+    def _extract_courses_info(self, profile_url, profile_tab_handle, precargado=False, email_cacheado=None):
+        original_window = self.driver.current_window_handle
+        gmail_user, contribution_member = email_cacheado or 'NA_Email', 'NA_Contrib'
         member_data = {'courses': []}  # Inicializar con lista vacía
         
         try:
+            inicio_etapa = time.perf_counter()
             self.logger.info(f"🔀 Cambiando a pestaña de perfil (handle={profile_tab_handle})")
             self.driver.switch_to.window(profile_tab_handle)
-            self.logger.info(f"➡️ Navegando a: {profile_url}")
-            self.driver.get(profile_url)
+            if precargado:
+                # La navegación ya se lanzó en _precargar_perfil. La pestaña reutilizada aún muestra el
+                # perfil anterior (ya cargado): primero esperar a que la URL sea la del perfil pedido
+                # y solo entonces mirar readyState, o se leerían los datos del miembro anterior.
+                ruta_perfil = self._ruta_url(profile_url)
+                try:
+                    WebDriverWait(self.driver, 20).until(
+                        lambda d: self._ruta_url(d.current_url) == ruta_perfil
+                        and d.execute_script("return document.readyState") in ("interactive", "complete")
+                    )
+                except TimeoutException:
+                    self.logger.warning(f"⚠️ La precarga no terminó, navegando de nuevo a: {profile_url}")
+                    self._pausa_cortesia()
+                    self.driver.get(profile_url)
+            else:
+                self.logger.info(f"➡️ Navegando a: {profile_url}")
+                self._pausa_cortesia()
+                self.driver.get(profile_url)
             self.logger.info(f"🌐 URL actual tras get(): {self.driver.current_url}")
             self.logger.info(f"📄 Título de la página: {self.driver.title}")
 
@@ -429,7 +1133,10 @@ class SkoolScraper:
                 WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             except TimeoutException:
                 self.logger.warning(f"⚠️ Timeout cargando perfil: {profile_url}")
+                self.timeouts_perfil += 1
                 return gmail_user, contribution_member, member_data
+            finally:
+                self.metricas.registrar('navegacion_perfil', time.perf_counter() - inicio_etapa)
                 
             #contribution_member = self._safe_extract(By.CSS_SELECTOR, '[class*="styled__TypographyWrapper-sc-70zmwu-0 fFYLQx"]', 'NA_Contrib')
             try:
@@ -439,21 +1146,29 @@ class SkoolScraper:
             except:
                 contribution_member = 'NA_Contrib'
             try:
+                inicio_etapa = time.perf_counter()
                 buttons = WebDriverWait(self.driver, 5).until(
                     EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'button[class*="sc-c1192d50-9"]')))
                 
                 if buttons:
+                    # La espera de 'Membership settings' clickable define cuándo el menú está listo
                     self.driver.execute_script("arguments[0].click();", buttons[-1])
-                    time.sleep(0.5)
 
                     try:
                         WebDriverWait(self.driver, 3).until(
                             EC.element_to_be_clickable((By.XPATH, "//div[contains(text(),'Membership settings')]"))
                         ).click()
                         
-                        time.sleep(1.5)
-                        gmail_user = self._safe_extract(By.CSS_SELECTOR, '[class*="sc-5014102b-1"] span', 'NA_Email')
-                        self.logger.info(f"📧 Email extraído: {gmail_user}")
+                        if email_cacheado:
+                            # Email fresco en caché: no se espera ni se lee el campo del modal, se va directo a Courses
+                            gmail_user = email_cacheado
+                            self.logger.info(f"📧 Email desde caché: {gmail_user}")
+                        else:
+                            gmail_user = self._esperar_texto(By.CSS_SELECTOR, self.SELECTORS['membership_email'], 5, 'NA_Email')
+                            member_data['email_verificado'] = gmail_user != 'NA_Email'
+                            self.logger.info(f"📧 Email extraído: {gmail_user}")
+                        self.metricas.registrar('modal_membresia', time.perf_counter() - inicio_etapa)
+                        inicio_etapa = time.perf_counter()
                         
                         #--------Extracción de cursos--------
                         try:
@@ -466,54 +1181,35 @@ class SkoolScraper:
                             course_tab = visibles[0] if visibles else (course_elements[0] if course_elements else None)
 
                             if course_tab is not None:
+                                # La espera del grid de cursos (leer_cursos) define cuándo la pestaña está lista
                                 self.driver.execute_script("arguments[0].click();", course_tab)
-                                time.sleep(2)
                                 self.logger.info("✅ Click en pestaña Courses realizado")
                                 
                                 try:
-                                    titles = []
-                                    progresses = []
+                                    cursos = []
                                     for intento in range(2):
                                         try:
-                                            titles = WebDriverWait(self.driver, 6).until(
-                                                EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[class*="sc-b7620b6e-4"]'))
-                                            )
-                                            progresses = WebDriverWait(self.driver, 6).until(
-                                                EC.presence_of_all_elements_located((By.CSS_SELECTOR, '[class*="sc-b7620b6e-5"]'))
+                                            # Un solo script por sondeo devuelve [{title, progress}] ya emparejados
+                                            cursos = WebDriverWait(self.driver, 8).until(
+                                                lambda d: d.execute_script(
+                                                    self.SCRIPTS['leer_cursos'],
+                                                    self.SELECTORS['course_title'], self.SELECTORS['course_progress']) or False
                                             )
-                                            if titles:
+                                            if cursos:
                                                 break
                                         except TimeoutException:
                                             if intento == 0:
                                                 self.logger.warning("⏳ Cursos no cargaron a la primera, reintentando click en Courses...")
                                                 self.driver.execute_script("arguments[0].click();", course_tab)
-                                                time.sleep(2)
                                             else:
                                                 raise
 
-                                    self.logger.info(f"📚 Cursos encontrados: {len(titles)} títulos, {len(progresses)} progresos")
-
-                                    progress_total = 0
-                                    member_data['courses'] = []  # Reiniciar la lista
-
-                                    for i, (title_el, progress_el) in enumerate(zip(titles, progresses)):
-                                        title = title_el.text.strip()
-                                        progress_str = progress_el.text.strip()
-
-                                        clean_str = progress_str.replace('(', '').replace(')', '').replace(' progress', '').strip()
-                                        progress_value = int(clean_str.strip('%')) if '%' in clean_str else 0
-                                        progress_total += progress_value
-
-                                        member_data['courses'].append({
-                                            'Nro_Curso': i + 1,
-                                            'Curso': title,
-                                            'Avance_Curso': progress_str,
-                                            'Vr. Progreso': progress_value,
-                                            'Total': progress_total,
-                                            '% Avance': (progress_total * 100) / 25  # Ajustado para 25 cursos
-                                        })
+                                    self.logger.info(f"📚 Cursos encontrados: {len(cursos)}")
+                                    member_data['courses'] = self._armar_cursos(cursos)
+                                    self.metricas.registrar('pestana_cursos', time.perf_counter() - inicio_etapa)
 
                                 except TimeoutException:
+                                    self.timeouts_perfil += 1
                                     self.logger.error("⚠️ Timeout extrayendo información de cursos", exc_info=True)
                                     try:
                                         self.driver.save_screenshot("debug_courses_timeout.png")
@@ -534,6 +1230,7 @@ class SkoolScraper:
                             #--------Fin extracción cursos--------
                         
                     except TimeoutException:
+                        self.timeouts_perfil += 1
                         self.logger.error("⚠️ Timeout en membership settings", exc_info=True)
                         
             except Exception as e:
@@ -542,17 +1239,228 @@ class SkoolScraper:
         except Exception as e:
             self.logger.error(f"Error extrayendo información del perfil: {e}")
         finally:
+            self._grabar_payload_perfil(profile_url, gmail_user, contribution_member, member_data)
             try:
                 # Cerrar cualquier modal (Courses / Membership settings) que haya quedado abierto,
-                # para que no se vea "fantasma" al navegar al siguiente perfil.
+                # para que no se vea "fantasma" al navegar al siguiente perfil. No hace falta esperar:
+                # la siguiente navegación de esta pestaña reemplaza la página completa.
                 self.driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.ESCAPE)
-                time.sleep(0.3)
             except:
                 pass
             self.driver.switch_to.window(original_window)
         
         return gmail_user, contribution_member, member_data
 
+    def _armar_cursos(self, cursos):
+        """Convierte [{title, progress}] (Selenium o HTTP) en la estructura de cursos del registro."""
+        progress_total = 0
+        resultado = []
+        for i, curso in enumerate(cursos):
+            title = (curso.get('title') or '').strip()
+            progress_str = (curso.get('progress') or '').strip()
+
+            clean_str = progress_str.replace('(', '').replace(')', '').replace(' progress', '').strip()
+            progress_value = int(clean_str.strip('%')) if '%' in clean_str else 0
+            progress_total += progress_value
+
+            resultado.append({
+                'Nro_Curso': i + 1,
+                'Curso': title,
+                'Avance_Curso': progress_str,
+                'Vr. Progreso': progress_value,
+                'Total': progress_total,
+                '% Avance': (progress_total * 100) / 25  # Ajustado para 25 cursos
+            })
+        return resultado
+
+    def _huella_tarjeta(self, info_miembro):
+        """
+        Huella de los campos de la tarjeta que delatan un cambio del miembro. Solo campos estables:
+        'Activo' ("Active 3h ago") y 'Renueva' ("Renews in 12 days") son relativos a la hora de
+        lectura y cambiarían la huella en cada ejecución.
+        """
+        campos = [str(info_miembro.get(k, '')) for k in ('Nivel', 'Unido', 'Valor')]
+        return hashlib.sha1('\x1f'.join(campos).encode('utf-8')).hexdigest()
+
+    def _perfil_desde_snapshot(self, info_miembro, huella):
+        """
+        Modo delta: devuelve el perfil guardado si la tarjeta no cambió (o si ya tenía todos
+        los cursos al 100%) y el snapshot no supera DELTA_MAX_STALENESS_HOURS. Si no, None.
+        """
+        if not self.delta_mode:
+            return None
+        snapshot = self.snapshots.get(info_miembro.get('EmailSkool'))
+        if not snapshot or snapshot['email_gmail'] in (None, 'NA_Email'):
+            return None
+        if datetime.now() - snapshot['refrescado'] > timedelta(hours=self.delta_max_staleness_hours):
+            return None
+        cursos = snapshot['cursos'] or []
+        completo = bool(cursos) and all(curso.get('Vr. Progreso', 0) >= 100 for curso in cursos)
+        if snapshot['huella'] != huella and not completo:
+            return None
+        self.perfiles_reutilizados += 1
+        return snapshot['email_gmail'], snapshot['contribucion'], {'courses': cursos, 'refrescado': snapshot['refrescado']}
+
+    def _cargar_snapshots(self):
+        """Carga en una sola consulta el último snapshot de perfil de cada miembro (modo delta)."""
+        try:
+            with self._conexion_bd() as conn:
+                with conn.cursor() as cursor:
+                    self._asegurar_tabla_snapshots(cursor)
+                    cursor.execute(
+                        "SELECT email_skool, huella, email_gmail, contribucion, cursos, refrescado FROM miembros_elite_snapshot"
+                    )
+                    self.snapshots = {
+                        email: {'huella': huella, 'email_gmail': gmail, 'contribucion': contribucion,
+                                'cursos': cursos if isinstance(cursos, list) else json.loads(cursos or '[]'),
+                                'refrescado': refrescado}
+                        for email, huella, gmail, contribucion, cursos, refrescado in cursor.fetchall()
+                    }
+            self.logger.info(f"🧬 Modo delta: {len(self.snapshots)} snapshots de perfil cargados.")
+        except Exception as e:
+            self.snapshots = {}
+            self.logger.error(f"❌ No se pudieron cargar los snapshots, se visitarán todos los perfiles: {e}")
+
+    def _asegurar_tabla_snapshots(self, cursor):
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS miembros_elite_snapshot (
+            email_skool TEXT PRIMARY KEY,
+            huella TEXT NOT NULL,
+            email_gmail TEXT,
+            contribucion TEXT,
+            cursos JSONB,
+            refrescado TIMESTAMP NOT NULL
+        )
+        """)
+
+    def _guardar_snapshots(self, cursor, page_data_dicts):
+        """Actualiza (upsert en un solo round trip) el snapshot de los miembros del lote."""
+        filas = {}
+        for member_dict in page_data_dicts:
+            email = member_dict.get('email_skool')
+            if not email or email == 'N/A' or '_huella' not in member_dict:
+                continue
+            filas[email] = (email, member_dict['_huella'], member_dict.get('email_gmail'),
+                            member_dict.get('contribucion'), json.dumps(member_dict.get('_cursos', []), ensure_ascii=False),
+                            member_dict['_refrescado'])
+        if not filas:
+            return
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO miembros_elite_snapshot (email_skool, huella, email_gmail, contribucion, cursos, refrescado)
+            VALUES %s
+            ON CONFLICT (email_skool) DO UPDATE SET
+                huella = EXCLUDED.huella, email_gmail = EXCLUDED.email_gmail,
+                contribucion = EXCLUDED.contribucion, cursos = EXCLUDED.cursos, refrescado = EXCLUDED.refrescado
+        """, list(filas.values()), template="(%s, %s, %s, %s, %s::jsonb, %s)")
+
+    def _email_membresia_cacheado(self, email_skool):
+        """Devuelve el email de membresía en caché si se verificó hace menos de EMAIL_CACHE_TTL_DAYS."""
+        entrada = self.cache_emails.get(email_skool)
+        if not entrada or self.email_cache_ttl_days <= 0:
+            return None
+        if datetime.now() - entrada['verificado'] > timedelta(days=self.email_cache_ttl_days):
+            return None
+        self.emails_desde_cache += 1
+        return entrada['email_gmail']
+
+    def _cargar_cache_emails(self):
+        """
+        Carga el caché persistente de emails de membresía. La primera vez se siembra desde
+        el histórico (último email real de cada miembro); luego solo lo actualizan extracciones reales.
+        """
+        try:
+            with self._conexion_bd() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS miembros_elite_email_cache (
+                        email_skool TEXT PRIMARY KEY,
+                        email_gmail TEXT NOT NULL,
+                        verificado TIMESTAMP NOT NULL
+                    );
+                    """)
+                    # La siembra ordena todo el histórico: solo se hace con el caché recién creado o vacío
+                    cursor.execute("SELECT EXISTS (SELECT 1 FROM miembros_elite_email_cache)")
+                    if not cursor.fetchone()[0]:
+                        cursor.execute("""
+                        INSERT INTO miembros_elite_email_cache (email_skool, email_gmail, verificado)
+                        SELECT DISTINCT ON (email_skool) email_skool, email_gmail, fecha_ejecucion
+                        FROM public.miembros_activos_elite_cursos
+                        WHERE email_gmail IS NOT NULL AND email_gmail <> 'NA_Email' AND fecha_ejecucion IS NOT NULL
+                        ORDER BY email_skool, fecha_ejecucion DESC
+                        ON CONFLICT (email_skool) DO NOTHING;
+                        """)
+                        self.logger.info(f"🌱 Caché de emails sembrado desde el histórico: {cursor.rowcount} miembros.")
+                    cursor.execute("SELECT email_skool, email_gmail, verificado FROM miembros_elite_email_cache")
+                    self.cache_emails = {
+                        email_skool: {'email_gmail': email_gmail, 'verificado': verificado}
+                        for email_skool, email_gmail, verificado in cursor.fetchall()
+                    }
+            self.logger.info(f"📬 Caché de emails de membresía cargado: {len(self.cache_emails)} miembros.")
+        except Exception as e:
+            self.cache_emails = {}
+            self.logger.error(f"❌ No se pudo cargar el caché de emails, se abrirá el modal siempre: {e}")
+
+    def _guardar_cache_emails(self, cursor, page_data_dicts):
+        """Refresca en el caché solo los emails extraídos de verdad en este lote."""
+        filas = {}
+        for member_dict in page_data_dicts:
+            email_skool = member_dict.get('email_skool')
+            if member_dict.get('_email_verificado') and email_skool and email_skool != 'N/A':
+                filas[email_skool] = (email_skool, member_dict.get('email_gmail'), member_dict.get('fecha_ejecucion'))
+        if not filas:
+            return
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO miembros_elite_email_cache (email_skool, email_gmail, verificado)
+            VALUES %s
+            ON CONFLICT (email_skool) DO UPDATE SET
+                email_gmail = EXCLUDED.email_gmail, verificado = EXCLUDED.verificado
+        """, list(filas.values()))
+
+    def _crear_motor_http(self):
+        """
+        El motor HTTP solo se usa si todos los payloads reales grabados se parsean igual que con
+        Selenium. Sin grabaciones (o con alguna distinta) los perfiles siguen por Selenium.
+        """
+        motor = SkoolHttpEngine(self.logger, pool_size=self.profile_tabs * 2)
+        validos, total = motor.validar_grabaciones(self.profile_payloads_dir)
+        if total and validos == total:
+            self.logger.info(f"⚡ Motor HTTP validado con {total} payloads grabados.")
+            return motor
+        self.logger.warning(f"⚠️ PROFILE_ENGINE=http sin payloads reales validados ({validos}/{total} en "
+                            f"'{self.profile_payloads_dir}'): se usa Selenium. Grabar con PROFILE_PAYLOAD_RECORD_DIR.")
+        motor.cerrar()
+        return None
+
+    def _grabar_payload_perfil(self, profile_url, gmail_user, contribution_member, member_data):
+        """Guarda el __NEXT_DATA__ de la pestaña actual con lo que extrajo Selenium (PROFILE_PAYLOAD_RECORD_DIR)."""
+        if (not self.payload_record_dir or self.payloads_por_grabar <= 0
+                or '@' not in gmail_user or not member_data.get('courses')):
+            return
+        try:
+            esperado = {
+                'email': gmail_user, 'contribucion': contribution_member,
+                'cursos': [{'title': c['Curso'], 'progress': c['Avance_Curso']} for c in member_data['courses']],
+            }
+            ruta = grabar_payload(self.driver.page_source, profile_url, esperado, self.payload_record_dir)
+            if ruta:
+                self.payloads_por_grabar -= 1
+                self.logger.info(f"🎙️ Payload de perfil grabado (anonimizado): {ruta}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo grabar el payload de {profile_url}: {e}")
+
+    def _extraer_perfil_http(self, profile_url):
+        """Intenta el perfil por HTTP; devuelve None para caer a Selenium."""
+        if self.motor_http is None:
+            return None
+        perfil = self.motor_http.extraer_perfil(profile_url)
+        if perfil is None:
+            self.perfiles_http_fallidos += 1
+            return None
+        gmail_user, contribution_member, cursos = perfil
+        self.perfiles_http_ok += 1
+        self.logger.info(f"⚡ Perfil extraído por HTTP: {profile_url}")
+        return gmail_user, contribution_member, {'courses': self._armar_cursos(cursos), 'email_verificado': True}
+
     def _parse_fecha_unido(self, fecha_str):
         try:
             if isinstance(fecha_str, datetime):
@@ -572,41 +1480,106 @@ class SkoolScraper:
     # --- NUEVAS FUNCIONES DE GUARDADO INCREMENTAL CON MEJORES EN MANEJO DE CONEXIÓN ---
     
     def save_page_to_csv(self, page_data_dicts, file_path):
-        """Añade los datos de una página al archivo CSV."""
+        """Añade registros al CSV (y a los formatos extra de OUTPUT_FORMATS) a través de sumideros abiertos toda la ejecución."""
+        with self.metricas.medir('escritura_csv'):
+            try:
+                if self.sink_csv is None or not self.sink_csv.abierto or self.sink_csv.ruta != file_path:
+                    self._abrir_sink_csv(file_path, nuevo=False)
+                self.sink_csv.escribir(page_data_dicts)
+                self.logger.info(f"💾 Se añadieron {len(page_data_dicts)} registros al CSV.")
+            except Exception as e:
+                self.logger.error(f"❌ Error al guardar página en CSV: {e}", exc_info=True)
+            for sink in list(self.sinks_extra):
+                try:
+                    sink.escribir(page_data_dicts)
+                except Exception as e:
+                    self._descartar_sink_extra(sink, e)
+
+    def _abrir_sink_csv(self, file_path, nuevo):
+        """Abre el CSV una sola vez: nuevo=True escribe el encabezado, False continúa el archivo."""
+        self._cerrar_sink(self.sink_csv)
+        self.sink_csv = SumideroCSV(file_path, self.header_csv, self.claves_csv, self.logger).abrir(nuevo)
+
+    def _abrir_sinks_extra(self, reconstruir):
+        """
+        Abre un sumidero por cada formato extra de OUTPUT_FORMATS (csv.gz, csv.zst, parquet).
+        Se generan completos en cada ejecución: al reanudar se reconstruyen primero desde el CSV.
+        Si falta la dependencia opcional de un formato, se avisa y se sigue sin él.
+        """
+        for sink in self.sinks_extra:
+            self._cerrar_sink(sink)
+        self.sinks_extra = []
+        for formato in self.formatos_salida:
+            if formato == 'csv':
+                continue
+            sink = None
+            try:
+                sink = self._crear_sink_extra(formato, self._ruta_salida(formato)).abrir(nuevo=True)
+                if reconstruir:
+                    self._reconstruir_desde_csv(sink)
+                self.sinks_extra.append(sink)
+                self.logger.info(f"🗜️ Salida {formato} activada: {os.path.basename(sink.ruta)}")
+                if self.dropbox_incremental and not sink.incremental:
+                    self.logger.info(f"ℹ️ La salida {formato} no admite DROPBOX_INCREMENTAL: se subirá completa al final.")
+            except Exception as e:
+                self.logger.warning(f"⚠️ No se generará la salida {formato}: {e}")
+                self._cerrar_sink(sink)
+
+    def _crear_sink_extra(self, formato, ruta):
+        if formato == 'csv.gz':
+            return SumideroCSVGzip(ruta, self.header_csv, self.claves_csv, self.logger)
+        if formato == 'csv.zst':
+            return SumideroCSVZstd(ruta, self.header_csv, self.claves_csv, self.logger)
+        return SumideroParquet(
+            ruta, self.header_csv, self.claves_csv, self.logger,
+            columnas_enteras=('Pag', 'Cons_Pag', 'Cons_Mbro', 'Dias', 'Meses', 'Total_Cursos', 'Progreso_Total'),
+            columnas_decimales=('Porcentaje_Promedio',),
+            # Los nombres de curso y los avances se repiten en casi todas las filas
+            columnas_diccionario=[c for c in self.header_csv if c.startswith('Curso_')] + ['Estado_Avance', 'Nivel_SK'])
+
+    def _reconstruir_desde_csv(self, sink):
+        """Vuelca en un sumidero recién abierto las filas que ya tiene el CSV (reanudación)."""
+        if not os.path.exists(self.full_path):
+            return
+        with open(self.full_path, 'r', newline='', encoding='utf-8-sig') as f:
+            lector = csv.reader(f)
+            next(lector, None)  # encabezado
+            filas = sink.escribir_filas(fila for fila in lector if fila)
+        self.logger.info(f"♻️ {os.path.basename(sink.ruta)} reconstruido con {filas} filas del CSV existente.")
+
+    def _ruta_salida(self, formato):
+        return os.path.splitext(self.full_path)[0] + self.FORMATOS_SALIDA[formato]
+
+    def _rutas_salida(self):
+        """Archivos a subir según OUTPUT_FORMATS; si ningún formato pudo generarse, el CSV."""
+        rutas = ([self.full_path] if 'csv' in self.formatos_salida else []) + [sink.ruta for sink in self.sinks_extra]
+        return rutas or [self.full_path]
+
+    def _descartar_sink_extra(self, sink, error):
+        # Un formato extra que falla no debe frenar el CSV ni la BD: se deja de generar y no se sube
+        self.logger.error(f"❌ Error al escribir {os.path.basename(sink.ruta)}, se descarta esa salida: {error}")
+        self.sinks_extra.remove(sink)
+        self.subidas_incrementales.pop(sink.ruta, None)
+        self._cerrar_sink(sink)
+
+    def _cerrar_sinks(self):
+        self._cerrar_sink(self.sink_csv)
+        for sink in self.sinks_extra:
+            self._cerrar_sink(sink)
+
+    def _cerrar_sink(self, sink):
+        if sink is None:
+            return
         try:
-            with open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=self.header_csv, extrasaction='ignore')
-                
-                # Mapeo de claves internas a las del header del CSV
-                key_map = {
-                    'pagina': 'Pag', 'np': 'Cons_Pag', 'numero': 'Cons_Mbro', 'nombre_miembro': 'Miembro_SK',
-                    'nivel': 'Nivel_SK', 'email_gmail': 'Email_Gmail', 'estado_activo': 'Ult_Ingreso',
-                    'fecha_unido': 'Fec_Unido', 'valor_membresia': 'Valor', 'contribucion': 'Contribucion',
-                    'renueva': 'Renueva', 'email_skool': 'Usuario_SK', 'frase_personal': 'Frase',
-                    'localizacion': 'Localizado', 'invito': 'Invito', 'permanencia_dias': 'Dias',
-                    'permanencia_meses': 'Meses', 'total_cursos': 'Total_Cursos', 
-                    'progreso_total': 'Progreso_Total', 'porcentaje_promedio': 'Porcentaje_Promedio',
-                    'estado_avance': 'Estado_Avance'
-                }
-                
-                # Agregar mapeo para los cursos
-                for i in range(1, 30):
-                    key_map[f'curso_{i}_nombre'] = f'Curso_{i}_Nombre'
-                    key_map[f'curso_{i}_avance'] = f'Curso_{i}_Avance'
-                    key_map[f'curso_{i}_progreso'] = f'Curso_{i}_Progreso'
-                
-                datos_para_csv = []
-                for row_interno in page_data_dicts:
-                    row_csv = {csv_key: row_interno.get(internal_key) for internal_key, csv_key in key_map.items()}
-                    datos_para_csv.append(row_csv)
-                
-                writer.writerows(datos_para_csv)
-            self.logger.info(f"💾 Se añadieron {len(page_data_dicts)} registros al CSV.")
+            sink.cerrar()
         except Exception as e:
-            self.logger.error(f"❌ Error al guardar página en CSV: {e}", exc_info=True)
+            self.logger.error(f"❌ Error al cerrar {os.path.basename(sink.ruta)}: {e}")
 
     def save_page_to_database(self, page_data_dicts):
         """Guarda los datos de una página en PostgreSQL con reconexión automática."""
+        # Antes de cualquier otra cosa: una interrupción desde aquí hasta el commit no debe
+        # encontrar el True del lote anterior (el buffer descartaría filas no guardadas)
+        self.lote_bd_confirmado = False
         if not page_data_dicts: return
 
         # Obtener timestamp de esta ejecución
@@ -623,9 +1596,10 @@ class SkoolScraper:
             'total_cursos', 'progreso_total', 'porcentaje_promedio', 'estado_avance'
         ]
 
-        # Agregar las columnas para los 29 cursos
-        for i in range(1, 30):
-            column_order.extend([f'curso_{i}_nombre', f'curso_{i}_avance', f'curso_{i}_progreso'])
+        # Agregar las columnas para los 29 cursos (en modo 'normalized' van solo a la tabla hija)
+        if self.db_courses_mode != 'normalized':
+            for i in range(1, 30):
+                column_order.extend([f'curso_{i}_nombre', f'curso_{i}_avance', f'curso_{i}_progreso'])
         
         # Agregar la fecha de ejecución al final
         column_order.append('fecha_ejecucion')
@@ -644,8 +1618,8 @@ class SkoolScraper:
                 if f'curso_{i}_progreso' not in member_dict:
                     member_dict[f'curso_{i}_progreso'] = None
             
-            # Agregar la fecha de ejecución actual
-            member_dict['fecha_ejecucion'] = fecha_ejecucion_actual
+            # Agregar la fecha de ejecución (la del encolado si el registro pasó por el buffer)
+            member_dict['fecha_ejecucion'] = member_dict.get('fecha_ejecucion') or fecha_ejecucion_actual
             
             # Crear la tupla en el orden correcto
             row_tuple = tuple(member_dict.get(col) for col in column_order)
@@ -653,36 +1627,193 @@ class SkoolScraper:
 
         max_retries = 3
         retry_count = 0
+        self.ultimo_fallo_bd = None
         
         while retry_count < max_retries:
             try:
-                # Crear una nueva conexión para cada intento
-                with psycopg2.connect(self.connection_string) as conn:
+                # Tomar una conexión del pool (se descarta y reconecta si está caída)
+                with self._conexion_bd() as conn:
                     with conn.cursor() as cursor:
-                        # Construir la consulta dinámicamente
+                        # COPY ... FROM STDIN: un solo round trip para todo el lote
                         columns = ", ".join(column_order)
-                        placeholders = ", ".join(["%s"] * len(column_order))
-                        query = f"""
-                        INSERT INTO miembros_activos_elite_cursos(
-                            {columns}
-                        ) VALUES ({placeholders})
-                        """
-                        cursor.executemany(query, datos_para_insertar)
-                        self.logger.info(f"🗃️ Se guardaron {len(datos_para_insertar)} registros en PostgreSQL.")
-                        return True  # Éxito, salir del bucle de reintentos
+                        query = f"COPY miembros_activos_elite_cursos ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+                        cursor.copy_expert(query, self._filas_a_csv_copy(datos_para_insertar))
+                        nuevos_cursos = {}
+                        if self.db_courses_mode in ('normalized', 'both'):
+                            nuevos_cursos = self._guardar_progreso_normalizado(cursor, page_data_dicts)
+                        if self.delta_mode:
+                            self._guardar_snapshots(cursor, page_data_dicts)
+                        if self.email_cache_ttl_days > 0:
+                            self._guardar_cache_emails(cursor, page_data_dicts)
+                # El caché de cursos y el índice solo se actualizan tras el commit
+                self.lote_bd_confirmado = True
+                if self.db_courses_mode in ('normalized', 'both'):
+                    self.tablas_normalizadas_listas = True
+                self.cursos_ids.update(nuevos_cursos)
+                self.logger.info(f"🗃️ Se guardaron {len(datos_para_insertar)} registros en PostgreSQL.")
+                self._actualizar_indice_fecha_unido(page_data_dicts)
+                return True  # Éxito, salir del bucle de reintentos
             except psycopg2.OperationalError as e:
                 retry_count += 1
+                self.reintentos_bd += 1
                 self.logger.warning(f"⚠️ Error de conexión a PostgreSQL (intento {retry_count}/{max_retries}): {e}")
                 if retry_count < max_retries:
                     self.logger.info("🔄 Esperando 5 segundos antes de reintentar...")
                     time.sleep(5)  # Esperar antes de reintentar
             except Exception as e:
                 self.logger.error(f"❌ Error al guardar página en PostgreSQL: {e}", exc_info=True)
+                self.ultimo_fallo_bd = 'datos'
                 return False  # Error no relacionado con la conexión
         
         self.logger.error(f"❌ No se pudo guardar en PostgreSQL después de {max_retries} intentos.")
+        self.ultimo_fallo_bd = 'conexion'
         return False
-    
+
+    def _asegurar_tablas_normalizadas(self, cursor):
+        """Crea (si no existen) la dimensión de cursos y la tabla de progreso por miembro."""
+        if self.tablas_normalizadas_listas:
+            return
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cursos_elite (
+            course_id SERIAL PRIMARY KEY,
+            nombre TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS miembros_elite_cursos_progreso (
+            ejecucion TIMESTAMP NOT NULL,
+            email_skool TEXT NOT NULL,
+            course_id INTEGER NOT NULL REFERENCES cursos_elite(course_id),
+            nro_curso SMALLINT,
+            avance TEXT,
+            progreso SMALLINT
+        );
+        CREATE INDEX IF NOT EXISTS idx_cursos_progreso_email
+            ON miembros_elite_cursos_progreso (email_skool, course_id);
+        """)
+
+    def _guardar_progreso_normalizado(self, cursor, page_data_dicts):
+        """
+        Escribe el progreso de cursos en formato largo (ejecución, miembro, curso, progreso)
+        con un único COPY. Devuelve los ids de cursos nuevos resueltos en esta transacción.
+        """
+        self._asegurar_tablas_normalizadas(cursor)
+
+        filas = []
+        for member_dict in page_data_dicts:
+            for i in range(1, 30):
+                nombre = member_dict.get(f'curso_{i}_nombre')
+                if not nombre:
+                    break
+                filas.append((member_dict.get('email_skool'), nombre, i,
+                              member_dict.get(f'curso_{i}_avance'), member_dict.get(f'curso_{i}_progreso')))
+        if not filas:
+            return {}
+
+        # Resolver los ids de los cursos que todavía no están en el caché
+        nuevos_cursos = {}
+        for nombre in sorted({fila[1] for fila in filas} - set(self.cursos_ids)):
+            cursor.execute(
+                "INSERT INTO cursos_elite (nombre) VALUES (%s) "
+                "ON CONFLICT (nombre) DO UPDATE SET nombre = EXCLUDED.nombre RETURNING course_id",
+                (nombre,)
+            )
+            nuevos_cursos[nombre] = cursor.fetchone()[0]
+        ids = {**self.cursos_ids, **nuevos_cursos}
+
+        filas_copy = [(self.start_time, email, ids[nombre], nro, avance, progreso)
+                      for email, nombre, nro, avance, progreso in filas]
+        cursor.copy_expert(
+            "COPY miembros_elite_cursos_progreso (ejecucion, email_skool, course_id, nro_curso, avance, progreso) "
+            "FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            self._filas_a_csv_copy(filas_copy)
+        )
+        return nuevos_cursos
+
+    def _filas_a_csv_copy(self, filas):
+        """Serializa las filas en CSV para COPY, usando \\N como NULL."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for fila in filas:
+            writer.writerow(['\\N' if valor is None else valor for valor in fila])
+        buffer.seek(0)
+        return buffer
+
+    def _encolar_registro_bd(self, registro_dict):
+        """
+        Acumula un registro para la base de datos y vacía el buffer cada
+        DB_FLUSH_ROWS registros o DB_FLUSH_SECONDS segundos.
+        """
+        registro_dict['fecha_ejecucion'] = datetime.now()
+        if not self.buffer_bd:
+            self.buffer_bd_desde = time.time()
+        self.buffer_bd.append(registro_dict)
+        if time.time() < self.bd_reintentar_desde:
+            return
+        if (len(self.buffer_bd) >= self.db_flush_rows
+                or time.time() - self.buffer_bd_desde >= self.db_flush_seconds):
+            self._vaciar_buffer_bd()
+
+    def _vaciar_buffer_bd(self):
+        """
+        Escribe en PostgreSQL los registros pendientes del buffer. Nada se pierde por una
+        interrupción (SIGTERM a mitad del COPY) ni por la conexión: el lote vuelve al buffer.
+        Si el lote falla por sus datos, se reintenta fila a fila y solo se descarta la fila mala.
+        """
+        if not self.buffer_bd:
+            return True
+        pendientes = self.buffer_bd
+        self.buffer_bd = []
+        fila_a_fila = False
+        try:
+            with self.metricas.medir('escritura_bd'):
+                self.lote_bd_confirmado = False
+                guardado = self.save_page_to_database(pendientes)
+                if not guardado and self.ultimo_fallo_bd == 'datos' and len(pendientes) > 1:
+                    fila_a_fila = True
+                    guardado = self._guardar_fila_a_fila(pendientes)
+        except BaseException:
+            # SystemExit/KeyboardInterrupt no los atrapa save_page_to_database: sin commit, se conserva
+            # el lote (fila a fila, pendientes ya contiene solo las filas no guardadas)
+            if fila_a_fila or not self.lote_bd_confirmado:
+                self.buffer_bd = pendientes + self.buffer_bd
+            raise
+        if guardado:
+            self.bd_reintentar_desde = 0.0
+            return True
+        if self.ultimo_fallo_bd == 'conexion':
+            self.buffer_bd = pendientes + self.buffer_bd
+            self.buffer_bd_desde = time.time()
+            self.bd_reintentar_desde = time.time() + self.db_flush_seconds
+            self.logger.warning(f"⚠️ {len(self.buffer_bd)} registros siguen en el buffer hasta que vuelva la conexión a PostgreSQL.")
+        elif not fila_a_fila:
+            self.logger.warning(f"⚠️ No se pudo guardar en BD el registro {pendientes[0].get('email_skool')}, se descarta.")
+        return False
+
+    def _guardar_fila_a_fila(self, pendientes):
+        """
+        Aísla las filas que rompen el COPY del lote; devuelve True si todas se guardaron.
+        Consume `pendientes` en sitio: al volver (o ante una interrupción) solo quedan las filas
+        sin guardar, que _vaciar_buffer_bd devuelve al buffer si se perdió la conexión.
+        """
+        self.logger.warning(f"🔍 Reintentando fila a fila los {len(pendientes)} registros del lote rechazado...")
+        descartados = []
+        while pendientes:
+            try:
+                self.lote_bd_confirmado = False
+                guardado = self.save_page_to_database(pendientes[:1])
+            except BaseException:
+                if self.lote_bd_confirmado:
+                    pendientes.pop(0)
+                raise
+            if not guardado and self.ultimo_fallo_bd == 'conexion':
+                return False
+            registro = pendientes.pop(0)
+            if not guardado:
+                descartados.append(registro)
+        if descartados:
+            self.logger.warning(f"⚠️ Se descartaron {len(descartados)} registros que PostgreSQL rechaza "
+                                f"({', '.join(str(r.get('email_skool')) for r in descartados)})")
+        return not descartados
+
     # se agrega funcion calcular estado de avance
     def _calcular_estado_avance(self, permanencia_dias, porcentaje_promedio):
         """
@@ -717,117 +1848,197 @@ class SkoolScraper:
         else:
             return "ATRASADO"
 
-    def _procesar_pagina(self, page_number, profile_tab_handle):
+    def _procesar_pagina(self, page_number, profile_tab_handles):
         self.logger.info(f"📄 Página {page_number}: Procesando miembros...")
-        time.sleep(1)
         datos_pagina_dicts = []
+        self.omitidos_pagina = 0
         # La lógica interna de _procesar_pagina se mantiene igual, ya que es correcta
         wait = WebDriverWait(self.driver, 20)
         
         try:
-            miembros = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, self.SELECTORS['member_item'])))
+            with self.metricas.medir('carga_miembros'):
+                miembros = wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, self.SELECTORS['member_item'])))
         except TimeoutException:
             self.logger.warning(f"⚠️ Timeout esperando miembros en página {page_number}")
             return datos_pagina_dicts
 
-        for i, miembro_element in enumerate(miembros):
-            if self.num_members > 0 and self.global_count >= self.num_members: break
-            if i % 10 == 0:
-                time.sleep(0.5)
-            self.global_count += 1
-            info_miembro = self._extraer_info_miembro(miembro_element)
-            
-            profile_link = f'https://www.skool.com/{info_miembro["EmailSkool"]}?g=mentoriavipantoecom'
-            gmail_user, contribution_member, info_perfil = self._extract_courses_info(profile_link, profile_tab_handle)
-            #permanencia_dias, permanencia_meses = self._calculate_permanencia(info_miembro['Unido']) --se modifica para verificar fecha existente
-            
+        base_count = self.global_count
+        limite = self.num_members - base_count if self.num_members > 0 else None
+
+        # 1) Leer todas las tarjetas de la página antes de tocar las pestañas de perfil
+        inicio_tarjetas = time.perf_counter()
+        pagina = self._leer_pagina_miembros() if self.members_batch_js else None
+        if pagina is not None:
+            # Un solo round trip: el parseo posicional corre sobre strings planos
+            self.estado_boton_siguiente = pagina.get('next')
+            tarjetas, slugs = [], []
+            for card in pagina['cards'][:limite]:
+                tarjetas.append(self._parsear_partes_miembro(card.get('parts') or []))
+                slugs.append(card.get('slug'))
+        else:
+            self.estado_boton_siguiente = None
+            tarjetas = []
+            for miembro_element in miembros[:limite]:
+                tarjetas.append(self._extraer_info_miembro(miembro_element))
+            slugs = [None] * len(tarjetas)
+        self.metricas.registrar('tarjetas', time.perf_counter() - inicio_tarjetas)
+
+        # Miembros ya guardados (reanudación o reintento tras crash) no se vuelven a visitar
+        pendientes = [(idx, info, slug) for idx, (info, slug) in enumerate(zip(tarjetas, slugs))
+                      if not self._ya_guardado(info.get('EmailSkool'), self.emails_guardados)]
+        self.omitidos_pagina = len(tarjetas) - len(pendientes)
+        if self.omitidos_pagina:
+            self.logger.info(f"⏭️ {self.omitidos_pagina} miembros de la página {page_number} ya estaban guardados.")
+
+        # 2) Procesar los perfiles en lotes del tamaño del pool de pestañas:
+        # se lanzan todas las navegaciones del lote y luego se extraen en orden de página.
+        n_tabs = len(profile_tab_handles)
+        for inicio in range(0, len(pendientes), n_tabs):
+            lote = pendientes[inicio:inicio + n_tabs]
+            urls = [self.URLS['profile'].format(slug=slug or info["EmailSkool"]) for _, info, slug in lote]
+            huellas = [self._huella_tarjeta(info) for _, info, _ in lote]
+            # Modo delta: reutilizar el último snapshot; si no aplica, motor HTTP opcional;
+            # solo los perfiles que ninguno resolvió pasan por Selenium
+            perfiles_resueltos = [self._perfil_desde_snapshot(info, huella) or self._extraer_perfil_http(url)
+                             for (_, info, _), huella, url in zip(lote, huellas, urls)]
+            precargados = [self._precargar_perfil(url, handle) if n_tabs > 1 and perfil is None else False
+                           for url, handle, perfil in zip(urls, profile_tab_handles, perfiles_resueltos)]
+
+            for k, (idx, info_miembro, _) in enumerate(lote):
+                # La numeración cuenta también a los omitidos, para que np/numero no cambien al reanudar
+                self.global_count = base_count + idx + 1
+                if self.contador_comandos is not None:
+                    self.contador_comandos.miembro = info_miembro.get('EmailSkool')
+                if perfiles_resueltos[k] is not None:
+                    gmail_user, contribution_member, info_perfil = perfiles_resueltos[k]
+                else:
+                    gmail_user, contribution_member, info_perfil = self._extract_courses_info(
+                        urls[k], profile_tab_handles[k], precargado=precargados[k],
+                        email_cacheado=self._email_membresia_cacheado(info_miembro.get('EmailSkool')))
+                registro_dict = self._construir_registro(
+                    page_number, idx + 1, info_miembro, gmail_user, contribution_member, info_perfil)
+                # Campos internos (con '_') para el snapshot del modo delta; CSV y BD los ignoran
+                registro_dict['_huella'] = huellas[k]
+                registro_dict['_cursos'] = info_perfil.get('courses', [])
+                registro_dict['_refrescado'] = info_perfil.get('refrescado') or datetime.now()
+                registro_dict['_email_verificado'] = info_perfil.get('email_verificado', False)
+                datos_pagina_dicts.append(registro_dict)
+
+                # ✅ GUARDADO INMEDIATO POR MIEMBRO: si el navegador se cae más adelante
+                # en esta misma página, lo ya procesado NO se pierde.
+                email_skool = registro_dict.get('email_skool')
+                if not self._ya_guardado(email_skool, self.emails_en_csv):
+                    self.save_page_to_csv([registro_dict], self.full_path)
+                    self.emails_en_csv.add(email_skool)
+                self._encolar_registro_bd(registro_dict)
+                self.emails_guardados.add(email_skool)
+                self._guardar_checkpoint(page_number, email_skool)
+                if self.contador_comandos is not None:
+                    self.contador_comandos.miembro = None
+
+            self._muestrear_bloqueo('profile', paginas=sum(1 for perfil in perfiles_resueltos if perfil is None))
+
+            # Un perfil muy pesado puede disparar la memoria antes de terminar la página:
+            # primero se intenta el reciclaje ligero y, si no basta, se recicla el navegador
+            memoria = self._memoria_chrome_mb()
+            if memoria is not None and memoria >= self.chrome_mem_limit_mb * self.chrome_mem_hard_factor:
+                motivo = (f"memoria de Chrome {memoria:.0f} MB supera el techo duro "
+                          f"({self.chrome_mem_limit_mb * self.chrome_mem_hard_factor:.0f} MB)")
+                if not self._reciclaje_ligero(profile_tab_handles, motivo):
+                    raise ReciclajeNavegador(motivo)
+
+        self.global_count = base_count + len(tarjetas)
+        self.logger.info(f"✔️  Se procesaron {len(datos_pagina_dicts)} miembros en la página {page_number}.")
+        return datos_pagina_dicts
 
-            # ✅ VERIFICAR SI EL MIEMBRO YA EXISTE Y OBTENER LA FECHA CORRECTA
-            fecha_unido_correcta = info_miembro['Unido']
-            fecha_existente = self._obtener_fecha_unido_existente(info_miembro['EmailSkool'])
+    def _ya_guardado(self, email_skool, guardados):
+        """Un miembro sin email_skool legible ('N/A') nunca se considera guardado."""
+        return bool(email_skool) and email_skool != 'N/A' and email_skool in guardados
 
-            if fecha_existente:
-                # ✅ EL MIEMBRO YA EXISTE EN LA BD - USAR LA FECHA MÁS ANTIGUA
-                # fecha_existente ya es la más antigua gracias a MIN() en la consulta SQL
-                
-                # Convertir al formato correcto
-                if isinstance(fecha_existente, datetime):
-                    fecha_unido_correcta = fecha_existente.strftime('%b %d, %Y')
-                else:
-                    # Si es string, intentar formatearlo
-                    try:
-                        fecha_dt = self._parse_fecha_unido(str(fecha_existente))
-                        if fecha_dt:
-                            fecha_unido_correcta = fecha_dt.strftime('%b %d, %Y')
-                        else:
-                            fecha_unido_correcta = str(fecha_existente)
-                    except:
-                        fecha_unido_correcta = str(fecha_existente)
-                
-                self.logger.info(f"🔄 Usando fecha existente (más antigua) para {info_miembro['EmailSkool']}")
-
-            # Calcular permanencia con la fecha correcta
-            permanencia_dias, permanencia_meses = self._calculate_permanencia(fecha_unido_correcta)
-
-            registro_dict = {
-                'pagina': page_number, 'np': i + 1, 'numero': self.global_count,
-                'nombre_miembro': info_miembro.get('Miembro'), 'nivel': info_miembro.get('Nivel'),
-                'email_gmail': gmail_user, 'estado_activo': info_miembro.get('Activo'), 
-                'fecha_unido': fecha_unido_correcta, 'valor_membresia': info_miembro.get('Valor'),
-                'contribucion': contribution_member, 'renueva': info_miembro.get('Renueva'),
-                'email_skool': info_miembro.get('EmailSkool'), 'frase_personal': info_miembro.get('Frase'),
-                'localizacion': info_miembro.get('Localiza'), 'invito': info_miembro.get('Invito'),
-                'invitado': info_miembro.get('Invitado'), 'permanencia_dias': permanencia_dias,
-                'permanencia_meses': permanencia_meses, 'Otro': info_miembro.get('Otro')
-            }
+    def _construir_registro(self, page_number, np, info_miembro, gmail_user, contribution_member, info_perfil):
+        """Arma el registro interno de un miembro a partir de su tarjeta y su perfil."""
+        # ✅ VERIFICAR SI EL MIEMBRO YA EXISTE Y OBTENER LA FECHA CORRECTA
+        fecha_unido_correcta = info_miembro['Unido']
+        fecha_existente = self._obtener_fecha_unido_existente(info_miembro['EmailSkool'])
 
-            # Agregar información de cursos al registro
-            cursos = info_perfil.get('courses', [])
-            registro_dict['total_cursos'] = len(cursos)
-            registro_dict['progreso_total'] = sum(curso.get('Vr. Progreso', 0) for curso in cursos)
+        if fecha_existente:
+            # ✅ EL MIEMBRO YA EXISTE EN LA BD - USAR LA FECHA MÁS ANTIGUA
+            # fecha_existente ya es la más antigua gracias a MIN() en la consulta SQL
             
-            registro_dict['porcentaje_promedio'] = registro_dict['progreso_total'] / 25 if cursos else 0
-            porcentaje_promedio_valor = registro_dict['porcentaje_promedio']  # Guardar como número
-            registro_dict['porcentaje_promedio'] = f"{porcentaje_promedio_valor:.2f}"  # Formatear para CSV
-
-            # ✅ NUEVO: Calcular el estado de avance
-            registro_dict['estado_avance'] = self._calcular_estado_avance(
-                permanencia_dias, 
-                porcentaje_promedio_valor
-            )
+            # Convertir al formato correcto
+            if isinstance(fecha_existente, datetime):
+                fecha_unido_correcta = fecha_existente.strftime('%b %d, %Y')
+            else:
+                # Si es string, intentar formatearlo
+                try:
+                    fecha_dt = self._parse_fecha_unido(str(fecha_existente))
+                    if fecha_dt:
+                        fecha_unido_correcta = fecha_dt.strftime('%b %d, %Y')
+                    else:
+                        fecha_unido_correcta = str(fecha_existente)
+                except:
+                    fecha_unido_correcta = str(fecha_existente)
             
-            # Agregar cada curso individualmente al registro
-            for j, curso in enumerate(cursos):
-                registro_dict[f'curso_{j+1}_nombre'] = curso.get('Curso', 'N/A')
-                registro_dict[f'curso_{j+1}_avance'] = curso.get('Avance_Curso', '0%')
-                registro_dict[f'curso_{j+1}_progreso'] = curso.get('Vr. Progreso', 0)
-
-            datos_pagina_dicts.append(registro_dict)
+            self.logger.info(f"🔄 Usando fecha existente (más antigua) para {info_miembro['EmailSkool']}")
+
+        # Calcular permanencia con la fecha correcta
+        permanencia_dias, permanencia_meses = self._calculate_permanencia(fecha_unido_correcta)
+
+        registro_dict = {
+            'pagina': page_number, 'np': np, 'numero': self.global_count,
+            'nombre_miembro': info_miembro.get('Miembro'), 'nivel': info_miembro.get('Nivel'),
+            'email_gmail': gmail_user, 'estado_activo': info_miembro.get('Activo'), 
+            'fecha_unido': fecha_unido_correcta, 'valor_membresia': info_miembro.get('Valor'),
+            'contribucion': contribution_member, 'renueva': info_miembro.get('Renueva'),
+            'email_skool': info_miembro.get('EmailSkool'), 'frase_personal': info_miembro.get('Frase'),
+            'localizacion': info_miembro.get('Localiza'), 'invito': info_miembro.get('Invito'),
+            'invitado': info_miembro.get('Invitado'), 'permanencia_dias': permanencia_dias,
+            'permanencia_meses': permanencia_meses, 'Otro': info_miembro.get('Otro')
+        }
 
-            # ✅ GUARDADO INMEDIATO POR MIEMBRO: si el navegador se cae más adelante
-            # en esta misma página, lo ya procesado NO se pierde.
-            self.save_page_to_csv([registro_dict], self.full_path)
-            db_success = self.save_page_to_database([registro_dict])
-            if not db_success:
-                self.logger.warning(f"⚠️ No se pudo guardar en BD el registro de {registro_dict.get('email_skool')}")
+        # Agregar información de cursos al registro
+        cursos = info_perfil.get('courses', [])
+        registro_dict['total_cursos'] = len(cursos)
+        registro_dict['progreso_total'] = sum(curso.get('Vr. Progreso', 0) for curso in cursos)
+        
+        registro_dict['porcentaje_promedio'] = registro_dict['progreso_total'] / 25 if cursos else 0
+        porcentaje_promedio_valor = registro_dict['porcentaje_promedio']  # Guardar como número
+        registro_dict['porcentaje_promedio'] = f"{porcentaje_promedio_valor:.2f}"  # Formatear para CSV
+
+        # ✅ NUEVO: Calcular el estado de avance
+        registro_dict['estado_avance'] = self._calcular_estado_avance(
+            permanencia_dias, 
+            porcentaje_promedio_valor
+        )
+        
+        # Agregar cada curso individualmente al registro
+        for j, curso in enumerate(cursos):
+            registro_dict[f'curso_{j+1}_nombre'] = curso.get('Curso', 'N/A')
+            registro_dict[f'curso_{j+1}_avance'] = curso.get('Avance_Curso', '0%')
+            registro_dict[f'curso_{j+1}_progreso'] = curso.get('Vr. Progreso', 0)
 
-        self.logger.info(f"✔️  Se procesaron {len(datos_pagina_dicts)} miembros en la página {page_number}.")
-        return datos_pagina_dicts
+        return registro_dict
 
     def scrape_miembros(self):
         """
         BUCLE PRINCIPAL: Procesa y GUARDA los datos PÁGINA POR PÁGINA.
         """
-        if not self.login(): 
+        if not self._restaurar_sesion(): 
             return
-        time.sleep(2)
-        self.driver.get(self.URLS['members'])
+        page_number = 1
+        if self.checkpoint:
+            # Reanudación: ir directo a la página del checkpoint con el contador de su inicio
+            page_number = self.checkpoint.get('page_number', 1)
+            self.global_count = self.checkpoint.get('global_count_inicio_pagina', 0)
+            self.logger.info(f"⏩ Reanudando en la página {page_number} (miembro #{self.global_count + 1}).")
+        self._ir_a_pagina_miembros(page_number)
 
         try:
             WebDriverWait(self.driver, 15).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, self.SELECTORS['member_item']))
             )
             self.logger.info("Página de miembros cargada correctamente.")
+            self._muestrear_bloqueo('members')
         except TimeoutException:
             self.logger.error("No se pudo cargar la página de miembros después de navegar a ella. Terminando.")
             try:
@@ -839,47 +2050,45 @@ class SkoolScraper:
                 pass
             return
 
-        page_number = 1
-        
         if self.num_members > 0: 
             self.logger.info(f"🎯 Objetivo: Extraer {self.num_members} miembros")
         else: 
             self.logger.info("🔍 Procesando todos los miembros disponibles")
 
-        with open(self.full_path, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=self.header_csv)
-            writer.writeheader()
+        # Al reanudar se continúa el CSV existente; si no, se crea con su encabezado
+        self._abrir_sink_csv(self.full_path, nuevo=not self.checkpoint)
+        self._abrir_sinks_extra(reconstruir=bool(self.checkpoint))
         
         # Se crean las pestañas por primera vez
-        original_window = self.driver.current_window_handle
-        self.driver.switch_to.new_window('tab')
-        profile_tab_handle = self.driver.current_window_handle
-        self.driver.switch_to.window(original_window)
+        original_window, profile_tab_handles = self._crear_pestanas_perfil()
+        self._iniciar_metricas_pagina()
+        self.memoria_base_sesion = self._memoria_chrome_mb()
+        navegacion_pendiente = False
         
         while True:
             try:
                 # --- LÓGICA DE REINICIO MEJORADA ---
-                if self.current_session_pages >= self.max_pages_per_session:
-                    self.logger.info(f"🔄 Límite de {self.max_pages_per_session} páginas por sesión alcanzado. Reiniciando navegador...")
-                    if not self._reiniciar_navegador() or not self.login():
+                # El navegador se recicla por memoria (o por límite fijo de páginas si se configuró)
+                motivo_reciclaje, tipo_reciclaje = self._motivo_reciclaje()
+                if tipo_reciclaje == 'memoria' and self._reciclaje_ligero(profile_tab_handles, motivo_reciclaje):
+                    motivo_reciclaje = None  # Bastó con recrear las pestañas
+                if motivo_reciclaje:
+                    self.logger.info(f"🔄 Reciclando navegador: {motivo_reciclaje}")
+                    self._vaciar_buffer_bd()
+                    if not self._reiniciar_navegador() or not self._restaurar_sesion():
                         self.logger.error("❌ Fallo crítico en el reinicio o re-login. Terminando.")
                         break
-                    
-                    # CORRECCIÓN: Volver a crear la pestaña de perfiles, ya que la anterior se cerró.
-                    self.logger.info("...recreando pestaña para perfiles...")
-                    original_window = self.driver.current_window_handle
-                    self.driver.switch_to.new_window('tab')
-                    profile_tab_handle = self.driver.current_window_handle
-                    self.driver.switch_to.window(original_window)
+                    self.reinicios_navegador += 1
+                    navegacion_pendiente = True
+
+                if navegacion_pendiente:
+                    # CORRECCIÓN: Volver a crear las pestañas de perfiles, ya que las anteriores se cerraron.
+                    self.logger.info("...recreando pestañas para perfiles...")
+                    original_window, profile_tab_handles = self._crear_pestanas_perfil()
 
                     # CORRECCIÓN: Navegación directa a la página correcta usando la URL.
                     self.logger.info(f"Reanudando desde la página {page_number}...")
-                    # La primera página no usa el parámetro 'p', las siguientes sí.
-                    if page_number > 1:
-                        page_url = f"{self.URLS['members']}?p={page_number}"
-                        self.driver.get(page_url)
-                    else:
-                        self.driver.get(self.URLS['members'])
+                    self._ir_a_pagina_miembros(page_number)
 
                     # Esperar a que la página cargue después de la navegación directa
                     WebDriverWait(self.driver, 15).until(
@@ -887,15 +2096,25 @@ class SkoolScraper:
                     )
                     
                     self.current_session_pages = 0
+                    self.memoria_base_sesion = self._memoria_chrome_mb()
+                    navegacion_pendiente = False
                 # --- FIN DE LA LÓGICA DE REINICIO ---
 
                 if self.num_members > 0 and self.global_count >= self.num_members:
                     self.logger.info(f"✅ Objetivo alcanzado ({self.num_members} miembros)")
+                    self.paginacion_terminada = True
                     break
 
-                datos_pagina = self._procesar_pagina(page_number, profile_tab_handle)
-                if not datos_pagina:
+                self.global_count_inicio_pagina = self.global_count
+                self._guardar_checkpoint(page_number)
+                datos_pagina = self._procesar_pagina(page_number, profile_tab_handles)
+                if datos_pagina or self.omitidos_pagina:
+                    self.ultima_pagina = page_number
+                    self._guardar_metricas_pagina(page_number, len(datos_pagina or []))
+                    self._anexar_subida_incremental()
+                if not datos_pagina and not self.omitidos_pagina:
                     self.logger.info("🏁 Página sin datos. Fin de la paginación.")
+                    self.paginacion_terminada = True
                     break
 
                 # Nota: el guardado en CSV y BD ya ocurre miembro por miembro
@@ -905,37 +2124,74 @@ class SkoolScraper:
                     porcentaje = min(100, int((self.global_count / self.num_members) * 100))
                     self.logger.info(f"📊 Progreso: {self.global_count}/{self.num_members} miembros ({porcentaje}%)")
 
+                # Si la lectura por lotes ya mostró que Next está deshabilitado, no buscarlo ni pulsarlo.
+                # Que no existiera no basta: las tarjetas pueden renderizar antes que el botón, así que
+                # ese caso sigue por la espera de abajo.
+                if self.estado_boton_siguiente and self.estado_boton_siguiente.get('disabled'):
+                    self.logger.info("🏁 Botón 'Next' deshabilitado. Fin de la paginación.")
+                    self.paginacion_terminada = True
+                    break
+
                 try:
-                    next_btn = self.driver.find_element(By.XPATH, self.XPATHS['next_button'])
-                    self.driver.execute_script("arguments[0].click();", next_btn)
-                    WebDriverWait(self.driver, 10).until(EC.staleness_of(next_btn))
-                    time.sleep(1)
-                    
-                    page_number += 1
-                    self.current_session_pages += 1
-                    
+                    next_btn = WebDriverWait(self.driver, 5).until(
+                        EC.presence_of_element_located((By.XPATH, self.XPATHS['next_button'])))
                 except (NoSuchElementException, TimeoutException):
                     self.logger.info("🏁 No se encontró el botón 'Next'. Fin de la paginación.")
+                    self.paginacion_terminada = True
+                    break
+
+                slug_anterior = self._primer_slug_pagina()
+                self._pausa_cortesia()
+                self.driver.execute_script("arguments[0].click();", next_btn)
+                try:
+                    # El SPA cambia el botón antes que la lista: se espera a que cambien las tarjetas,
+                    # si no _procesar_pagina leería otra vez la página actual como la siguiente
+                    with self.metricas.medir('siguiente_pagina'):
+                        WebDriverWait(self.driver, 15).until(
+                            lambda d: self._pagina_cargada(page_number + 1, slug_anterior))
+                except TimeoutException:
+                    self.logger.error(f"❌ Error de paginación: la página {page_number + 1} no cargó tras pulsar 'Next'. "
+                                      f"Se detiene sin marcar la ejecución como completada.")
                     break
 
+                page_number += 1
+                self.current_session_pages += 1
+                self._iniciar_metricas_pagina()
+
             except InvalidSessionIdException:
                 self.logger.error("💥 CRASH DEL NAVEGADOR DETECTADO (InvalidSessionIdException). Intentando recuperar...")
-                if self._reiniciar_navegador() and self.login():
-                    # Al crashear, es mejor empezar de la página actual de nuevo
+                # Lo ya extraído se persiste antes de intentar la recuperación
+                self._vaciar_buffer_bd()
+                if self._reiniciar_navegador() and self._restaurar_sesion():
+                    # Al crashear, es mejor empezar de la página actual de nuevo; los ya guardados se omiten
+                    self.global_count = self.global_count_inicio_pagina
+                    self.reinicios_navegador += 1
                     self.logger.info(f"Recuperado. Reintentando la página {page_number}.")
-                    # Forzamos un reinicio completo de la sesión y navegación
-                    self.current_session_pages = self.max_pages_per_session 
-                    continue # El siguiente ciclo activará la lógica de reinicio
+                    # El navegador ya es nuevo: solo falta recrear pestañas y volver a la página
+                    navegacion_pendiente = True
+                    continue
                 else:
                     self.logger.info("Se han guardado los datos hasta la última página completada. Terminando proceso.")
                     break
+            except ReciclajeNavegador as e:
+                # Memoria crítica a mitad de página: se recicla y se reintenta la página omitiendo lo ya guardado
+                self.logger.warning(f"🔄 Reciclando navegador a mitad de la página {page_number}: {e}")
+                self._vaciar_buffer_bd()
+                if not self._reiniciar_navegador() or not self._restaurar_sesion():
+                    self.logger.error("❌ Fallo crítico en el reinicio o re-login. Terminando.")
+                    break
+                self.global_count = self.global_count_inicio_pagina
+                self.reinicios_navegador += 1
+                navegacion_pendiente = True
+                continue
             except Exception as e:
                 self.logger.error(f"❌ Error inesperado en el bucle principal (página {page_number}): {e}", exc_info=True)
                 break
         
         try:
-            self.driver.switch_to.window(profile_tab_handle)
-            self.driver.close()
+            for profile_tab_handle in profile_tab_handles:
+                self.driver.switch_to.window(profile_tab_handle)
+                self.driver.close()
         except: 
             pass
         finally:
@@ -944,6 +2200,143 @@ class SkoolScraper:
             except: 
                 pass
 
+    def _guardar_checkpoint(self, page_number, ultimo_email=None, estado='en_curso'):
+        """Escribe el checkpoint de forma atómica (archivo temporal + os.replace)."""
+        checkpoint = {
+            'estado': estado,
+            'page_number': page_number,
+            'global_count': self.global_count,
+            'global_count_inicio_pagina': self.global_count_inicio_pagina,
+            'ultimo_email_skool': ultimo_email,
+            'full_path': self.full_path,
+            'actualizado': time.time()
+        }
+        try:
+            # El CSV se vacía antes del checkpoint (fsync en los de inicio de página y cierre)
+            if self.sink_csv is not None:
+                self.sink_csv.sincronizar(fsync=ultimo_email is None)
+            # Los formatos extra se regeneran al reanudar, basta con vaciarlos por página
+            if ultimo_email is None:
+                for sink in self.sinks_extra:
+                    sink.sincronizar()
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo sincronizar el CSV antes del checkpoint: {e}")
+        try:
+            tmp_path = f"{self.checkpoint_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.checkpoint_file)
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo escribir el checkpoint: {e}")
+
+    def _cargar_checkpoint(self):
+        """Devuelve el checkpoint de una ejecución interrumpida si es reanudable, o None."""
+        if self.resume_mode == 'off' or not os.path.exists(self.checkpoint_file):
+            return None
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Checkpoint ilegible, se empieza desde cero: {e}")
+            return None
+        if checkpoint.get('estado') != 'en_curso':
+            return None
+        edad_horas = (time.time() - checkpoint.get('actualizado', 0)) / 3600
+        if edad_horas > self.resume_max_age_hours:
+            self.logger.info(f"🕰️ Checkpoint de hace {edad_horas:.1f} h descartado (máximo {self.resume_max_age_hours} h).")
+            return None
+        if not os.path.exists(checkpoint.get('full_path') or ''):
+            self.logger.warning("⚠️ El CSV del checkpoint ya no existe, se empieza desde cero.")
+            return None
+        return checkpoint
+
+    def _cargar_emails_guardados(self):
+        """
+        Al reanudar, reúne los miembros ya persistidos del archivo en curso: los del CSV
+        (para no duplicar filas) y los de PostgreSQL (para no volver a visitarlos).
+        """
+        try:
+            with open(self.full_path, 'r', newline='', encoding='utf-8-sig') as f:
+                self.emails_en_csv = {row.get('Usuario_SK') for row in csv.DictReader(f) if row.get('Usuario_SK')}
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo leer el CSV a reanudar: {e}")
+        try:
+            with self._conexion_bd() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT DISTINCT email_skool FROM miembros_activos_elite_cursos WHERE archivo_generado = %s",
+                        (self.full_path,)
+                    )
+                    self.emails_guardados = {row[0] for row in cursor.fetchall()}
+        except Exception as e:
+            # Sin BD, lo único fiable es el CSV
+            self.logger.warning(f"⚠️ No se pudieron leer los miembros guardados en BD, se usa el CSV: {e}")
+            self.emails_guardados = set(self.emails_en_csv)
+        self.logger.info(f"♻️ Reanudación: {len(self.emails_guardados)} miembros ya guardados en BD, "
+                         f"{len(self.emails_en_csv)} en el CSV.")
+
+    def _iniciar_metricas_pagina(self):
+        """Toma la foto de contadores al empezar una página (los reintentos de la misma página suman a ella)."""
+        self._inicio_pagina = {
+            'reloj': time.perf_counter(),
+            'timeouts_perfil': self.timeouts_perfil,
+            'reinicios_navegador': self.reinicios_navegador,
+            'reintentos_bd': self.reintentos_bd,
+            'etapas': self.metricas.totales(),
+        }
+        self.pico_memoria_pagina = 0.0
+
+    def _guardar_metricas_pagina(self, page_number, miembros):
+        """Inserta una fila de rendimiento por página en scraper_miembros_elite_paginas."""
+        if self._inicio_pagina is None:
+            return
+        inicio = self._inicio_pagina
+        segundos = time.perf_counter() - inicio['reloj']
+        etapas = {etapa: round(total - inicio['etapas'].get(etapa, 0), 3)
+                  for etapa, total in self.metricas.totales().items()
+                  if total - inicio['etapas'].get(etapa, 0) > 0}
+        fila = (
+            self.start_time, os.path.basename(self.full_path), page_number, miembros, round(segundos, 2),
+            round(miembros * 60 / segundos, 2) if segundos > 0 else None,
+            self.timeouts_perfil - inicio['timeouts_perfil'],
+            self.reinicios_navegador - inicio['reinicios_navegador'],
+            self.reintentos_bd - inicio['reintentos_bd'],
+            round(self.pico_memoria_pagina, 1), json.dumps(etapas)
+        )
+        try:
+            with self._conexion_bd() as conn:
+                with conn.cursor() as cursor:
+                    if not self.tabla_paginas_lista:
+                        cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS scraper_miembros_elite_paginas (
+                            hora_inicio TIMESTAMP NOT NULL,
+                            archivo_generado TEXT,
+                            pagina INTEGER NOT NULL,
+                            miembros INTEGER,
+                            segundos NUMERIC,
+                            miembros_por_minuto NUMERIC,
+                            timeouts_perfil INTEGER,
+                            reinicios_navegador INTEGER,
+                            reintentos_bd INTEGER,
+                            pico_memoria_chrome_mb NUMERIC,
+                            etapas JSONB,
+                            registrado TIMESTAMP DEFAULT NOW()
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_scraper_paginas_inicio
+                            ON scraper_miembros_elite_paginas (hora_inicio);
+                        """)
+                    cursor.execute("""
+                    INSERT INTO scraper_miembros_elite_paginas (
+                        hora_inicio, archivo_generado, pagina, miembros, segundos, miembros_por_minuto,
+                        timeouts_perfil, reinicios_navegador, reintentos_bd, pico_memoria_chrome_mb, etapas
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+                    """, fila)
+            self.tabla_paginas_lista = True
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudieron guardar las métricas de la página {page_number}: {e}")
+
     def _save_execution_data(self, end_time, execution_time):
         """Guarda los datos de ejecución en la base de datos PostgreSQL"""
         try:
@@ -973,7 +2366,7 @@ class SkoolScraper:
 
             params = (
                 self.global_count,  # total_miembros_scrapeados
-                1,  # ultima_pagina_scrapeada - ajusta según tu lógica de paginación
+                self.ultima_pagina,  # ultima_pagina_scrapeada
                 self.start_time,  # hora_inicio
                 end_time,  # hora_fin
                 str(execution_time),  # tiempo_total
@@ -989,8 +2382,8 @@ class SkoolScraper:
             
             while retry_count < max_retries:
                 try:
-                    # Crear una nueva conexión para cada intento
-                    with psycopg2.connect(self.connection_string) as conn:
+                    # Tomar una conexión del pool (se descarta y reconecta si está caída)
+                    with self._conexion_bd() as conn:
                         with conn.cursor() as cursor:
                             cursor.execute(insert_query, params)
                             conn.commit()
@@ -1014,18 +2407,87 @@ class SkoolScraper:
             self.logger.error(f"❌ Error inesperado en _save_execution_data: {e}")
             return False
 
+    def _exportar_metricas(self):
+        """Resume en el log los tiempos por etapa y los exporta como JSON y textfile de Prometheus."""
+        if not self.metricas.muestras:
+            return
+        self.logger.info("⏱️ Tiempos por etapa (total, p50, p95, max):")
+        for linea in self.metricas.lineas_resumen():
+            self.logger.info(f"   {linea}")
+        contadores = {
+            'miembros_total': self.global_count,
+            'reinicios_navegador': self.reinicios_navegador,
+            'reciclajes_pestanas': self.reciclajes_pestanas,
+            'timeouts_perfil': self.timeouts_perfil,
+            'reintentos_bd': self.reintentos_bd,
+            'pico_memoria_chrome_mb': round(self.pico_memoria_chrome, 1),
+        }
+        extra = {'contadores': contadores}
+        if self.contador_comandos is not None:
+            self.logger.info("🔌 Comandos WebDriver (más costosos por tipo y por miembro):")
+            for linea in self.contador_comandos.lineas_resumen():
+                self.logger.info(f"   {linea}")
+            extra['comandos_webdriver'] = self.contador_comandos.resumen(top=25)
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            ruta_json = os.path.join(self.metrics_dir, f"metricas_{self.start_time:%Y%m%d_%H%M%S}.json")
+            self.metricas.exportar_json(ruta_json, extra=extra)
+            self.metricas.exportar_prometheus(os.path.join(self.metrics_dir, 'skool_scraper.prom'), extra=contadores)
+            self.logger.info(f"📈 Métricas exportadas en '{ruta_json}' y 'skool_scraper.prom'.")
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudieron exportar las métricas: {e}")
+
+    def _exportar_perfil_python(self):
+        """Guarda el cProfile de la ejecución (.pstats) y deja en el log las funciones más costosas."""
+        if self.perfilador is None:
+            return
+        self.perfilador.disable()
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            ruta = os.path.join(self.metrics_dir, f"perfil_{self.start_time:%Y%m%d_%H%M%S}.pstats")
+            self.perfilador.dump_stats(ruta)
+            salida = io.StringIO()
+            pstats.Stats(self.perfilador, stream=salida).sort_stats('cumulative').print_stats(20)
+            self.logger.info(f"🧪 Perfil de Python guardado en '{ruta}'. Top por tiempo acumulado:\n{salida.getvalue()}")
+        except Exception as e:
+            self.logger.warning(f"⚠️ No se pudo exportar el perfil de Python: {e}")
+
+    def _manejar_sigterm(self, signum, frame):
+        """Convierte SIGTERM (reinicio de Render) en SystemExit para que se ejecuten los finally."""
+        self.logger.warning("🛑 SIGTERM recibido. Guardando datos pendientes y terminando...")
+        raise SystemExit(1)
+
     def run(self):
         """
         Orquesta el proceso de scraping. Ahora más simple.
         """
         self.logger.info("🚀 Iniciando el scraper de Skool...")
-        self.full_path = os.path.abspath(f"skool_members_elite_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        self.checkpoint = self._cargar_checkpoint()
+        if self.checkpoint:
+            self.full_path = self.checkpoint['full_path']
+            self.logger.info(f"♻️ Ejecución interrumpida detectada. Se continúa el archivo '{self.full_path}'.")
+        else:
+            self.full_path = os.path.abspath(f"skool_members_elite_{time.strftime('%Y%m%d_%H%M%S')}.csv")
         self.start_time = datetime.now()
+        signal.signal(signal.SIGTERM, self._manejar_sigterm)
+        if self.perfilador is not None:
+            self.perfilador.enable()
         try:
+            self._cargar_indice_fecha_unido()
+            if self.delta_mode:
+                self._cargar_snapshots()
+            if self.email_cache_ttl_days > 0:
+                self._cargar_cache_emails()
             if not self._iniciar_driver():
                 return
             
+            if self.checkpoint:
+                self._cargar_emails_guardados()
             self.scrape_miembros()
+            self._cerrar_sinks()
+            # Solo se da por completada si la paginación terminó y no quedaron registros sin guardar
+            if self._vaciar_buffer_bd() and self.paginacion_terminada:
+                self._guardar_checkpoint(self.ultima_pagina, estado='completado')
             # Calcular tiempo de ejecución
             end_time = datetime.now()
             execution_time = end_time - self.start_time
@@ -1033,11 +2495,21 @@ class SkoolScraper:
             self.logger.info("--- Proceso de Scraping Finalizado ---")
             self.logger.info(f"⏰ Tiempo total de ejecución: {execution_time}")
             self.logger.info(f"👥 Total de miembros procesados: {self.global_count}")
+            self.logger.info(f"🍪 Sesiones restauradas sin re-login: {self.sesiones_restauradas}")
+            self.logger.info(f"♻️ Reinicios de navegador: {self.reinicios_navegador} | Reciclajes de pestañas: {self.reciclajes_pestanas} | Pico de memoria Chrome: {self.pico_memoria_chrome:.0f} MB")
+            if self.delta_mode:
+                self.logger.info(f"🧬 Perfiles reutilizados por modo delta: {self.perfiles_reutilizados}")
+            if self.email_cache_ttl_days > 0:
+                self.logger.info(f"📬 Emails de membresía tomados del caché: {self.emails_desde_cache}")
+            if self.motor_http is not None:
+                self.logger.info(f"⚡ Perfiles por HTTP: {self.perfiles_http_ok} | Fallback a Selenium: {self.perfiles_http_fallidos}")
             # Guardar datos de ejecución en la base de datos
             self._save_execution_data(end_time, execution_time)
             
-            # La subida a Dropbox se hace al final con el archivo completo
-            self.subir_a_dropbox(self.full_path)
+            # La subida a Dropbox se hace al final con cada archivo completo de OUTPUT_FORMATS
+            with self.metricas.medir('subida_dropbox'):
+                for ruta in self._rutas_salida():
+                    self.subir_a_dropbox(ruta)
             # if os.path.exists(self.full_path):
             #     os.remove(self.full_path)
             #     self.logger.info(f"🗑️ Archivo local '{self.full_path}' eliminado.")
@@ -1051,6 +2523,14 @@ class SkoolScraper:
             except Exception as db_error:
                 self.logger.error(f"❌ Error al guardar datos de ejecución después del fallo: {db_error}")
         finally:
+            self._cerrar_sinks()
+            self._exportar_perfil_python()
+            self._exportar_metricas()
+            if self.motor_http is not None:
+                self.motor_http.cerrar()
+            # Vaciar lo pendiente antes de cerrar el pool (también ante SIGTERM o errores)
+            self._vaciar_buffer_bd()
+            self._cerrar_pool_bd()
             # Cerrar navegador y limpiar directorio temporal
             if self.driver:
                 try:
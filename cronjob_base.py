@@ -12,6 +12,7 @@ import psycopg2
 import shutil
 import tempfile
 from dotenv import load_dotenv
+from tarjetas_miembro import CLAVES as CLAVES_TARJETA, parsear_tarjeta
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -257,65 +258,16 @@ class SkoolScraper:
             self.logger.error(f"Error registrando estructura miembro: {str(e)}")
    
     def _extraer_info_miembro(self, miembro_element):
-        data = {'Nivel': 'N/A', 'Miembro': 'N/A', 'EmailSkool': 'N/A', 'Chat': 'N/A', 'Membership': 'N/A', 'Frase': 'N/A', 'Activo': 'N/A', 'Unido': 'N/A', 'Valor': 'N/A', 'Renueva': 'N/A', 'Localiza': 'N/A', 'Invito': 'N/A', 'Invitado': 'N/A', 'Otro': 'N/A'}
         try:
-            #miembros_monitoreo = [                "Ramiro Oliviere"            ]
             parts = [p.strip() for p in miembro_element.text.split('\n') if p.strip()]
-            keys = list(data.keys())
-            for i, part in enumerate(parts):
-                if i < len(keys): data[keys[i]] = part
-
-            #if data['Miembro'] in miembros_monitoreo:
-                #self._log_member_structure(data['Miembro'], parts, miembro_element.text)
-
-            if data['Miembro'] == 'Helen Mishel':
-                print("Debug aquí")
-
-            if data['EmailSkool'].startswith('(Admin)'):
-                data['Otro'] = data['EmailSkool']
-                data['EmailSkool'] = data['Chat']
-                data['Chat'] = data['Membership']
-                data['Membership'] = data['Frase']
-                data['Frase'] = data['Activo']
-                data['Activo'] = data['Unido']
-                data['Unido'] = data['Valor']
-                data['Valor'] = data['Renueva']
-                data['Renueva'] = data['Localiza']
-                data['Localiza'] = data['Invito']
-                data['Invito'] = data['Otro']
-
-            if data['Frase'].startswith('Active ') or data['Frase'] == '':
-                data['Otro'], data['Renueva'], data['Valor'], data['Unido'], data['Activo'], data['Frase'] = data['Renueva'], data['Valor'], data['Unido'], data['Activo'], data['Frase'], 'N/A'
-            
-            if not (data['Valor'].startswith('$') or data['Valor'].startswith('Free')):
-                data['Otro'] = data['Valor']
-                data['Valor'] = data['Renueva']
-                data['Renueva'] = data['Localiza']
-                data['Localiza'] = data['Otro']
-            
-            valor_str = data.get('Valor', '')
-            localiza_str = data.get('Localiza', '')
-            condition1 = not valor_str.startswith('$')
-            condition2 = not valor_str.startswith('Free')
-            condition3 = localiza_str.startswith('Renews')
-            if (condition1 or condition2) and condition3:
-                data['Otro'], data['Valor'], data['Renueva'], data['Localiza'] = data['Valor'], data['Renueva'], data['Localiza'], data['Otro']
-            if data['Localiza'].startswith('Renews'):
-                data['Otro'], data['Localiza'], data['Valor'], data['Renueva'] = data['Localiza'], data['Valor'], data['Renueva'], data['Otro']
-            if data['Localiza'].startswith('Invited by'):
-                data['Invitado'], data['Localiza'] = data['Localiza'], 'N/A'
-
-            if data['Activo'].startswith('Active '):
-                data['Activo'] = data['Activo'].split()[1]
-            if data['Unido'].startswith('Joined '):
-                data['Unido'] = data['Unido'][7:]
-            if data['Valor'].startswith('$'):
-                data['Valor'] = data['Valor'].replace('$', '').replace('/month', '').strip()
-
-
+            data = parsear_tarjeta(parts)
+            # Este script conserva su mapeo histórico: "Invited by …" va a la columna invitado
+            if data['Invito'] != 'N/A':
+                data['Invitado'], data['Invito'] = data['Invito'], 'N/A'
+            return data
         except Exception as e:
             self.logger.warning(f"⚠️ No se pudo procesar un miembro: {e}")
-        return data
+            return dict.fromkeys(CLAVES_TARJETA, 'N/A')
 
     def _safe_extract(self, by, selector, default):
         try: return self.driver.find_element(by, selector).text.strip()
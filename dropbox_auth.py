@@ -1,60 +1,227 @@
 # dropbox_auth.py
 import os
+import json
+import time
+import logging
+import tempfile
+import threading
+import hashlib
 import requests
 from dotenv import load_dotenv
 
+try:
+    import fcntl  # Bloqueo entre procesos del caché en archivo (solo POSIX)
+except ImportError:
+    fcntl = None
+
 load_dotenv()
 
+TOKEN_URL = 'https://api.dropboxapi.com/oauth2/token'
+
+
+class ProveedorTokenDropbox:
+    """
+    Entrega access tokens de Dropbox renovándolos con el refresh token solo cuando hace falta.
+
+    El token se guarda en memoria con su vencimiento (expires_in) y se renueva `margen`
+    segundos antes de que expire. Es seguro entre hilos y, si se indica ruta_cache, comparte
+    el token entre procesos con un archivo local (directorio 0700, archivo 0600 creado con
+    mkstemp y os.replace y, en POSIX, bloqueo para que un solo proceso haga la renovación).
+    `origen` indica de dónde salió el último token: 'memoria', 'cache' o 'renovado'.
+    """
+
+    def __init__(self, app_key, app_secret, refresh_token, ruta_cache=None,
+                 margen=300, timeout=10, logger=None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.refresh_token = refresh_token
+        self.ruta_cache = ruta_cache or None
+        self.margen = margen
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger("DropboxAuth")
+        self._lock = threading.Lock()
+        self._token = None
+        self._expira = 0.0
+        self.origen = None
+        # Identifica la cuenta/app sin guardar el refresh token en el caché
+        self._huella = hashlib.sha256(f"{app_key}:{refresh_token}".encode('utf-8')).hexdigest()[:16]
+
+    def obtener(self):
+        """Devuelve un access token vigente (desde memoria, archivo o renovándolo)."""
+        if not all([self.app_key, self.app_secret, self.refresh_token]):
+            raise ValueError("Faltan DROPBOX_APP_KEY, DROPBOX_APP_SECRET o DROPBOX_REFRESH_TOKEN")
+        with self._lock:
+            if self._vigente(self._expira):
+                self.origen = 'memoria'
+                return self._token
+            with self._bloqueo_archivo():
+                if self._leer_cache():
+                    self.origen = 'cache'
+                    return self._token
+                self._renovar()
+                self._escribir_cache()
+                self.origen = 'renovado'
+                return self._token
+
+    def invalidar(self):
+        """Descarta el token actual (p. ej. si Dropbox lo rechazó antes de su vencimiento)."""
+        with self._lock:
+            self._token, self._expira = None, 0.0
+            if self.ruta_cache:
+                try:
+                    os.remove(self.ruta_cache)
+                except OSError:
+                    pass
+
+    def _vigente(self, expira):
+        return self._token is not None and time.time() < expira - self.margen
+
+    def _renovar(self):
+        self.logger.info("🔄 Generando nuevo token de acceso de Dropbox...")
+        response = requests.post(
+            TOKEN_URL,
+            data={'grant_type': 'refresh_token', 'refresh_token': self.refresh_token},
+            auth=(self.app_key, self.app_secret),
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        datos = response.json()
+        self._token = datos['access_token']
+        # Dropbox emite tokens de 4 h; si no informa expires_in se asume lo mismo
+        self._expira = time.time() + float(datos.get('expires_in', 14400))
+        self.logger.info(f"🔑 Nuevo token de acceso generado (vence en {int(self._expira - time.time())} s).")
+
+    def _leer_cache(self):
+        if not self.ruta_cache or not os.path.exists(self.ruta_cache):
+            return False
+        try:
+            estado = os.stat(self.ruta_cache)
+            # Un caché legible por otros usuarios (o ajeno) no se usa: se renueva y se reescribe 0600
+            if hasattr(os, 'getuid') and (estado.st_mode & 0o077 or estado.st_uid != os.getuid()):
+                self.logger.warning(f"⚠️ Caché del token de Dropbox con permisos inseguros, se ignora: {self.ruta_cache}")
+                return False
+            with open(self.ruta_cache, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if datos.get('huella') != self._huella:
+            return False
+        self._token, expira = datos.get('access_token'), float(datos.get('expira', 0))
+        if not self._vigente(expira):
+            self._token = None
+            return False
+        self._expira = expira
+        self.logger.info("🔑 Token de Dropbox reutilizado desde el caché local.")
+        return True
+
+    def _escribir_cache(self):
+        if not self.ruta_cache:
+            return
+        try:
+            directorio = os.path.dirname(os.path.abspath(self.ruta_cache))
+            os.makedirs(directorio, mode=0o700, exist_ok=True)
+            # mkstemp crea siempre un archivo nuevo con permisos 0600 (nunca reutiliza uno ajeno)
+            fd, tmp_path = tempfile.mkstemp(prefix='.dropbox_token_', dir=directorio)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'huella': self._huella, 'access_token': self._token, 'expira': self._expira}, f)
+                os.replace(tmp_path, self.ruta_cache)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f"⚠️ No se pudo guardar el caché del token de Dropbox: {e}")
+
+    def _bloqueo_archivo(self):
+        return _BloqueoArchivo(f"{self.ruta_cache}.lock" if self.ruta_cache and fcntl else None)
+
+
+class _BloqueoArchivo:
+    """Bloqueo exclusivo con flock mientras se lee/renueva el caché; no hace nada sin ruta."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.fd = None
+
+    def __enter__(self):
+        if self.ruta:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.ruta)), mode=0o700, exist_ok=True)
+                self.fd = os.open(self.ruta, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            except OSError:
+                self.fd = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+        return False
+
+
+def ruta_cache_por_defecto():
+    """Caché del token por usuario (XDG_CACHE_HOME o ~/.cache), nunca en el /tmp compartido."""
+    base = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'miembros_elite', 'dropbox_token_cache.json')
+
+
+_proveedor_compartido = None
+_proveedor_lock = threading.Lock()
+
+
+def obtener_proveedor_token(logger=None):
+    """Proveedor único por proceso, configurado desde el entorno (.env)."""
+    global _proveedor_compartido
+    with _proveedor_lock:
+        if _proveedor_compartido is None:
+            _proveedor_compartido = ProveedorTokenDropbox(
+                os.getenv('DROPBOX_APP_KEY'),
+                os.getenv('DROPBOX_APP_SECRET'),
+                os.getenv('DROPBOX_REFRESH_TOKEN'),
+                ruta_cache=os.getenv('DROPBOX_TOKEN_CACHE', ruta_cache_por_defecto()),
+                margen=int(os.getenv('DROPBOX_TOKEN_MARGIN_SECONDS', 300)),
+                timeout=int(os.getenv('DROPBOX_TOKEN_TIMEOUT', 10)),
+                logger=logger
+            )
+        return _proveedor_compartido
+
+
 class DropboxAuth:
     """
     Clase para manejar la autenticación con Dropbox API.
     Versión estable y probada - Úsala exactamente así.
     """
-    
+
     @staticmethod
     def renovar_access_token():
         """
-        Renueva el token de acceso usando el refresh token.
+        Devuelve un access token vigente usando el proveedor compartido: reutiliza el
+        token en caché y solo llama a Dropbox cuando está por vencer.
         Devuelve:
             - access_token (str) si es exitoso
             - None si falla
         """
         try:
-            # 1. Obtener credenciales del entorno
-            refresh_token = os.getenv('DROPBOX_REFRESH_TOKEN')
-            app_key = os.getenv('DROPBOX_APP_KEY')
-            app_secret = os.getenv('DROPBOX_APP_SECRET')
-            
-            if not all([refresh_token, app_key, app_secret]):
+            if not all([os.getenv('DROPBOX_REFRESH_TOKEN'), os.getenv('DROPBOX_APP_KEY'), os.getenv('DROPBOX_APP_SECRET')]):
                 print("❌ Faltan credenciales en el archivo .env")
                 return None
 
-            # 2. Hacer la petición a la API de Dropbox
-            response = requests.post(
-                'https://api.dropbox.com/oauth2/token',
-                data={
-                    'grant_type': 'refresh_token',
-                    'refresh_token': refresh_token
-                },
-                auth=(app_key, app_secret),
-                timeout=10  # Timeout para evitar esperas infinitas
-            )
-            
-            # 3. Verificar si la respuesta es exitosa
-            response.raise_for_status()
-            
-            # 4. Extraer y devolver el access token
-            access_token = response.json().get('access_token')
-            print("✅ Token renovado correctamente")
+            proveedor = obtener_proveedor_token()
+            access_token = proveedor.obtener()
+            if proveedor.origen == 'renovado':
+                print("✅ Token renovado correctamente")
+            else:
+                print(f"✅ Token vigente reutilizado ({'caché local' if proveedor.origen == 'cache' else 'memoria'})")
             return access_token
-            
+
         except requests.exceptions.RequestException as e:
             # Manejo detallado de errores
             error_msg = f"❌ Error renovando token: {str(e)}"
-            if hasattr(e, 'response') and e.response:
+            if hasattr(e, 'response') and e.response is not None:
                 error_msg += f"\nDetalle del error: {e.response.text}"
             print(error_msg)
             return None
         except Exception as e:
             print(f"❌ Error inesperado: {str(e)}")
-            return None
\ No newline at end of file
+            return None
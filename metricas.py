@@ -0,0 +1,160 @@
+# metricas.py
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+
+
+class MedidorEtapas:
+    """
+    Acumula duraciones por etapa del scraper (login, carga de miembros, perfil, BD...)
+    y las exporta como JSON y como textfile de Prometheus (node_exporter).
+    """
+
+    def __init__(self):
+        self.muestras = {}
+
+    @contextmanager
+    def medir(self, etapa):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+
+    def registrar(self, etapa, segundos):
+        self.muestras.setdefault(etapa, []).append(segundos)
+
+    def totales(self):
+        """Segundos acumulados por etapa (para calcular diferencias entre dos instantes)."""
+        return {etapa: sum(valores) for etapa, valores in self.muestras.items()}
+
+    def _percentil(self, ordenadas, p):
+        """Percentil por rango más cercano sobre una lista ya ordenada."""
+        if not ordenadas:
+            return 0.0
+        indice = max(0, min(len(ordenadas) - 1, math.ceil(p / 100 * len(ordenadas)) - 1))
+        return ordenadas[indice]
+
+    def resumen(self):
+        """Devuelve {etapa: {n, total, p50, p95, max}} en segundos."""
+        resultado = {}
+        for etapa, valores in self.muestras.items():
+            ordenadas = sorted(valores)
+            resultado[etapa] = {
+                'n': len(ordenadas),
+                'total': round(sum(ordenadas), 4),
+                'p50': round(self._percentil(ordenadas, 50), 4),
+                'p95': round(self._percentil(ordenadas, 95), 4),
+                'max': round(ordenadas[-1], 4),
+            }
+        return resultado
+
+    def lineas_resumen(self):
+        """Líneas legibles para el log final, ordenadas por tiempo total."""
+        resumen = self.resumen()
+        return [
+            f"{etapa:<20} n={datos['n']:<6} total={datos['total']:>9.1f}s "
+            f"p50={datos['p50']:.2f}s p95={datos['p95']:.2f}s max={datos['max']:.2f}s"
+            for etapa, datos in sorted(resumen.items(), key=lambda item: item[1]['total'], reverse=True)
+        ]
+
+    def exportar_json(self, ruta, extra=None):
+        datos = {'generado': time.strftime('%Y-%m-%dT%H:%M:%S'), 'etapas': self.resumen()}
+        if extra:
+            datos.update(extra)
+        self._escribir_atomico(ruta, json.dumps(datos, indent=2, ensure_ascii=False))
+
+    def exportar_prometheus(self, ruta, extra=None):
+        """Escribe las etapas como summary de Prometheus; extra son gauges {nombre: valor}."""
+        lineas = [
+            "# HELP skool_scraper_stage_seconds Duración de cada etapa del scraper por ejecución.",
+            "# TYPE skool_scraper_stage_seconds summary",
+        ]
+        maximos = []
+        for etapa, datos in sorted(self.resumen().items()):
+            lineas.append(f'skool_scraper_stage_seconds{{stage="{etapa}",quantile="0.5"}} {datos["p50"]}')
+            lineas.append(f'skool_scraper_stage_seconds{{stage="{etapa}",quantile="0.95"}} {datos["p95"]}')
+            lineas.append(f'skool_scraper_stage_seconds_sum{{stage="{etapa}"}} {datos["total"]}')
+            lineas.append(f'skool_scraper_stage_seconds_count{{stage="{etapa}"}} {datos["n"]}')
+            maximos.append(f'skool_scraper_stage_seconds_max{{stage="{etapa}"}} {datos["max"]}')
+        lineas += ["# HELP skool_scraper_stage_seconds_max Duración máxima de cada etapa.",
+                   "# TYPE skool_scraper_stage_seconds_max gauge"] + maximos
+        for nombre, valor in (extra or {}).items():
+            lineas += [f"# TYPE skool_scraper_{nombre} gauge", f"skool_scraper_{nombre} {valor}"]
+        self._escribir_atomico(ruta, "\n".join(lineas) + "\n")
+
+    def _escribir_atomico(self, ruta, contenido):
+        # node_exporter puede leer el archivo en cualquier momento: escribir aparte y renombrar
+        tmp_path = f"{ruta}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        os.replace(tmp_path, ruta)
+
+
+class ContadorComandos:
+    """
+    Cuenta y cronometra los comandos WebDriver (findElement, getElementText, executeScript...)
+    envolviendo el command_executor del driver. Cada comando se atribuye al miembro en curso
+    (atributo `miembro`) o, si no hay ninguno, al trabajo de página.
+    """
+
+    SIN_MIEMBRO = '(página)'
+
+    def __init__(self):
+        self.por_comando = {}
+        self.por_miembro = {}
+        self.miembro = None
+
+    def instrumentar(self, driver):
+        """Envuelve driver.command_executor.execute; hay que llamarlo con cada driver nuevo."""
+        executor = driver.command_executor
+        original = getattr(executor, '_execute_sin_contador', None) or executor.execute
+
+        def execute_contado(command, params=None):
+            inicio = time.perf_counter()
+            try:
+                return original(command, params)
+            finally:
+                self.registrar(command, time.perf_counter() - inicio)
+
+        executor._execute_sin_contador = original
+        executor.execute = execute_contado
+
+    def registrar(self, comando, segundos):
+        n, total = self.por_comando.get(comando, (0, 0.0))
+        self.por_comando[comando] = (n + 1, total + segundos)
+        clave = self.miembro or self.SIN_MIEMBRO
+        n, total = self.por_miembro.get(clave, (0, 0.0))
+        self.por_miembro[clave] = (n + 1, total + segundos)
+
+    def resumen(self, top=10):
+        """Devuelve totales, media por miembro y los comandos/miembros más costosos."""
+        miembros = {k: v for k, v in self.por_miembro.items() if k != self.SIN_MIEMBRO}
+        total_comandos = sum(n for n, _ in self.por_comando.values())
+        comandos_miembros = sum(n for n, _ in miembros.values())
+        return {
+            'comandos_total': total_comandos,
+            'segundos_total': round(sum(t for _, t in self.por_comando.values()), 3),
+            'miembros': len(miembros),
+            'comandos_por_miembro': round(comandos_miembros / len(miembros), 1) if miembros else 0.0,
+            'top_comandos': [
+                {'comando': c, 'n': n, 'total': round(t, 3), 'media_ms': round(t / n * 1000, 1)}
+                for c, (n, t) in sorted(self.por_comando.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            ],
+            'top_miembros': [
+                {'miembro': m, 'n': n, 'total': round(t, 3)}
+                for m, (n, t) in sorted(miembros.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            ],
+        }
+
+    def lineas_resumen(self, top=10):
+        resumen = self.resumen(top)
+        lineas = [f"{resumen['comandos_total']} comandos en {resumen['segundos_total']:.1f}s | "
+                  f"{resumen['comandos_por_miembro']} comandos/miembro ({resumen['miembros']} miembros)"]
+        lineas += [f"{c['comando']:<28} n={c['n']:<6} total={c['total']:>8.1f}s media={c['media_ms']:.0f}ms"
+                   for c in resumen['top_comandos']]
+        lineas += [f"miembro {m['miembro']:<30} n={m['n']:<5} total={m['total']:.1f}s"
+                   for m in resumen['top_miembros']]
+        return lineas
@@ -0,0 +1,134 @@
+# reporte_rendimiento.py
+import argparse
+import json
+import os
+import statistics
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Umbrales de regresión respecto a la mediana de las ejecuciones anteriores
+UMBRAL_VELOCIDAD = 0.20      # miembros/min un 20% por debajo
+UMBRAL_ETAPA = 0.30          # segundos por miembro de una etapa un 30% por encima
+UMBRAL_MEMORIA = 0.25        # pico de RSS de Chrome un 25% por encima
+
+
+def cargar_ejecuciones(conn, ultimas):
+    """Agrupa las filas de scraper_miembros_elite_paginas por ejecución (hora_inicio)."""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+        SELECT hora_inicio, MAX(archivo_generado), COUNT(*), SUM(miembros), SUM(segundos),
+               SUM(timeouts_perfil), SUM(reinicios_navegador), SUM(reintentos_bd),
+               MAX(pico_memoria_chrome_mb), json_agg(etapas)
+        FROM scraper_miembros_elite_paginas
+        GROUP BY hora_inicio
+        ORDER BY hora_inicio DESC
+        LIMIT %s
+        """, (ultimas,))
+        filas = cursor.fetchall()
+
+    ejecuciones = []
+    for inicio, archivo, paginas, miembros, segundos, timeouts, reinicios, reintentos, pico, etapas in filas:
+        miembros = miembros or 0
+        segundos = float(segundos or 0)
+        por_etapa = {}
+        for etapas_pagina in etapas or []:
+            if isinstance(etapas_pagina, str):
+                etapas_pagina = json.loads(etapas_pagina)
+            for etapa, total in (etapas_pagina or {}).items():
+                por_etapa[etapa] = por_etapa.get(etapa, 0.0) + float(total)
+        ejecuciones.append({
+            'inicio': inicio,
+            'archivo': archivo,
+            'paginas': paginas,
+            'miembros': miembros,
+            'miembros_min': miembros * 60 / segundos if segundos > 0 else 0.0,
+            'timeouts': timeouts or 0,
+            'reinicios': reinicios or 0,
+            'reintentos_bd': reintentos or 0,
+            'pico_mb': float(pico or 0),
+            'etapa_por_miembro': {e: t / miembros for e, t in por_etapa.items()} if miembros else {},
+        })
+    return ejecuciones
+
+
+def detectar_regresiones(actual, anteriores):
+    """Compara la última ejecución con la mediana de las anteriores."""
+    if not anteriores:
+        return []
+    avisos = []
+
+    velocidad_ref = statistics.median(e['miembros_min'] for e in anteriores)
+    if velocidad_ref > 0 and actual['miembros_min'] < velocidad_ref * (1 - UMBRAL_VELOCIDAD):
+        avisos.append(f"miembros/min {actual['miembros_min']:.1f} vs mediana {velocidad_ref:.1f}")
+
+    pico_ref = statistics.median(e['pico_mb'] for e in anteriores)
+    if pico_ref > 0 and actual['pico_mb'] > pico_ref * (1 + UMBRAL_MEMORIA):
+        avisos.append(f"pico Chrome {actual['pico_mb']:.0f} MB vs mediana {pico_ref:.0f} MB")
+
+    for contador in ('timeouts', 'reinicios', 'reintentos_bd'):
+        ref = statistics.median(e[contador] for e in anteriores)
+        if actual[contador] > max(2 * ref, ref + 2):
+            avisos.append(f"{contador} {actual[contador]} vs mediana {ref:g}")
+
+    for etapa, valor in actual['etapa_por_miembro'].items():
+        historico = [e['etapa_por_miembro'][etapa] for e in anteriores if etapa in e['etapa_por_miembro']]
+        if not historico:
+            continue
+        ref = statistics.median(historico)
+        if ref > 0 and valor > ref * (1 + UMBRAL_ETAPA):
+            avisos.append(f"etapa '{etapa}' {valor:.2f}s/miembro vs mediana {ref:.2f}s")
+    return avisos
+
+
+def imprimir_reporte(ejecuciones):
+    print(f"{'inicio':<20} {'pág':>4} {'miembros':>8} {'m/min':>7} {'timeouts':>8} "
+          f"{'reinicios':>9} {'reint.BD':>8} {'pico MB':>8}")
+    for e in ejecuciones:
+        print(f"{e['inicio']:%Y-%m-%d %H:%M:%S}  {e['paginas']:>4} {e['miembros']:>8} {e['miembros_min']:>7.1f} "
+              f"{e['timeouts']:>8} {e['reinicios']:>9} {e['reintentos_bd']:>8} {e['pico_mb']:>8.0f}")
+
+    actual, anteriores = ejecuciones[0], ejecuciones[1:]
+    print("\n⏱️ Etapas de la última ejecución (s/miembro):")
+    for etapa, valor in sorted(actual['etapa_por_miembro'].items(), key=lambda item: item[1], reverse=True):
+        print(f"   {etapa:<20} {valor:.3f}")
+
+    avisos = detectar_regresiones(actual, anteriores)
+    if not anteriores:
+        print("\nℹ️ Solo hay una ejecución registrada, no hay con qué comparar.")
+    elif avisos:
+        print(f"\n🚨 Posibles regresiones frente a las {len(anteriores)} ejecuciones anteriores:")
+        for aviso in avisos:
+            print(f"   - {aviso}")
+    else:
+        print(f"\n✅ Sin regresiones frente a las {len(anteriores)} ejecuciones anteriores.")
+    return avisos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el rendimiento de las últimas ejecuciones del scraper.")
+    parser.add_argument('-n', '--ultimas', type=int, default=5, help="Número de ejecuciones a comparar (defecto 5)")
+    args = parser.parse_args()
+
+    connection_string = os.getenv('DATABASE_URL')
+    if not connection_string:
+        print("❌ Falta DATABASE_URL en .env")
+        return 1
+
+    conn = psycopg2.connect(connection_string)
+    try:
+        ejecuciones = cargar_ejecuciones(conn, max(1, args.ultimas))
+    finally:
+        conn.close()
+
+    if not ejecuciones:
+        print("ℹ️ No hay métricas por página registradas todavía.")
+        return 0
+    avisos = imprimir_reporte(ejecuciones)
+    # Código de salida distinto de cero para poder usarlo en un cron o pipeline
+    return 2 if avisos else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,238 @@
+# skool_http.py
+import glob
+import json
+import os
+import re
+from collections import deque
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class SkoolHttpEngine:
+    """
+    Motor alternativo de extracción de perfiles: reutiliza las cookies de la sesión
+    de Selenium en un requests.Session con pool de conexiones y lee los datos que
+    Skool ya envía como JSON dentro de la página (__NEXT_DATA__).
+
+    extraer_perfil() devuelve None ante cualquier dato faltante, para que el
+    llamador caiga al camino de Selenium. Los datos se buscan solo dentro del nodo
+    del miembro (el que tiene el slug de la URL), nunca en los del grupo o de la
+    cuenta que navega, que también viajan en __NEXT_DATA__.
+    """
+
+    NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+    # Claves candidatas dentro del JSON (validar contra payloads grabados si Skool cambia)
+    CLAVES = {
+        'slug': ('name', 'slug', 'username', 'handle'),
+        'contribucion': ('contributions', 'totalContributions', 'numContributions'),
+        'email': ('membershipEmail', 'memberEmail', 'inviteEmail'),
+        'cursos': ('courses', 'memberCourses', 'userCourses'),
+        'titulo_curso': ('title', 'name'),
+        'progreso_curso': ('progress', 'percentComplete', 'completion'),
+    }
+
+    def __init__(self, logger, pool_size=4, timeout=15):
+        self.logger = logger
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.cuenta_email = None
+
+    def cargar_cookies(self, driver, cuenta_email=None):
+        """Copia las cookies y el User-Agent del navegador autenticado a la sesión HTTP."""
+        self.session.cookies.clear()
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+        try:
+            self.session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            pass
+        self.cuenta_email = (cuenta_email or '').lower() or None
+        self.logger.info(f"🍪 {len(self.session.cookies)} cookies exportadas al motor HTTP.")
+
+    def extraer_perfil(self, profile_url):
+        """
+        Descarga y parsea un perfil. Devuelve (gmail_user, contribution_member, cursos)
+        con cursos como [{title, progress}], o None si falta cualquier dato.
+        """
+        try:
+            response = self.session.get(profile_url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code != 200 or '/login' in response.url:
+                self.logger.info(f"🌐 HTTP {response.status_code} en {profile_url}, se usa Selenium.")
+                return None
+            return self._parsear_payload(response.text, profile_url)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"⚠️ Error HTTP en {profile_url}: {e}")
+            return None
+        except Exception as e:
+            self.logger.warning(f"⚠️ Payload de perfil no reconocido en {profile_url}: {e}")
+            return None
+
+    def _parsear_payload(self, html, profile_url):
+        match = self.NEXT_DATA_RE.search(html)
+        if not match:
+            return None
+        miembro = self._nodo_miembro(json.loads(match.group(1)), slug_de_url(profile_url))
+        if miembro is None:
+            return None
+
+        contribucion = self._buscar_clave(miembro, self.CLAVES['contribucion'])
+        email = self._buscar_clave(miembro, self.CLAVES['email'])
+        cursos_raw = self._buscar_clave(miembro, self.CLAVES['cursos'])
+
+        if contribucion is None or not isinstance(email, str) or '@' not in email:
+            return None
+        # Nunca aceptar el email de la cuenta que hace el scraping como si fuera del miembro
+        if self.cuenta_email and email.lower() == self.cuenta_email:
+            return None
+        if not isinstance(cursos_raw, list):
+            return None
+
+        cursos = []
+        for item in cursos_raw:
+            if not isinstance(item, dict):
+                return None
+            campos = {**item.get('metadata', {}), **item} if isinstance(item.get('metadata'), dict) else item
+            titulo = self._primer_valor(campos, self.CLAVES['titulo_curso'])
+            progreso = self._primer_valor(campos, self.CLAVES['progreso_curso'])
+            if not titulo or progreso is None:
+                return None
+            try:
+                progreso = float(progreso)
+            except (TypeError, ValueError):
+                return None
+            cursos.append({'title': str(titulo), 'progress': f"{int(round(progreso))}%"})
+
+        return email, str(contribucion), cursos
+
+    def _primer_valor(self, campos, claves):
+        for clave in claves:
+            if campos.get(clave) not in (None, ''):
+                return campos[clave]
+        return None
+
+    def _nodo_miembro(self, datos, slug):
+        """Primer objeto del JSON cuyo slug/username coincide con el del perfil pedido."""
+        if not slug:
+            return None
+        pendientes = deque([datos])
+        while pendientes:
+            actual = pendientes.popleft()
+            if isinstance(actual, dict):
+                for clave in self.CLAVES['slug']:
+                    valor = actual.get(clave)
+                    if isinstance(valor, str) and valor.lstrip('@').lower() == slug:
+                        return actual
+                pendientes.extend(actual.values())
+            elif isinstance(actual, list):
+                pendientes.extend(actual)
+        return None
+
+    def _buscar_clave(self, nodo, claves):
+        """Recorre el JSON por niveles y devuelve el primer valor de cualquiera de las claves."""
+        pendientes = deque([nodo])
+        while pendientes:
+            actual = pendientes.popleft()
+            if isinstance(actual, dict):
+                for clave in claves:
+                    if clave in actual and actual[clave] not in (None, ''):
+                        return actual[clave]
+                pendientes.extend(actual.values())
+            elif isinstance(actual, list):
+                pendientes.extend(actual)
+        return None
+
+    def validar_grabaciones(self, directorio):
+        """
+        Parsea los payloads reales grabados (grabar_payload) y compara con lo que extrajo Selenium.
+        Devuelve (validos, total); el motor solo debe usarse si hay grabaciones y todas coinciden.
+        """
+        validos = total = 0
+        for ruta in sorted(glob.glob(os.path.join(directorio or '', '*.json'))):
+            total += 1
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    grabacion = json.load(f)
+                html = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(grabacion["next_data"])}</script>'
+                obtenido = self._parsear_payload(html, grabacion['url'])
+            except Exception as e:
+                self.logger.warning(f"⚠️ Grabación de perfil ilegible {os.path.basename(ruta)}: {e}")
+                continue
+            esperado = grabacion['esperado']
+            if obtenido is not None and _normalizar(obtenido) == _normalizar(
+                    (esperado['email'], esperado['contribucion'], esperado['cursos'])):
+                validos += 1
+            else:
+                self.logger.warning(f"⚠️ El payload grabado {os.path.basename(ruta)} no da lo mismo que Selenium.")
+        return validos, total
+
+    def cerrar(self):
+        self.session.close()
+
+
+def slug_de_url(profile_url):
+    """'https://www.skool.com/@juan-perez-1234?g=x' -> 'juan-perez-1234'."""
+    ruta = urlparse(profile_url or '').path.strip('/')
+    return ruta[1:].lower() if ruta.startswith('@') else None
+
+
+def _normalizar(perfil):
+    """(email, contribución, cursos) comparable entre Selenium y HTTP (progreso como entero)."""
+    email, contribucion, cursos = perfil
+    limpios = []
+    for curso in cursos:
+        progreso = re.search(r'\d+', str(curso.get('progress') or ''))
+        limpios.append(((curso.get('title') or '').strip(), int(progreso.group()) if progreso else 0))
+    return (email or '').lower(), str(contribucion).strip(), limpios
+
+
+PATRON_EMAIL = re.compile(r'[\w.+-]+@[\w-]+(\.[\w-]+)+')
+CLAVES_SENSIBLES = re.compile(r'token|secret|session|auth|cookie|password|phone', re.I)
+
+
+def grabar_payload(html, profile_url, esperado, directorio):
+    """
+    Guarda el __NEXT_DATA__ de un perfil real junto con lo que extrajo Selenium, anonimizado:
+    cada email pasa a correoN@example.com (igual en el payload y en lo esperado) y los
+    valores de claves sensibles (token, session, auth...) se reemplazan. Devuelve la ruta o None.
+    """
+    match = SkoolHttpEngine.NEXT_DATA_RE.search(html or '')
+    slug = slug_de_url(profile_url)
+    if not match or not slug:
+        return None
+    emails = {}
+
+    def anonimizar_texto(texto):
+        return PATRON_EMAIL.sub(lambda m: emails.setdefault(m.group().lower(), f"correo{len(emails) + 1}@example.com"), texto)
+
+    def anonimizar(nodo):
+        if isinstance(nodo, dict):
+            return {k: '[omitido]' if CLAVES_SENSIBLES.search(k) and isinstance(v, (str, int, float)) else anonimizar(v)
+                    for k, v in nodo.items()}
+        if isinstance(nodo, list):
+            return [anonimizar(v) for v in nodo]
+        return anonimizar_texto(nodo) if isinstance(nodo, str) else nodo
+
+    grabacion = {
+        'url': urlparse(profile_url).path,
+        'next_data': anonimizar(json.loads(match.group(1))),
+        'esperado': {
+            'email': anonimizar_texto(esperado['email']),
+            'contribucion': esperado['contribucion'],
+            'cursos': esperado['cursos'],
+        },
+    }
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{re.sub(r'[^a-z0-9-]', '_', slug)}.json")
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(grabacion, f, ensure_ascii=False, indent=2)
+    return ruta
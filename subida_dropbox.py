@@ -0,0 +1,142 @@
+# subida_dropbox.py
+import os
+import time
+import dropbox
+from dropbox.exceptions import ApiError, AuthError, InternalServerError, RateLimitError
+from requests.exceptions import RequestException
+
+
+class SubidaDropbox:
+    """
+    Sube un archivo local a Dropbox por partes de tamaño fijo mediante upload sessions,
+    leyendo cada parte directamente del disco (nunca el archivo completo en memoria).
+
+    Sirve también para la subida incremental: anexar() sube solo las partes completas
+    que el archivo ya tiene y finalizar() envía la cola y hace el commit. Cada llamada
+    a la API se reintenta por separado; si Dropbox informa otro offset, se continúa desde él.
+
+    crear_cliente es una función que devuelve un dropbox.Dropbox (o un sustituto con la
+    misma interfaz); se vuelve a llamar si el token expira durante la subida, después de
+    invalidar_token si se indicó (para no recibir el mismo token rechazado desde un caché).
+    """
+
+    def __init__(self, crear_cliente, ruta_local, ruta_dropbox, logger,
+                 tamano_parte=8 * 1024 * 1024, reintentos=3, espera_base=1.0, invalidar_token=None):
+        self.crear_cliente = crear_cliente
+        self.invalidar_token = invalidar_token
+        self.ruta_local = ruta_local
+        self.ruta_dropbox = ruta_dropbox
+        self.logger = logger
+        self.tamano_parte = tamano_parte
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.dbx = None
+        self.session_id = None
+        self.offset = 0
+        self.partes_subidas = 0
+        self.completada = False
+
+    def anexar(self):
+        """Sube las partes completas disponibles; lo que no llena una parte espera a la siguiente llamada."""
+        self._subir_pendiente(final=False)
+
+    def finalizar(self):
+        """Sube lo que falte y confirma el archivo en Dropbox (sobrescribiendo)."""
+        self._subir_pendiente(final=True)
+        return self.offset
+
+    def _subir_pendiente(self, final):
+        if self.completada:
+            return
+        with open(self.ruta_local, 'rb') as f:
+            while True:
+                pendiente = os.fstat(f.fileno()).st_size - self.offset
+                if not final and pendiente < self.tamano_parte:
+                    return
+                n = min(pendiente, self.tamano_parte)
+                ultima = final and pendiente <= self.tamano_parte
+
+                if ultima and self.session_id is None:
+                    # Archivo de una sola parte: basta un files_upload
+                    if self._ejecutar('subida', lambda dbx: dbx.files_upload(
+                            self._leer(f, n), self.ruta_dropbox, mode=dropbox.files.WriteMode.overwrite)):
+                        self._avanzar(n)
+                        self.completada = True
+                        return
+                elif self.session_id is None:
+                    resultado = self._ejecutar('inicio de sesión', lambda dbx: dbx.files_upload_session_start(
+                        self._leer(f, n), close=False))
+                    if resultado:
+                        self.session_id = resultado.session_id
+                        self._avanzar(n)
+                elif ultima:
+                    if self._ejecutar('cierre de sesión', lambda dbx: dbx.files_upload_session_finish(
+                            self._leer(f, n), self._cursor(),
+                            dropbox.files.CommitInfo(path=self.ruta_dropbox, mode=dropbox.files.WriteMode.overwrite))):
+                        self._avanzar(n)
+                        self.completada = True
+                        return
+                else:
+                    if self._ejecutar('parte', lambda dbx: dbx.files_upload_session_append_v2(
+                            self._leer(f, n), self._cursor(), close=False)):
+                        self._avanzar(n)
+
+    def _leer(self, f, n):
+        f.seek(self.offset)
+        return f.read(n)
+
+    def _cursor(self):
+        return dropbox.files.UploadSessionCursor(session_id=self.session_id, offset=self.offset)
+
+    def _avanzar(self, n):
+        self.offset += n
+        self.partes_subidas += 1
+
+    def _ejecutar(self, descripcion, operacion):
+        """
+        Ejecuta una llamada con reintentos y backoff exponencial. Devuelve el resultado
+        (o True), o None si Dropbox corrigió el offset y hay que volver a planificar la parte.
+        """
+        for intento in range(self.reintentos + 1):
+            espera = self.espera_base * (2 ** intento)
+            try:
+                if self.dbx is None:
+                    self.dbx = self.crear_cliente()
+                resultado = operacion(self.dbx)
+                return resultado if resultado is not None else True
+            except ApiError as e:
+                correcto = self._offset_correcto(e.error)
+                if correcto is None:
+                    raise
+                self.logger.warning(f"↪️ Dropbox indica offset {correcto} (local {self.offset}); se continúa desde ahí.")
+                self.offset = correcto
+                return None
+            except AuthError:
+                # Token expirado a mitad de una subida larga: pedir un cliente nuevo y reintentar
+                self.dbx = None
+                if self.invalidar_token is not None:
+                    self.invalidar_token()
+                if intento == self.reintentos:
+                    raise
+                self.logger.warning(f"🔑 Token de Dropbox rechazado en {descripcion}, renovando...")
+                continue
+            except RateLimitError as e:
+                espera = max(espera, e.backoff or 0)
+                error = e
+            except (InternalServerError, RequestException) as e:
+                error = e
+            if intento == self.reintentos:
+                raise error
+            self.logger.warning(f"⚠️ Falló la {descripcion} en offset {self.offset} "
+                                f"(intento {intento + 1}/{self.reintentos + 1}): {error}. Reintentando en {espera:.1f}s...")
+            time.sleep(espera)
+
+    def _offset_correcto(self, error):
+        """Extrae correct_offset de los errores incorrect_offset de append/finish, si aplica."""
+        if error is None:
+            return None
+        if hasattr(error, 'is_lookup_failed') and error.is_lookup_failed():
+            error = error.get_lookup_failed()
+        if hasattr(error, 'is_incorrect_offset') and error.is_incorrect_offset():
+            return error.get_incorrect_offset().correct_offset
+        return None
@@ -0,0 +1,219 @@
+# sumideros.py
+import csv
+import gzip
+import io
+import os
+
+# Solo hacen falta para OUTPUT_FORMATS=csv.zst / parquet (están en requirements.txt; sin ellas
+# únicamente se omite ese formato)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+class SumideroCSV:
+    """
+    Archivo CSV abierto durante toda la ejecución. El mapeo columna -> clave interna
+    se resuelve una sola vez y cada fila se escribe como lista con csv.writer.
+
+    sincronizar() vacía el buffer al sistema operativo (y opcionalmente hace fsync);
+    se llama antes de cada checkpoint para que el checkpoint nunca vaya por delante del CSV.
+    """
+    incremental = True  # lo ya escrito es válido por sí solo: admite la subida incremental a Dropbox
+
+    def __init__(self, ruta, columnas, claves, logger, buffer_bytes=64 * 1024):
+        if len(columnas) != len(claves):
+            raise ValueError("columnas y claves deben tener la misma longitud")
+        self.ruta = ruta
+        self.columnas = list(columnas)
+        self.claves = list(claves)
+        self.logger = logger
+        self.buffer_bytes = buffer_bytes
+        self.archivo = None
+        self.writer = None
+        self.filas_escritas = 0
+
+    def abrir(self, nuevo):
+        """nuevo=True crea el archivo con encabezado; False continúa uno existente (reanudación)."""
+        self.archivo = self._abrir_archivo(nuevo)
+        self.writer = csv.writer(self.archivo)
+        if nuevo:
+            self.writer.writerow(self.columnas)
+        return self
+
+    def _abrir_archivo(self, nuevo):
+        # utf-8-sig solo escribe el BOM cuando el archivo empieza vacío, también en modo 'a'
+        return open(self.ruta, 'w' if nuevo else 'a', newline='', encoding='utf-8-sig',
+                    buffering=self.buffer_bytes)
+
+    @property
+    def abierto(self):
+        return self.archivo is not None and not self.archivo.closed
+
+    def escribir(self, registros):
+        claves = self.claves
+        self.escribir_filas([[registro.get(clave) for clave in claves] for registro in registros])
+
+    def escribir_filas(self, filas):
+        """Escribe filas ya ordenadas como las columnas (p. ej. leídas de otro CSV)."""
+        antes = self.filas_escritas
+        for fila in filas:
+            self.writer.writerow(fila)
+            self.filas_escritas += 1
+        return self.filas_escritas - antes
+
+    def sincronizar(self, fsync=False):
+        if not self.abierto:
+            return
+        self.archivo.flush()
+        if fsync:
+            os.fsync(self.archivo.fileno())
+
+    def cerrar(self):
+        if not self.abierto:
+            return
+        try:
+            self.sincronizar(fsync=True)
+        finally:
+            self.archivo.close()
+            self.logger.info(f"💾 {os.path.basename(self.ruta)} cerrado: {self.filas_escritas} filas escritas.")
+
+
+class SumideroCSVGzip(SumideroCSV):
+    """El mismo CSV comprimido con gzip a medida que se escribe."""
+
+    def _abrir_archivo(self, nuevo):
+        if not nuevo:
+            raise ValueError("Los CSV comprimidos se regeneran completos, no se continúan")
+        return gzip.open(self.ruta, 'wt', compresslevel=6, encoding='utf-8-sig', newline='')
+
+
+class SumideroCSVZstd(SumideroCSV):
+    """El mismo CSV comprimido con zstd (requiere el paquete zstandard)."""
+
+    def _abrir_archivo(self, nuevo):
+        if zstandard is None:
+            raise RuntimeError("OUTPUT_FORMATS=csv.zst requiere el paquete 'zstandard'")
+        if not nuevo:
+            raise ValueError("Los CSV comprimidos se regeneran completos, no se continúan")
+        compresor = zstandard.ZstdCompressor(level=10)
+        self._zstd = compresor.stream_writer(open(self.ruta, 'wb'))
+        return io.TextIOWrapper(self._zstd, encoding='utf-8-sig', newline='')
+
+    def sincronizar(self, fsync=False):
+        if not self.abierto:
+            return
+        self.archivo.flush()
+        # Cierra el bloque actual para que lo escrito hasta aquí sea descomprimible
+        self._zstd.flush(zstandard.FLUSH_BLOCK)
+        if fsync:
+            os.fsync(self._zstd.fileno())
+
+
+class SumideroParquet:
+    """
+    Escribe las filas en Parquet por grupos de `filas_por_grupo` filas.
+    Las columnas numéricas se tipan, los cursos vacíos quedan como null y las columnas
+    de texto repetitivo (nombres de cursos, estado) usan codificación por diccionario.
+
+    No es incremental: el archivo solo es legible cuando cerrar() escribe el footer, así que no
+    entra en la subida incremental a Dropbox y, si la ejecución se interrumpe, se regenera desde
+    el CSV al reanudar.
+    """
+    incremental = False
+
+    def __init__(self, ruta, columnas, claves, logger, columnas_enteras=(), columnas_decimales=(),
+                 columnas_diccionario=(), filas_por_grupo=10000):
+        if pa is None:
+            raise RuntimeError("OUTPUT_FORMATS=parquet requiere el paquete 'pyarrow'")
+        self.ruta = ruta
+        self.columnas = list(columnas)
+        self.claves = list(claves)
+        self.logger = logger
+        self.filas_por_grupo = filas_por_grupo
+        self.columnas_diccionario = [c for c in self.columnas if c in set(columnas_diccionario)]
+        enteras, decimales = set(columnas_enteras), set(columnas_decimales)
+        self.conversores = [self._a_entero if c in enteras else self._a_decimal if c in decimales else self._a_texto
+                            for c in self.columnas]
+        self.schema = pa.schema([
+            (c, pa.int64() if c in enteras else pa.float64() if c in decimales else pa.string())
+            for c in self.columnas
+        ])
+        self.writer = None
+        self.pendientes = [[] for _ in self.columnas]
+        self.filas_escritas = 0
+
+    def abrir(self, nuevo):
+        if not nuevo:
+            raise ValueError("El Parquet se regenera completo, no se continúa")
+        self.writer = pq.ParquetWriter(self.ruta, self.schema, compression='zstd',
+                                       use_dictionary=self.columnas_diccionario or False)
+        return self
+
+    @property
+    def abierto(self):
+        return self.writer is not None
+
+    def escribir(self, registros):
+        claves = self.claves
+        self.escribir_filas([[registro.get(clave) for clave in claves] for registro in registros])
+
+    def escribir_filas(self, filas):
+        antes = self.filas_escritas
+        for fila in filas:
+            for columna, conversor, valor in zip(self.pendientes, self.conversores, fila):
+                columna.append(conversor(valor))
+            self.filas_escritas += 1
+            if len(self.pendientes[0]) >= self.filas_por_grupo:
+                self._escribir_grupo()
+        return self.filas_escritas - antes
+
+    def sincronizar(self, fsync=False):
+        """
+        No corta el row group: sin footer el archivo no es legible de todos modos y una página
+        (~30 filas) daría grupos diminutos. Lo pendiente se escribe al llegar a `filas_por_grupo`
+        o al cerrar; si se interrumpe, se regenera desde el CSV.
+        """
+
+    def cerrar(self):
+        if not self.abierto:
+            return
+        try:
+            self._escribir_grupo()
+        finally:
+            self.writer.close()
+            self.writer = None
+            self.logger.info(f"💾 {os.path.basename(self.ruta)} cerrado: {self.filas_escritas} filas escritas.")
+
+    def _escribir_grupo(self):
+        if not self.pendientes[0]:
+            return
+        tabla = pa.Table.from_arrays(
+            [pa.array(valores, type=campo.type) for valores, campo in zip(self.pendientes, self.schema)],
+            schema=self.schema)
+        self.writer.write_table(tabla)
+        self.pendientes = [[] for _ in self.columnas]
+
+    @staticmethod
+    def _a_texto(valor):
+        return None if valor is None or valor == '' else str(valor)
+
+    @staticmethod
+    def _a_entero(valor):
+        try:
+            return None if valor is None or valor == '' else int(float(valor))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _a_decimal(valor):
+        try:
+            return None if valor is None or valor == '' else float(valor)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,75 @@
+# tarjetas_miembro.py
+import re
+
+# Claves del registro de tarjeta, en el orden que esperan el CSV y la BD
+CLAVES = ('Nivel', 'Miembro', 'EmailSkool', 'Chat', 'Membership', 'Frase', 'Activo', 'Unido',
+          'Valor', 'Renueva', 'Localiza', 'Invito', 'Invitado', 'Otro')
+
+# Tabla de reglas: (clave, patrón, transformación). Cada línea de la tarjeta se etiqueta por su
+# contenido con la primera regla que coincide; el orden de las líneas ya no importa.
+# Si Skool cambia un texto, basta con ajustar o añadir una fila aquí. Actividad y precio se
+# anclan a la línea completa: una bio como "Free spirit" o "Active trader" es texto libre.
+REGLAS = (
+    ('EmailSkool', re.compile(r'^@[\w.-]+$'), None),
+    ('Unido', re.compile(r'^Joined\s'), lambda s: s[7:].strip()),
+    ('Activo', re.compile(r'^(Active \d+\w* ago|Online now)$'), lambda s: s.split()[1] if s.startswith('Active ') else s),
+    ('Valor', re.compile(r'^(\$\d[\d.,]*(/month|/year)?|Free)$'), lambda s: s.replace('$', '').replace('/month', '').strip()),
+    ('Renueva', re.compile(r'^Renews\b'), None),
+    ('Invito', re.compile(r'^Invited by\s'), None),
+    ('Chat', re.compile(r'^Chat$'), None),
+    ('Membership', re.compile(r'^Membership$'), None),
+    # Insignias junto al nombre: rol de administrador/moderador o ranking ('🔥 Top 1%')
+    ('Otro', re.compile(r'^(\((Admin|Moderator|Owner)\)|🔥)'), None),
+)
+# Un solo regex con un grupo por regla: una sola llamada por línea en vez de recorrer la tabla
+_PATRON_COMBINADO = re.compile('|'.join(f"(?P<r{i}>{patron.pattern})" for i, (_, patron, _) in enumerate(REGLAS)))
+_REGLA_POR_GRUPO = {f"r{i}": (clave, transformar) for i, (clave, _, transformar) in enumerate(REGLAS)}
+PATRON_NIVEL = re.compile(r'^\d{1,3}$')
+# Líneas que marcan el fin de la zona de bio: el texto libre posterior es la localización
+CLAVES_FIN_BIO = frozenset(('Activo', 'Unido', 'Valor', 'Renueva'))
+
+
+def clasificar_linea(linea):
+    """Devuelve (clave, valor) para una línea reconocida por la tabla, o (None, linea)."""
+    coincidencia = _PATRON_COMBINADO.match(linea)
+    if coincidencia is None:
+        return None, linea
+    clave, transformar = _REGLA_POR_GRUPO[coincidencia.lastgroup]
+    return clave, transformar(linea) if transformar else linea
+
+
+def parsear_tarjeta(partes):
+    """
+    Convierte las líneas de texto de una tarjeta de miembro en el diccionario de 14 claves.
+    El texto libre se asigna por zona: antes del @handle es el nombre, entre el @handle y la
+    actividad es la frase personal, y después es la localización. Lo que no encaja va a 'Otro'.
+    """
+    data = dict.fromkeys(CLAVES, 'N/A')
+    sobrantes = []
+    zona = 'nombre'
+    for i, linea in enumerate(partes):
+        if i == 0 and PATRON_NIVEL.match(linea):
+            data['Nivel'] = linea
+            continue
+        clave, valor = clasificar_linea(linea)
+        if clave is None:
+            if zona == 'nombre' and data['Miembro'] == 'N/A':
+                data['Miembro'] = valor
+            elif zona == 'bio' and data['Frase'] == 'N/A':
+                data['Frase'] = valor
+            elif zona == 'localizacion' and data['Localiza'] == 'N/A':
+                data['Localiza'] = valor
+            else:
+                sobrantes.append(valor)
+            continue
+        if clave == 'EmailSkool':
+            zona = 'bio'
+        elif clave in CLAVES_FIN_BIO:
+            zona = 'localizacion'
+        if data[clave] == 'N/A':
+            data[clave] = valor
+        else:
+            sobrantes.append(valor)
+    if sobrantes:
+        data['Otro'] = ' | '.join(([data['Otro']] if data['Otro'] != 'N/A' else []) + sobrantes)
+    return data